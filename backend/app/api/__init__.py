@@ -3,5 +3,6 @@ API routes module.
 """
 
 from .calculator import router as calculator_router
+from .metrics import router as metrics_router
  
-__all__ = ["calculator_router"] 
\ No newline at end of file
+__all__ = ["calculator_router", "metrics_router"] 
\ No newline at end of file
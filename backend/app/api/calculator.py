@@ -1,19 +1,199 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File
-from typing import List
-import pandas as pd
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Request, Response, Depends, Path, Query
+from fastapi.exceptions import RequestValidationError
+from pydantic import TypeAdapter, ValidationError
+from fastapi.concurrency import run_in_threadpool
+from typing import BinaryIO, List, Iterator, Dict, Optional, TYPE_CHECKING
+from datetime import date
 import io
-from ..schemas import IndividualCalculatorInput, GratuityResult, BulkCalculatorInput, BulkCalculationResult
-from ..services.calculator import calculate_individual_gratuity, calculate_bulk_gratuity
+import hashlib
+import itertools
+from ..schemas import IndividualCalculatorInput, GratuityResult, BulkCalculatorInput, BulkCalculationResult, BulkAggregation, BulkJob, DatasetSummary, DatasetUpdate, DatasetResultPage, LiabilityProjection, Scenario, ScenarioRequest, ScenarioAnalysis, EmployeeType, TerminationReason
+from ..services.calculator import calculate_individual_gratuity_cached, calculate_bulk_gratuity, MAX_GRATUITY_LIMIT
+from ..services.jobs import JobRunner, get_job_runner
+from ..services.dataset_store import DatasetStore, DatasetConflictError, InvalidCursorError, DATASET_ID_PATTERN, SORT_COLUMNS, get_dataset_store
+from ..services.executor import cpu_executor, ExecutorBusyError
+from ..services.metrics import observe_upload_rows, stage
+from ..services.bulk_input import ARROW_EXTENSIONS, BulkInputError, load_arrow_io
+from ..services.csv_ingestion import read_csv_employees, UnsupportedCsvError
+from ..services.results import render_bulk_result_json, render_dataset_update_json, render_result_json, render_result_page_json
+from ..config import BULK_CHUNK_SIZE, BULK_CHUNKED_THRESHOLD_BYTES, BULK_PARALLEL_WORKERS, BULK_SHARD_SIZE, CSV_FAST_PATH_MAX_BYTES, PROJECTION_MAX_CELLS, PROJECTION_MAX_DATES, SCENARIO_MAX_COUNT, DATASET_PAGE_MAX_ROWS
 from fastapi.responses import StreamingResponse
 
+# pandas, numpy and openpyxl take longer to import than the rest of the app together, so
+# the ingestion, bulk and export services that need them are imported inside the bulk and
+# template handlers. Serverless cold starts for /health and /calculator/individual never
+# load them.
+if TYPE_CHECKING:
+    import pandas as pd
+
 router = APIRouter(
     prefix="/calculator",
     tags=["calculator"],
     responses={404: {"description": "Not found"}},
 )
 
-@router.post("/individual", response_model=GratuityResult)
-async def calculate_individual(calculator_input: IndividualCalculatorInput):
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+# Media type and file extension of each columnar download format
+ARROW_DOWNLOAD_TYPES = {
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+    "arrow": ("application/vnd.apache.arrow.file", "arrow"),
+    "feather": ("application/vnd.apache.arrow.file", "arrow"),
+}
+
+def _upload_extension(file: UploadFile) -> str:
+    """Return the lower-cased extension of an upload, rejecting unsupported file types."""
+    file_extension = file.filename.split(".")[-1].lower()
+    if file_extension not in ["csv", "xlsx", "xls", *ARROW_EXTENSIONS]:
+        raise HTTPException(
+            status_code=400, 
+            detail="File must be a CSV or Excel file (.csv, .xlsx, .xls), or a Parquet or Arrow file (.parquet, .arrow, .feather)"
+        )
+    return file_extension
+
+def _prime_chunks(chunks: Iterator["pd.DataFrame"]) -> Iterator["pd.DataFrame"]:
+    """
+    Validate the first chunk before a streamed response starts.
+    
+    File-level errors and invalid rows in small files then surface as a regular 400
+    response instead of in the middle of a stream.
+    """
+    first_chunk = next(chunks, None)
+    if first_chunk is None:
+        return chunks
+    return itertools.chain([first_chunk], chunks)
+
+async def _ndjson_response(chunks: Iterator["pd.DataFrame"]) -> StreamingResponse:
+    """
+    Stream bulk results as newline-delimited JSON.
+    """
+    from ..services.bulk import iter_bulk_gratuity_ndjson
+    
+    chunks = await cpu_executor.run_local(_prime_chunks, chunks)
+    return StreamingResponse(iter_bulk_gratuity_ndjson(chunks), media_type=NDJSON_MEDIA_TYPE)
+
+def _parse_upload(contents: bytes) -> "pd.DataFrame":
+    """Parse, validate and normalize a whole CSV upload; runs on the CPU executor."""
+    import pandas as pd
+    from ..services.ingestion import prepare_employee_frame
+    
+    with stage("parse"):
+        try:
+            df = pd.read_csv(io.StringIO(contents.decode('utf-8')))
+        except pd.errors.ParserError:
+            raise BulkInputError("Error parsing file. Please ensure the file is properly formatted.")
+    
+    # Validate and normalize all rows at once, parsing each column a single time
+    return prepare_employee_frame(df)
+
+def _calculate_upload(contents: bytes) -> Dict:
+    """
+    Parse and calculate a whole CSV upload; runs on the CPU executor.
+    
+    Small files go through the pandas-free reader, which hands validated rows straight
+    to the calculator. Larger files and files that need pandas' type inference to be
+    read the same way are parsed with pandas.
+    """
+    employees = None
+    if len(contents) <= CSV_FAST_PATH_MAX_BYTES:
+        try:
+            employees = read_csv_employees(io.BytesIO(contents))
+        except UnsupportedCsvError:
+            pass
+    if employees is None:
+        employees = _parse_upload(contents)
+    return calculate_bulk_gratuity(employees, workers=BULK_PARALLEL_WORKERS, shard_size=BULK_SHARD_SIZE)
+
+def _calculate_excel(source: BinaryIO, file_extension: str, sheet: Optional[str], header_row: Optional[int]) -> Dict:
+    """
+    Read and calculate a whole Excel upload; runs on the CPU executor.
+    
+    Rows are read and validated a chunk at a time (.xlsx sheets are streamed rather than
+    loaded whole), then calculated together like a CSV upload, so large workbooks can
+    still be sharded across workers.
+    """
+    import pandas as pd
+    from ..services.ingestion import iter_employee_chunks
+    
+    chunks = list(iter_employee_chunks(source, file_extension, BULK_CHUNK_SIZE, sheet, header_row))
+    employees = pd.concat(chunks, ignore_index=True) if chunks else []
+    return calculate_bulk_gratuity(employees, workers=BULK_PARALLEL_WORKERS, shard_size=BULK_SHARD_SIZE)
+
+def _bulk_json_response(result: Dict) -> Response:
+    """
+    Encode a bulk result exactly as ``response_model`` would.
+    
+    Column-stored results are written straight to JSON instead of being validated row by
+    row; FastAPI passes a returned response through unchanged, which also lets the
+    serialization stage be timed.
+    """
+    with stage("serialization"):
+        return Response(render_bulk_result_json(result), media_type="application/json")
+
+def _render_template(excel: bool) -> bytes:
+    """Build the bulk template file; runs on the CPU executor."""
+    import pandas as pd
+    
+    # Create sample data with headers and one example row
+    data = {
+        "employee_name": ["John Doe", "Jane Smith", "Sam Brown"],
+        "joining_date": ["2015-01-01", "2010-06-15", "2018-03-01"],
+        "leaving_date": ["2023-01-01", "2023-01-01", "2023-05-15"],
+        "last_drawn_salary": [25000, 35000, 30000],
+        "employee_type": ["standard", "non-covered", ""],
+        "termination_reason": ["resignation", "retirement", ""]
+    }
+    
+    # Add a note about optional fields
+    notes = pd.DataFrame({
+        "employee_name": ["NOTE:"],
+        "joining_date": [""],
+        "leaving_date": [""],
+        "last_drawn_salary": [""],
+        "employee_type": ["Optional: standard/non-covered/unknown (empty values = unknown)"],
+        "termination_reason": ["Optional: resignation/retirement/death/disability/unknown (empty values = unknown)"]
+    })
+    
+    df = pd.DataFrame(data)
+    
+    # Append the notes row
+    df = pd.concat([df, notes], ignore_index=True)
+    
+    if excel:
+        output = io.BytesIO()
+        df.to_excel(output, index=False)
+        return output.getvalue()
+    
+    return df.to_csv(index=False).encode("utf-8")
+
+def _individual_etag(calculator_input: IndividualCalculatorInput) -> str:
+    """
+    Strong ETag for an individual calculation, derived from its input alone.
+    
+    The result is a pure function of the input and the gratuity rules, so the tag can be
+    checked before anything is computed.
+    """
+    payload = f"{MAX_GRATUITY_LIMIT}|{calculator_input.model_dump_json()}"
+    return '"' + hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32] + '"'
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header (which may list several tags) against ``etag``.
+    
+    ``*`` is not a match: results are keyed by their input rather than stored, so a
+    client can only revalidate a result it has already received.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        if candidate.strip().removeprefix("W/") == etag:
+            return True
+    return False
+
+@router.post("/individual", response_model=GratuityResult, responses={304: {"description": "Result unchanged since the ETag sent in If-None-Match"}})
+async def calculate_individual(calculator_input: IndividualCalculatorInput, request: Request):
     """
     Calculate gratuity for an individual employee.
     
@@ -24,9 +204,16 @@ async def calculate_individual(calculator_input: IndividualCalculatorInput):
     - **employee_type**: Type of employee (standard, non-covered)
     - **termination_reason**: Reason for termination (resignation, retirement, death, disability)
     
+    Responses carry an ETag; sending it back in `If-None-Match` with the same input
+    returns 304 Not Modified without recalculating.
+    
     Returns the calculated gratuity amount and related information.
     """
-    result = calculate_individual_gratuity(
+    etag = _individual_etag(calculator_input)
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    result = calculate_individual_gratuity_cached(
         employee_name=calculator_input.employee_name,
         joining_date=calculator_input.joining_date,
         leaving_date=calculator_input.leaving_date,
@@ -35,10 +222,21 @@ async def calculate_individual(calculator_input: IndividualCalculatorInput):
         termination_reason=calculator_input.termination_reason
     )
     
-    return result
+    # Encoded directly instead of being re-validated through response_model
+    return Response(render_result_json(result), media_type="application/json", headers={"ETag": etag})
 
-@router.post("/bulk", response_model=BulkCalculationResult)
-async def calculate_bulk(file: UploadFile = File(...)):
+@router.post(
+    "/bulk",
+    response_model=BulkCalculationResult,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}}
+)
+async def calculate_bulk(
+    request: Request,
+    file: UploadFile = File(...),
+    chunked: bool = False,
+    sheet: Optional[str] = None,
+    header_row: Optional[int] = Query(None, ge=1)
+):
     """
     Calculate gratuity for multiple employees from a CSV or Excel file.
     
@@ -50,78 +248,120 @@ async def calculate_bulk(file: UploadFile = File(...)):
     - employee_type (optional, default: unknown)
     - termination_reason (optional, default: unknown)
     
+    Parquet and Arrow IPC (Feather v2) files are also accepted when pyarrow is installed;
+    typed date and decimal columns are used as they are, without parsing.
+    
+    - **chunked**: Read and calculate the upload in chunks of rows instead of whole.
+      Large CSV uploads and Parquet and Arrow uploads are always processed in chunks;
+      .xlsx sheets are always streamed row by row rather than loaded whole.
+    - **sheet**: Worksheet of an Excel upload to read (default: the first sheet)
+    - **header_row**: Row of an Excel sheet holding the column names (default: 1);
+      rows above it are ignored
+    
+    Rows are validated together; if any are invalid, a 400 response lists every
+    invalid row with its spreadsheet row number (the header is row 1 unless
+    `header_row` says otherwise).
+    
+    Send `Accept: application/x-ndjson` to stream one result per line as rows are
+    computed, followed by a final `{"summary": {...}}` line with the totals.
+    
+    Use `/calculator/bulk/summary` instead when only totals and breakdowns are needed.
+    
+    Like every bulk endpoint, uploads over the configured size limit are rejected with
+    413, and requests beyond the per-process limit on concurrent bulk requests get 503
+    with a Retry-After header.
+    
     Returns results for all employees and summary statistics.
     """
     # Check file extension
-    file_extension = file.filename.split(".")[-1].lower()
-    if file_extension not in ["csv", "xlsx", "xls"]:
-        raise HTTPException(
-            status_code=400, 
-            detail="File must be a CSV or Excel file (.csv, .xlsx, .xls)"
-        )
+    file_extension = _upload_extension(file)
     
-    # Read the file content
-    contents = await file.read()
+    wants_ndjson = NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
     
-    try:
-        # Parse the file based on its format
-        if file_extension == "csv":
-            df = pd.read_csv(io.StringIO(contents.decode('utf-8')))
-        else:  # Excel
-            df = pd.read_excel(io.BytesIO(contents))
-        
-        # Check if the required columns exist
-        required_columns = ["employee_name", "joining_date", "leaving_date", "last_drawn_salary"]
-        missing_columns = [col for col in required_columns if col not in df.columns]
+    # Large CSV files (and any of unknown size) are parsed and calculated chunk by chunk
+    # to bound peak memory; Parquet and Arrow files are read from the spooled upload one
+    # batch at a time. Only CSV files known to be small are read into memory whole.
+    csv_chunked = file_extension == "csv" and (file.size is None or file.size > BULK_CHUNKED_THRESHOLD_BYTES)
+    if csv_chunked or wants_ndjson or chunked or file_extension in ARROW_EXTENSIONS:
+        import pandas as pd
+        from ..services.ingestion import iter_employee_chunks
+        from ..services.bulk import calculate_bulk_gratuity_chunked
         
-        if missing_columns:
+        try:
+            chunks = iter_employee_chunks(file.file, file_extension, BULK_CHUNK_SIZE, sheet, header_row)
+            if wants_ndjson:
+                return await _ndjson_response(chunks)
+            result = await cpu_executor.run_local(calculate_bulk_gratuity_chunked, chunks)
+            observe_upload_rows(len(result["results"]))
+            return _bulk_json_response(result)
+        except ExecutorBusyError:
+            raise
+        except BulkInputError as e:
+            raise HTTPException(status_code=400, detail=e.detail)
+        except (pd.errors.ParserError, UnicodeDecodeError):
             raise HTTPException(
                 status_code=400, 
-                detail=f"File is missing required columns: {', '.join(missing_columns)}"
+                detail="Error parsing file. Please ensure the file is properly formatted."
             )
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, 
+                detail=f"An error occurred while processing the file: {str(e)}"
+            )
+    
+    try:
+        # Parsing and calculation run off the event loop so other requests are not stalled
+        if file_extension == "csv":
+            with stage("upload_read"):
+                contents = await file.read()
+            result = await cpu_executor.run(_calculate_upload, contents)
+        else:
+            result = await cpu_executor.run_local(_calculate_excel, file.file, file_extension, sheet, header_row)
         
-        # Add default columns if not present
-        if "employee_type" not in df.columns:
-            df["employee_type"] = "unknown"
-        
-        if "termination_reason" not in df.columns:
-            df["termination_reason"] = "unknown"
-        
-        # Handle NaN values in optional columns
-        df["employee_type"] = df["employee_type"].fillna("unknown")
-        df["termination_reason"] = df["termination_reason"].fillna("unknown")
-        
-        # Ensure employee_type and termination_reason are strings
-        df["employee_type"] = df["employee_type"].astype(str)
-        df["termination_reason"] = df["termination_reason"].astype(str)
-        
-        # Handle any empty strings in optional columns
-        df["employee_type"] = df["employee_type"].replace("", "unknown")
-        df["termination_reason"] = df["termination_reason"].replace("", "unknown")
-        
-        # Convert the dataframe to a list of IndividualCalculatorInput objects
-        employees = []
-        
-        for _, row in df.iterrows():
-            employee_data = {
-                "employee_name": row["employee_name"],
-                "joining_date": pd.to_datetime(row["joining_date"]).date(),
-                "leaving_date": pd.to_datetime(row["leaving_date"]).date(),
-                "last_drawn_salary": float(row["last_drawn_salary"]),
-                "employee_type": row["employee_type"],
-                "termination_reason": row["termination_reason"]
-            }
-            
-            # Create model object
-            employee = IndividualCalculatorInput(**employee_data)
-            employees.append(employee)
-        
-        # Calculate bulk results
-        result = calculate_bulk_gratuity(employees)
-        
-        return result
+        observe_upload_rows(len(result["results"]))
+        return _bulk_json_response(result)
     
-    except pd.errors.ParserError:
+    except (HTTPException, ExecutorBusyError):
+        raise
+    except BulkInputError as e:
+        raise HTTPException(status_code=400, detail=e.detail)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, 
+            detail=f"An error occurred while processing the file: {str(e)}"
+        )
+
+@router.post("/bulk/summary", response_model=BulkAggregation)
+async def summarize_bulk(file: UploadFile = File(...)):
+    """
+    Calculate gratuity for a CSV or Excel file and return only summary statistics.
+    
+    Accepts the same file format as `/calculator/bulk`. Instead of a result per employee,
+    returns the totals plus:
+    - row counts, eligible counts and gratuity totals by employee type, termination
+      reason and leaving year
+    - the number of employees whose gratuity was capped
+    - histograms of last drawn salary and years of service
+    
+    The file is calculated in chunks and each chunk is aggregated as it is computed, so
+    large files are summarized without holding their results.
+    """
+    import pandas as pd
+    from ..services.ingestion import iter_employee_chunks
+    from ..services.aggregation import aggregate_bulk_gratuity
+    
+    file_extension = _upload_extension(file)
+    
+    try:
+        chunks = iter_employee_chunks(file.file, file_extension, BULK_CHUNK_SIZE)
+        aggregation = await cpu_executor.run_local(aggregate_bulk_gratuity, chunks)
+        observe_upload_rows(aggregation["row_count"])
+        return aggregation
+    except ExecutorBusyError:
+        raise
+    except BulkInputError as e:
+        raise HTTPException(status_code=400, detail=e.detail)
+    except (pd.errors.ParserError, UnicodeDecodeError):
         raise HTTPException(
             status_code=400, 
             detail="Error parsing file. Please ensure the file is properly formatted."
@@ -141,59 +381,406 @@ async def download_template(file_type: str = "csv"):
     
     Returns a template file with the required columns for bulk calculations.
     """
-    # Create sample data with headers and one example row
-    data = {
-        "employee_name": ["John Doe", "Jane Smith", "Sam Brown"],
-        "joining_date": ["2015-01-01", "2010-06-15", "2018-03-01"],
-        "leaving_date": ["2023-01-01", "2023-01-01", "2023-05-15"],
-        "last_drawn_salary": [25000, 35000, 30000],
-        "employee_type": ["standard", "non-covered", ""],
-        "termination_reason": ["resignation", "retirement", ""]
-    }
-    
-    # Add a note about optional fields
-    notes = pd.DataFrame({
-        "employee_name": ["NOTE:"],
-        "joining_date": [""],
-        "leaving_date": [""],
-        "last_drawn_salary": [""],
-        "employee_type": ["Optional: standard/non-covered/unknown (empty values = unknown)"],
-        "termination_reason": ["Optional: resignation/retirement/death/disability/unknown (empty values = unknown)"]
-    })
-    
-    df = pd.DataFrame(data)
+    excel = file_type.lower() == "excel" or file_type.lower() == "xlsx"
+    content = await cpu_executor.run(_render_template, excel)
     
-    # Append the notes row
-    df = pd.concat([df, notes], ignore_index=True)
-    
-    if file_type.lower() == "excel" or file_type.lower() == "xlsx":
-        # Create an Excel file
-        output = io.BytesIO()
-        df.to_excel(output, index=False)
-        output.seek(0)
-        
+    if excel:
         return StreamingResponse(
-            output,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            io.BytesIO(content),
+            media_type=XLSX_MEDIA_TYPE,
             headers={"Content-Disposition": "attachment; filename=gratuity_calculation_template.xlsx"}
         )
     else:
         # Default to CSV
-        output = io.StringIO()
-        df.to_csv(output, index=False)
-        output.seek(0)
-        
         return StreamingResponse(
-            output,
+            io.BytesIO(content),
             media_type="text/csv",
             headers={"Content-Disposition": "attachment; filename=gratuity_calculation_template.csv"}
         )
 
-@router.post("/bulk/download")
-async def download_bulk_results():
+@router.post("/bulk/download", response_class=StreamingResponse)
+async def download_bulk_results(file: UploadFile = File(...), file_type: str = "csv"):
     """
-    Generate a downloadable file with calculation results.
-    This endpoint will be implemented in a future task.
+    Calculate gratuity for a CSV or Excel upload and download the results as a file.
+    
+    - **file**: Workforce file in the same format as for `/calculator/bulk`
+    - **file_type**: Type of file to download (csv, excel, or parquet or arrow when
+      pyarrow is installed)
+    
+    Results are computed in chunks and written to a temporary file, which is streamed
+    once the whole upload has been calculated, so memory stays flat for large files and
+    invalid rows anywhere in the upload are reported as a 400 response.
+    Parquet and Arrow exports keep column types: dates, decimal gratuity amounts and
+    dictionary-encoded employee types and termination reasons.
     """
-    # This will be implemented later
-    raise HTTPException(status_code=501, detail="Endpoint not implemented yet") 
\ No newline at end of file
+    import pandas as pd
+    from ..services.ingestion import iter_employee_chunks
+    from ..services.bulk import BulkTotals, iter_bulk_gratuity_chunks
+    from ..services.export import build_results_csv, build_results_xlsx, iter_file_blocks
+    
+    file_extension = _upload_extension(file)
+    
+    try:
+        arrow_download = ARROW_DOWNLOAD_TYPES.get(file_type.lower())
+        arrow_io = load_arrow_io() if arrow_download else None
+        
+        # Every format is written to a temporary file before the response starts, so
+        # invalid rows in any chunk are reported as a 400 instead of a truncated file
+        chunks = iter_employee_chunks(file.file, file_extension, BULK_CHUNK_SIZE)
+        totals = BulkTotals()
+        chunk_results = iter_bulk_gratuity_chunks(chunks, totals)
+        
+        if arrow_download:
+            media_type, extension = arrow_download
+            output = await cpu_executor.run_local(arrow_io.build_results_arrow, chunk_results, file_type.lower())
+            observe_upload_rows(totals.row_count)
+            
+            return StreamingResponse(
+                iter_file_blocks(output),
+                media_type=media_type,
+                headers={"Content-Disposition": f"attachment; filename=gratuity_calculation_results.{extension}"}
+            )
+        
+        if file_type.lower() == "excel" or file_type.lower() == "xlsx":
+            output = await cpu_executor.run_local(build_results_xlsx, chunk_results)
+            observe_upload_rows(totals.row_count)
+            
+            return StreamingResponse(
+                iter_file_blocks(output),
+                media_type=XLSX_MEDIA_TYPE,
+                headers={"Content-Disposition": "attachment; filename=gratuity_calculation_results.xlsx"}
+            )
+        
+        output = await cpu_executor.run_local(build_results_csv, chunk_results)
+        observe_upload_rows(totals.row_count)
+        
+        return StreamingResponse(
+            iter_file_blocks(output),
+            media_type="text/csv",
+            headers={"Content-Disposition": "attachment; filename=gratuity_calculation_results.csv"}
+        )
+    
+    except ExecutorBusyError:
+        raise
+    except BulkInputError as e:
+        raise HTTPException(status_code=400, detail=e.detail)
+    except (pd.errors.ParserError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=400, 
+            detail="Error parsing file. Please ensure the file is properly formatted."
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, 
+            detail=f"An error occurred while processing the file: {str(e)}"
+        )
+
+@router.post("/bulk/projection", response_model=LiabilityProjection)
+async def project_bulk_liability(
+    file: UploadFile = File(...),
+    start: Optional[date] = None,
+    periods: int = Query(120, ge=1),
+    dates: Optional[List[date]] = Query(None),
+    summary_only: bool = False
+):
+    """
+    Project the gratuity liability of a workforce over a grid of future dates.
+    
+    Accepts the same file format as `/calculator/bulk`. On each date, every employee who
+    has joined and not yet reached their leaving date (for example their retirement date)
+    is valued at the gratuity they would be owed if they left that day.
+    
+    - **start**: First month of the grid (default: the current month)
+    - **periods**: Number of consecutive month ends in the grid
+    - **dates**: Explicit projection dates, used instead of month ends when given
+    - **summary_only**: Return only the totals per date, without per-employee liabilities
+    
+    Per-employee liabilities are limited to a configurable number of employee x date
+    values (5 million by default); larger projections return 400 unless `summary_only`
+    is set.
+    """
+    import pandas as pd
+    from ..services.ingestion import iter_employee_chunks
+    from ..services.projection import month_end_grid, project_liability, render_projection_json
+    
+    file_extension = _upload_extension(file)
+    
+    grid = sorted(set(dates)) if dates else month_end_grid(start or date.today(), periods)
+    if len(grid) > PROJECTION_MAX_DATES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A projection can cover at most {PROJECTION_MAX_DATES} dates"
+        )
+    
+    chunks = None
+    try:
+        chunks = iter_employee_chunks(file.file, file_extension, BULK_CHUNK_SIZE)
+        projection = await cpu_executor.run_local(project_liability, chunks, grid, not summary_only, PROJECTION_MAX_CELLS)
+    except ExecutorBusyError:
+        raise
+    except BulkInputError as e:
+        raise HTTPException(status_code=400, detail=e.detail)
+    except (pd.errors.ParserError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=400, 
+            detail="Error parsing file. Please ensure the file is properly formatted."
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, 
+            detail=f"An error occurred while processing the file: {str(e)}"
+        )
+    finally:
+        # A projection over the cell limit stops reading part way through the upload
+        if chunks is not None:
+            chunks.close()
+    
+    with stage("serialization"):
+        body = render_projection_json(projection)
+    return Response(body, media_type="application/json")
+
+def _check_scenario_count(scenarios: List[Scenario]) -> None:
+    if len(scenarios) > SCENARIO_MAX_COUNT:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {SCENARIO_MAX_COUNT} scenarios can be evaluated at once"
+        )
+
+@router.post("/bulk/scenarios", response_model=ScenarioAnalysis)
+async def analyze_bulk_scenarios(file: UploadFile = File(...), scenarios: str = Form(...)):
+    """
+    Evaluate a workforce under alternative gratuity parameters.
+    
+    Accepts the same file format as `/calculator/bulk`, and `scenarios` as a JSON list
+    of objects with:
+    - name
+    - max_gratuity (optional, default: the current cap)
+    - salary_increase_percent (optional, default: 0)
+    - standard_denominator (optional, default: 26)
+    - non_covered_denominator (optional, default: 30)
+    
+    Returns totals, capped counts and the distribution of gratuity amounts for the
+    current rules (`baseline`) and every scenario. Service periods and eligibility are
+    computed once and cached: send further scenarios for the same file to
+    `/calculator/bulk/scenarios/{workforce_id}` without uploading it again.
+    """
+    import pandas as pd
+    from ..services.scenarios import analyze_scenarios, load_workforce
+    
+    file_extension = _upload_extension(file)
+    
+    try:
+        parsed = TypeAdapter(List[Scenario]).validate_json(scenarios)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(include_url=False))
+    _check_scenario_count(parsed)
+    
+    try:
+        workforce_id, workforce = await cpu_executor.run_local(load_workforce, file.file, file_extension, BULK_CHUNK_SIZE)
+        observe_upload_rows(workforce.row_count)
+        return await cpu_executor.run_local(
+            analyze_scenarios, workforce_id, workforce, [scenario.model_dump() for scenario in parsed]
+        )
+    except ExecutorBusyError:
+        raise
+    except BulkInputError as e:
+        raise HTTPException(status_code=400, detail=e.detail)
+    except (pd.errors.ParserError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=400, 
+            detail="Error parsing file. Please ensure the file is properly formatted."
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, 
+            detail=f"An error occurred while processing the file: {str(e)}"
+        )
+
+@router.post("/bulk/scenarios/{workforce_id}", response_model=ScenarioAnalysis)
+async def analyze_cached_scenarios(workforce_id: str, request: ScenarioRequest):
+    """
+    Evaluate more scenarios for a workforce uploaded to `/calculator/bulk/scenarios`.
+    
+    Returns 404 once the prepared workforce has expired from the cache; upload the file
+    again in that case.
+    """
+    from ..services.scenarios import analyze_scenarios, prepared_workforce_cache
+    
+    _check_scenario_count(request.scenarios)
+    workforce = prepared_workforce_cache.get(workforce_id)
+    if workforce is None:
+        raise HTTPException(status_code=404, detail="Workforce not found; upload the file again")
+    
+    return await cpu_executor.run_local(
+        analyze_scenarios, workforce_id, workforce, [scenario.model_dump() for scenario in request.scenarios]
+    )
+
+@router.post("/bulk/jobs", response_model=BulkJob, status_code=202)
+async def create_bulk_job(file: UploadFile = File(...), runner: JobRunner = Depends(get_job_runner)):
+    """
+    Queue a CSV or Excel file for bulk gratuity calculation in the background.
+    
+    Accepts the same file format as `/calculator/bulk`. Returns the job immediately;
+    poll `/calculator/bulk/jobs/{job_id}` for progress and results. Returns 503 with a
+    Retry-After header when too many jobs are already queued or running.
+    """
+    file_extension = _upload_extension(file)
+    
+    # Copying the upload to the job directory is blocking file I/O
+    job = await run_in_threadpool(runner.submit, file.file, file.filename, file_extension)
+    
+    return job
+
+@router.get("/bulk/jobs/{job_id}", response_model=BulkJob)
+async def get_bulk_job(job_id: str, runner: JobRunner = Depends(get_job_runner)):
+    """
+    Get the status of a bulk calculation job.
+    
+    - **status**: queued, running, completed or failed
+    - **rows_processed**: Number of rows calculated so far
+    - **error**: Error detail when the job failed (same format as `/calculator/bulk` errors)
+    - **result**: Full bulk calculation result once the job has completed
+    
+    Finished jobs are deleted after a configurable time (a day by default) and then
+    return 404, as do jobs that never existed.
+    """
+    body = await run_in_threadpool(runner.get_json, job_id)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    # The stored result is already JSON and is not re-validated through response_model
+    return Response(body, media_type="application/json")
+
+@router.put("/bulk/datasets/{dataset_id}", response_model=DatasetUpdate)
+async def update_bulk_dataset(
+    dataset_id: str = Path(..., pattern=DATASET_ID_PATTERN),
+    file: UploadFile = File(...),
+    store: DatasetStore = Depends(get_dataset_store)
+):
+    """
+    Upload a new version of a workforce file, recalculating only the rows that changed.
+    
+    Accepts the same file format as `/calculator/bulk`. Rows are matched against the
+    previous upload under the same `dataset_id` by their inputs: unchanged rows are not
+    recalculated, and the dataset totals are updated by the results of the added and
+    removed rows. A changed row counts as one removed and one added row.
+    
+    The first upload, and the first upload after the calculation rules change, calculate
+    every row (`full_recalculation` is true). Returns 409 if another upload updated the
+    dataset at the same time.
+    """
+    import pandas as pd
+    from ..services.ingestion import iter_employee_chunks
+    from ..services.incremental import update_dataset
+    
+    file_extension = _upload_extension(file)
+    
+    try:
+        chunks = iter_employee_chunks(file.file, file_extension, BULK_CHUNK_SIZE)
+        update = await cpu_executor.run_local(update_dataset, store, dataset_id, chunks)
+        observe_upload_rows(update["row_count"])
+    except ExecutorBusyError:
+        raise
+    except DatasetConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except BulkInputError as e:
+        raise HTTPException(status_code=400, detail=e.detail)
+    except (pd.errors.ParserError, UnicodeDecodeError):
+        raise HTTPException(
+            status_code=400, 
+            detail="Error parsing file. Please ensure the file is properly formatted."
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=500, 
+            detail=f"An error occurred while processing the file: {str(e)}"
+        )
+    
+    with stage("serialization"):
+        body = render_dataset_update_json(update)
+    return Response(body, media_type="application/json")
+
+@router.get("/bulk/datasets", response_model=List[DatasetSummary])
+async def list_bulk_datasets(store: DatasetStore = Depends(get_dataset_store)):
+    """
+    List all stored bulk datasets with their current totals.
+    """
+    return await run_in_threadpool(store.summaries)
+
+@router.get("/bulk/datasets/{dataset_id}", response_model=DatasetSummary)
+async def get_bulk_dataset(dataset_id: str, store: DatasetStore = Depends(get_dataset_store)):
+    """
+    Get the current totals of a bulk dataset.
+    """
+    summary = await run_in_threadpool(store.get, dataset_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    
+    return summary
+
+@router.get("/bulk/datasets/{dataset_id}/results", response_model=DatasetResultPage)
+async def query_bulk_dataset(
+    dataset_id: str,
+    employee_type: Optional[EmployeeType] = None,
+    termination_reason: Optional[TerminationReason] = None,
+    is_eligible: Optional[bool] = None,
+    leaving_date_from: Optional[date] = None,
+    leaving_date_to: Optional[date] = None,
+    sort: str = Query("row", pattern="^(" + "|".join(SORT_COLUMNS) + ")$"),
+    descending: bool = False,
+    limit: int = Query(100, ge=1, le=DATASET_PAGE_MAX_ROWS),
+    cursor: Optional[str] = None,
+    store: DatasetStore = Depends(get_dataset_store)
+):
+    """
+    Browse the results of a bulk dataset one page at a time.
+    
+    - **employee_type**, **termination_reason**, **is_eligible**: Only return matching rows
+    - **leaving_date_from**, **leaving_date_to**: Only return rows leaving in this range (inclusive)
+    - **sort**: row (upload order), employee_name, joining_date, leaving_date,
+      years_of_service or gratuity_amount
+    - **limit**: Rows per page
+    - **cursor**: `next_cursor` of the previous page, to fetch the next one
+    
+    `total_count` is only returned on the first page, requested without a cursor;
+    later pages return null instead of counting the matching rows again.
+    
+    Every sort order has an index and pages are read by keyset, so any page of a large
+    dataset is returned without reading the rows before it. Filters use indexes too;
+    combined with a sort on another column, the matching rows may be sorted per page.
+    """
+    summary = await run_in_threadpool(store.get, dataset_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    
+    try:
+        total_count, results, next_cursor = await run_in_threadpool(
+            store.query_rows,
+            dataset_id,
+            employee_type=employee_type and employee_type.value,
+            termination_reason=termination_reason and termination_reason.value,
+            is_eligible=is_eligible,
+            leaving_date_from=leaving_date_from,
+            leaving_date_to=leaving_date_to,
+            sort=sort,
+            descending=descending,
+            limit=limit,
+            cursor=cursor
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    page = {"dataset_id": dataset_id, "total_count": total_count, "results": results, "next_cursor": next_cursor}
+    with stage("serialization"):
+        body = render_result_page_json(page)
+    return Response(body, media_type="application/json")
+
+@router.delete("/bulk/datasets/{dataset_id}", status_code=204)
+async def delete_bulk_dataset(dataset_id: str, store: DatasetStore = Depends(get_dataset_store)):
+    """
+    Delete a bulk dataset and its stored rows.
+    """
+    if not await run_in_threadpool(store.delete, dataset_id):
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    
+    return Response(status_code=204)
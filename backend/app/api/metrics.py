@@ -0,0 +1,43 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import Response
+from ..services.calculator import years_of_service_cache_stats, individual_result_cache
+from ..services.executor import cpu_executor
+from ..services.limits import bulk_limiter
+from ..services.metrics import registry, register_stats, CallbackMetric, PROMETHEUS_MEDIA_TYPE
+
+router = APIRouter(tags=["monitoring"])
+
+# Statistics kept by the caches, the CPU executor and the bulk limiter are read at scrape time
+CACHE_STATS = {
+    "years_of_service": years_of_service_cache_stats,
+    "individual_result": individual_result_cache.stats
+}
+register_stats("gratify_cache_hits_total", "Cache hits.", "cache", CACHE_STATS, "hits")
+register_stats("gratify_cache_misses_total", "Cache misses.", "cache", CACHE_STATS, "misses")
+register_stats("gratify_cache_entries", "Entries currently held in each cache.", "cache", CACHE_STATS, "size", type="gauge")
+registry.register(CallbackMetric(
+    "gratify_cpu_executor_pending",
+    "CPU tasks running or waiting in the request executor.",
+    "gauge",
+    [],
+    lambda: [((), cpu_executor.pending)]
+))
+registry.register(CallbackMetric(
+    "gratify_bulk_requests_active",
+    "Bulk requests in flight, counted against the per-process limit.",
+    "gauge",
+    [],
+    lambda: [((), bulk_limiter.active)]
+))
+
+@router.get("/metrics", response_class=Response, responses={200: {"content": {PROMETHEUS_MEDIA_TYPE: {}}}})
+async def metrics():
+    """
+    Expose request, bulk processing, cache and executor metrics in the Prometheus text format.
+    
+    Returns 404 when metrics are disabled with `GRATIFY_METRICS_ENABLED=0`.
+    """
+    if not registry.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    
+    return Response(registry.render(), media_type=PROMETHEUS_MEDIA_TYPE)
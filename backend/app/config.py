@@ -0,0 +1,111 @@
+"""
+Runtime configuration for the backend.
+
+Values are read from environment variables (a local ``.env`` file is honoured when
+python-dotenv is installed) and fall back to defaults suitable for development.
+"""
+
+import os
+import tempfile
+
+try:
+    from dotenv import load_dotenv
+    load_dotenv()
+except ImportError:  # pragma: no cover - python-dotenv is optional at runtime
+    pass
+
+def _int_env(name: str, default: int) -> int:
+    """Read an integer environment variable, falling back to ``default``."""
+    value = os.getenv(name)
+    return int(value) if value else default
+
+# Rows per chunk when a CSV upload is read incrementally
+BULK_CHUNK_SIZE = _int_env("GRATIFY_BULK_CHUNK_SIZE", 50_000)
+
+# CSV uploads larger than this many bytes are always read in chunks
+BULK_CHUNKED_THRESHOLD_BYTES = _int_env("GRATIFY_BULK_CHUNKED_THRESHOLD_BYTES", 8 * 1024 * 1024)
+
+# CSV uploads up to this many bytes are read without pandas (0 disables the fast path).
+# Per-row reading wins on small files; pandas' vectorized parsing wins on large ones.
+CSV_FAST_PATH_MAX_BYTES = _int_env("GRATIFY_CSV_FAST_PATH_MAX_BYTES", 128 * 1024)
+
+# Worksheet read from Excel uploads (empty for the first sheet), and the 1-based row
+# holding its column names
+XLSX_SHEET = os.getenv("GRATIFY_XLSX_SHEET") or None
+XLSX_HEADER_ROW = _int_env("GRATIFY_XLSX_HEADER_ROW", 1)
+
+# Most dates a liability projection may be computed for
+PROJECTION_MAX_DATES = _int_env("GRATIFY_PROJECTION_MAX_DATES", 1200)
+
+# Most employee x date liabilities a projection returns per employee; larger projections
+# are rejected unless only totals are requested (0 disables)
+PROJECTION_MAX_CELLS = _int_env("GRATIFY_PROJECTION_MAX_CELLS", 5_000_000)
+
+# Scenarios accepted in one what-if request
+SCENARIO_MAX_COUNT = _int_env("GRATIFY_SCENARIO_MAX_COUNT", 200)
+
+# Prepared workforces kept for further what-if requests, and how long each stays cached
+SCENARIO_CACHE_SIZE = _int_env("GRATIFY_SCENARIO_CACHE_SIZE", 8)
+SCENARIO_CACHE_TTL_SECONDS = _int_env("GRATIFY_SCENARIO_CACHE_TTL_SECONDS", 1800)
+
+# Worker threads that process asynchronous bulk jobs
+BULK_JOB_WORKERS = _int_env("GRATIFY_BULK_JOB_WORKERS", 2)
+
+# Bulk jobs allowed to be queued or running before new ones are rejected with a 503
+# (0 disables)
+BULK_JOB_MAX_QUEUED = _int_env("GRATIFY_BULK_JOB_MAX_QUEUED", 16)
+
+# Seconds a finished bulk job and its result are kept before they are deleted (0 keeps
+# them forever)
+BULK_JOB_TTL_SECONDS = _int_env("GRATIFY_BULK_JOB_TTL_SECONDS", 24 * 60 * 60)
+
+# Where job state and results are kept: "sqlite" or "filesystem"
+BULK_JOB_STORE = os.getenv("GRATIFY_BULK_JOB_STORE", "sqlite")
+
+# Directory for the job store and uploaded files waiting to be processed
+BULK_JOB_DIR = os.getenv("GRATIFY_BULK_JOB_DIR", os.path.join(tempfile.gettempdir(), "gratify-jobs"))
+
+# Directory for the database of stored bulk datasets used for incremental recalculation
+DATASET_DIR = os.getenv("GRATIFY_DATASET_DIR", os.path.join(tempfile.gettempdir(), "gratify-datasets"))
+
+# Most rows returned in one page of a stored dataset's results
+DATASET_PAGE_MAX_ROWS = _int_env("GRATIFY_DATASET_PAGE_MAX_ROWS", 1000)
+
+# Executor for CPU-bound parsing and calculation: "thread", "process" or "inline"
+# ("inline" runs on the event loop, which only suits single-request serverless workers)
+CPU_EXECUTOR = os.getenv("GRATIFY_CPU_EXECUTOR", "thread")
+
+# Worker threads/processes in the CPU executor
+CPU_EXECUTOR_WORKERS = _int_env("GRATIFY_CPU_EXECUTOR_WORKERS", min(4, os.cpu_count() or 1))
+
+# CPU tasks allowed to be running or waiting before new work is rejected with a 503
+CPU_EXECUTOR_MAX_PENDING = _int_env("GRATIFY_CPU_EXECUTOR_MAX_PENDING", 16)
+
+# Largest request body accepted by the bulk upload endpoints, in bytes (0 disables)
+BULK_MAX_UPLOAD_BYTES = _int_env("GRATIFY_BULK_MAX_UPLOAD_BYTES", 256 * 1024 * 1024)
+
+# Bulk requests handled at once per process before new ones are rejected with a 503
+# (0 disables)
+BULK_MAX_CONCURRENT_REQUESTS = _int_env("GRATIFY_BULK_MAX_CONCURRENT_REQUESTS", 8)
+
+# Uploaded files larger than this many bytes are spooled to a temporary file on disk
+UPLOAD_SPOOL_MAX_BYTES = _int_env("GRATIFY_UPLOAD_SPOOL_MAX_BYTES", 1024 * 1024)
+
+# Seconds clients are asked to wait before retrying a rejected request
+RETRY_AFTER_SECONDS = _int_env("GRATIFY_RETRY_AFTER_SECONDS", 5)
+
+# Worker processes for sharded bulk calculation (1 computes sequentially)
+BULK_PARALLEL_WORKERS = _int_env("GRATIFY_BULK_PARALLEL_WORKERS", 1)
+
+# Employees per shard when bulk calculation runs in parallel
+BULK_SHARD_SIZE = _int_env("GRATIFY_BULK_SHARD_SIZE", 50_000)
+
+# Distinct (joining_date, leaving_date) pairs kept in the years-of-service cache
+YEARS_OF_SERVICE_CACHE_SIZE = _int_env("GRATIFY_YEARS_OF_SERVICE_CACHE_SIZE", 65_536)
+
+# Entries kept in the /calculator/individual result cache, and how long each stays valid
+INDIVIDUAL_CACHE_SIZE = _int_env("GRATIFY_INDIVIDUAL_CACHE_SIZE", 4096)
+INDIVIDUAL_CACHE_TTL_SECONDS = _int_env("GRATIFY_INDIVIDUAL_CACHE_TTL_SECONDS", 300)
+
+# Collect per-stage timings, row counters and request metrics for /metrics (0 disables)
+METRICS_ENABLED = _int_env("GRATIFY_METRICS_ENABLED", 1) != 0
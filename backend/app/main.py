@@ -1,6 +1,14 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from .api import calculator_router
+from fastapi.responses import JSONResponse
+from .api import calculator_router, metrics_router
+from .config import RETRY_AFTER_SECONDS
+from .services.executor import ExecutorBusyError
+from .services.limits import BulkLimitMiddleware, configure_upload_spooling
+from .services.metrics import MetricsMiddleware
+
+# Write uploaded files beyond UPLOAD_SPOOL_MAX_BYTES to a temporary file instead of holding them in memory
+configure_upload_spooling()
 
 app = FastAPI(
     title="Gratify Pro API",
@@ -8,6 +16,10 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# Reject oversized bulk uploads and bulk requests beyond the per-process limit; added
+# first so the CORS and metrics middleware also see its responses
+app.add_middleware(BulkLimitMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -21,8 +33,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Count and time every request for /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(calculator_router)
+app.include_router(metrics_router)
+
+@app.exception_handler(ExecutorBusyError)
+async def executor_busy_handler(request: Request, exc: ExecutorBusyError):
+    """
+    Reject work with 503 when the CPU executor queue is full, asking clients to retry later.
+    """
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+    )
 
 @app.get("/")
 async def root():
@@ -2,13 +2,28 @@
 Schemas package for Pydantic models.
 """
 
-from .calculator import IndividualCalculatorInput, GratuityResult, BulkCalculatorInput, BulkCalculationResult, EmployeeType, TerminationReason
+from .calculator import IndividualCalculatorInput, GratuityResult, BulkCalculatorInput, BulkCalculationResult, BulkCalculationSummary, GroupAggregate, HistogramBin, BulkAggregation, DatasetSummary, DatasetUpdate, DatasetResultPage, EmployeeLiability, LiabilityProjection, Scenario, ScenarioRequest, ScenarioResult, ScenarioAnalysis, BulkJob, BulkJobStatus, EmployeeType, TerminationReason
 
 __all__ = [
     "IndividualCalculatorInput",
     "GratuityResult",
     "BulkCalculatorInput",
     "BulkCalculationResult",
+    "BulkCalculationSummary",
+    "GroupAggregate",
+    "HistogramBin",
+    "BulkAggregation",
+    "DatasetSummary",
+    "DatasetUpdate",
+    "DatasetResultPage",
+    "EmployeeLiability",
+    "LiabilityProjection",
+    "Scenario",
+    "ScenarioRequest",
+    "ScenarioResult",
+    "ScenarioAnalysis",
+    "BulkJob",
+    "BulkJobStatus",
     "EmployeeType",
     "TerminationReason"
 ] 
\ No newline at end of file
@@ -1,5 +1,5 @@
-from datetime import date
-from typing import Optional, List
+from datetime import date, datetime
+from typing import Optional, List, Any, Dict
 from pydantic import BaseModel, Field, validator
 from decimal import Decimal
 from enum import Enum
@@ -64,4 +64,167 @@ class BulkCalculationResult(BaseModel):
     results: List[GratuityResult]
     total_gratuity_amount: Decimal
     eligible_count: int
-    ineligible_count: int 
\ No newline at end of file
+    ineligible_count: int 
+
+class BulkCalculationSummary(BaseModel):
+    """
+    Schema for the summary statistics of a bulk calculation without per-employee results.
+    """
+    total_gratuity_amount: Decimal
+    eligible_count: int
+    ineligible_count: int
+
+class DatasetSummary(BaseModel):
+    """
+    Schema for the current totals of a stored bulk dataset.
+    """
+    dataset_id: str
+    row_count: int
+    total_gratuity_amount: Decimal
+    eligible_count: int
+    ineligible_count: int
+    created_at: datetime
+    updated_at: datetime
+
+class DatasetUpdate(BaseModel):
+    """
+    Schema for the result of uploading a new version of a bulk dataset.
+    
+    Only rows whose inputs changed are recalculated; ``added`` and ``removed`` hold their
+    results, and the totals are those of the whole dataset after the update.
+    """
+    dataset_id: str
+    row_count: int
+    added_count: int
+    removed_count: int
+    unchanged_count: int
+    full_recalculation: bool = Field(description="Whether every row was calculated, as on the first upload")
+    total_gratuity_amount: Decimal
+    eligible_count: int
+    ineligible_count: int
+    added: List[GratuityResult]
+    removed: List[GratuityResult]
+
+class DatasetResultPage(BaseModel):
+    """
+    Schema for one page of a stored bulk dataset's results.
+    """
+    dataset_id: str
+    total_count: Optional[int] = Field(
+        default=None,
+        description="Rows matching the filters, across all pages; only returned on the first page (requested without a cursor)"
+    )
+    results: List[GratuityResult]
+    next_cursor: Optional[str] = Field(default=None, description="Cursor of the next page; null on the last page")
+
+class EmployeeLiability(BaseModel):
+    """
+    Schema for one employee's projected gratuity liability on every projection date.
+    """
+    employee_name: str
+    liabilities: List[Decimal]
+
+class LiabilityProjection(BaseModel):
+    """
+    Schema for the gratuity liability of a workforce projected over a grid of dates.
+    
+    Every list has one entry per date in ``dates``.
+    """
+    dates: List[date]
+    total_liability: List[Decimal]
+    employee_count: List[int] = Field(description="Employees who have joined and not yet left on each date")
+    eligible_count: List[int] = Field(description="Employees who would be owed gratuity on leaving on each date")
+    employees: Optional[List[EmployeeLiability]] = Field(default=None, description="Per-employee liabilities, in file order")
+
+class Scenario(BaseModel):
+    """
+    Schema for one set of alternative gratuity parameters; omitted values keep the current rules.
+    """
+    name: str = Field(..., max_length=200)
+    max_gratuity: Optional[Decimal] = Field(default=None, gt=0, le=10**9, decimal_places=2, description="Gratuity cap in rupees")
+    salary_increase_percent: Decimal = Field(default=Decimal(0), ge=-100, le=1000, decimal_places=2, description="Assumed increase applied to every last drawn salary")
+    standard_denominator: int = Field(default=26, ge=1, le=365)
+    non_covered_denominator: int = Field(default=30, ge=1, le=365)
+
+class ScenarioRequest(BaseModel):
+    """
+    Schema for scenarios to evaluate against an already uploaded workforce.
+    """
+    scenarios: List[Scenario]
+
+class ScenarioResult(BaseModel):
+    """
+    Schema for the totals and distribution of gratuity amounts under one scenario.
+    
+    Averages and percentiles are over eligible employees; percentiles use the nearest rank.
+    """
+    name: str
+    total_gratuity_amount: Decimal
+    eligible_count: int
+    capped_count: int
+    average_gratuity_amount: Decimal
+    max_gratuity_amount: Decimal
+    percentiles: Dict[str, Decimal]
+
+class ScenarioAnalysis(BaseModel):
+    """
+    Schema for the results of a what-if analysis of a workforce.
+    """
+    workforce_id: str = Field(description="Id for evaluating further scenarios without uploading the file again")
+    row_count: int
+    eligible_count: int
+    ineligible_count: int
+    baseline: ScenarioResult
+    scenarios: List[ScenarioResult]
+
+class GroupAggregate(BaseModel):
+    """
+    Schema for the totals of one group of bulk results.
+    """
+    key: str
+    count: int
+    eligible_count: int
+    total_gratuity_amount: Decimal
+
+class HistogramBin(BaseModel):
+    """
+    Schema for one histogram bin, counting values from ``lower`` up to (excluding) ``upper``.
+    """
+    lower: float
+    upper: Optional[float] = Field(default=None, description="Exclusive upper edge; null for the last, open-ended bin")
+    count: int
+
+class BulkAggregation(BaseModel):
+    """
+    Schema for grouped summary statistics of a bulk calculation, without per-employee results.
+    """
+    row_count: int
+    total_gratuity_amount: Decimal
+    eligible_count: int
+    ineligible_count: int
+    capped_count: int = Field(description="Employees whose gratuity was capped at the maximum limit")
+    by_employee_type: List[GroupAggregate]
+    by_termination_reason: List[GroupAggregate]
+    by_leaving_year: List[GroupAggregate]
+    salary_histogram: List[HistogramBin] = Field(description="Employees by last drawn salary in rupees")
+    service_histogram: List[HistogramBin] = Field(description="Employees by rounded years of service")
+
+class BulkJobStatus(str, Enum):
+    """Lifecycle states of an asynchronous bulk calculation job"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class BulkJob(BaseModel):
+    """
+    Schema for the state of an asynchronous bulk calculation job.
+    """
+    job_id: str
+    status: BulkJobStatus
+    filename: str
+    rows_processed: int = 0
+    created_at: datetime
+    updated_at: datetime
+    error: Optional[Any] = Field(default=None, description="Error detail when the job failed")
+    result: Optional[BulkCalculationResult] = Field(default=None, description="Results once the job has completed")
\ No newline at end of file
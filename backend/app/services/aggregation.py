@@ -0,0 +1,135 @@
+"""
+Grouped aggregations of bulk results.
+
+The bulk response only carries the overall total and eligible/ineligible counts, so any
+other breakdown used to need every result row. :class:`BulkAggregator` folds results
+into sums and counts by employee type, termination reason and leaving year, the number
+of capped amounts, and salary and service histograms. It reads the columns of
+:class:`ResultColumns` directly as NumPy arrays, chunk by chunk, so a summary of a large
+file is built in the same pass as its calculation without keeping any rows.
+"""
+
+from typing import Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+from ..schemas.calculator import EmployeeType, TerminationReason
+from .bulk import BulkTotals, iter_bulk_gratuity_chunks
+from .calculator import MAX_GRATUITY_PAISE
+from .fixed_point import paise_to_decimal
+from .results import ResultColumns
+
+# Lower edges of the salary histogram bins in rupees; the last bin is open-ended
+SALARY_BIN_EDGES = (0, 10_000, 25_000, 50_000, 75_000, 100_000, 150_000, 200_000, 300_000, 500_000, 1_000_000)
+
+# Lower edges of the years-of-service histogram bins; the last bin is open-ended
+SERVICE_BIN_EDGES = (0, 5, 10, 15, 20, 25, 30, 35, 40)
+
+_EMPLOYEE_TYPES = list(EmployeeType)
+_TERMINATION_REASONS = list(TerminationReason)
+
+def _codes(column: List, members: List) -> np.ndarray:
+    """Position of every enum member of ``column`` in ``members``."""
+    positions = {member: i for i, member in enumerate(members)}
+    return np.fromiter(map(positions.__getitem__, column), dtype=np.int64, count=len(column))
+
+def _salary_values(column) -> np.ndarray:
+    """A salary column of :class:`ResultColumns` (numbers or Decimals) as float64."""
+    if hasattr(column, "typecode"):
+        return np.frombuffer(column, dtype=np.dtype(column.typecode)).astype(np.float64)
+    return np.array([float(value) for value in column], dtype=np.float64)
+
+def _histogram(values: np.ndarray, edges) -> np.ndarray:
+    return np.bincount(np.searchsorted(edges, values, side="right") - 1, minlength=len(edges))
+
+class _Groups:
+    """Row count, eligible count and gratuity paise per group key."""
+
+    def __init__(self):
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.values = np.zeros((0, 3), dtype=np.int64)
+
+    def add(self, keys: np.ndarray, eligible: np.ndarray, gratuity: np.ndarray) -> None:
+        combined = np.concatenate([self.keys, keys])
+        unique, inverse = np.unique(combined, return_inverse=True)
+        values = np.zeros((len(unique), 3), dtype=np.int64)
+        np.add.at(values, inverse[:len(self.keys)], self.values)
+        np.add.at(values, inverse[len(self.keys):], np.column_stack([np.ones(len(keys), dtype=np.int64), eligible, gratuity]))
+        self.keys, self.values = unique, values
+
+    def as_list(self, label) -> List[Dict]:
+        return [
+            {
+                "key": label(key),
+                "count": count,
+                "eligible_count": eligible_count,
+                "total_gratuity_amount": paise_to_decimal(paise)
+            }
+            for key, (count, eligible_count, paise) in zip(self.keys.tolist(), self.values.tolist())
+        ]
+
+class BulkAggregator:
+    """
+    Running grouped aggregations over bulk results added chunk by chunk.
+    """
+
+    def __init__(self):
+        self.totals = BulkTotals()
+        self.capped_count = 0
+        self.by_employee_type = _Groups()
+        self.by_termination_reason = _Groups()
+        self.by_leaving_year = _Groups()
+        self.salary_counts = np.zeros(len(SALARY_BIN_EDGES), dtype=np.int64)
+        self.service_counts = np.zeros(len(SERVICE_BIN_EDGES), dtype=np.int64)
+
+    def add(self, chunk_result: Dict) -> None:
+        """Fold one bulk result (as returned by ``calculate_bulk_gratuity``) into the aggregates."""
+        results = chunk_result["results"]
+        if not isinstance(results, ResultColumns):
+            results = ResultColumns.from_records(results)
+        self.totals.add(chunk_result)
+        if not len(results):
+            return
+
+        gratuity = np.frombuffer(results.gratuity_paise, dtype=np.int64)
+        eligible = np.frombuffer(results.is_eligible, dtype=np.int8).astype(np.int64)
+        years = np.frombuffer(results.years_of_service, dtype=np.int64)
+        leaving_year = np.frombuffer(results.leaving_date, dtype=np.int32).astype("datetime64[D]").astype("datetime64[Y]").astype(np.int64) + 1970
+
+        self.capped_count += int(np.count_nonzero(gratuity >= MAX_GRATUITY_PAISE))
+        self.by_employee_type.add(_codes(results.employee_type, _EMPLOYEE_TYPES), eligible, gratuity)
+        self.by_termination_reason.add(_codes(results.termination_reason, _TERMINATION_REASONS), eligible, gratuity)
+        self.by_leaving_year.add(leaving_year, eligible, gratuity)
+        self.salary_counts += _histogram(_salary_values(results.last_drawn_salary), SALARY_BIN_EDGES)
+        self.service_counts += _histogram(years, SERVICE_BIN_EDGES)
+
+    def as_dict(self) -> Dict:
+        """Return the aggregates as a :class:`BulkAggregation` dict."""
+        totals = self.totals.as_dict()
+        return {
+            "row_count": totals["eligible_count"] + totals["ineligible_count"],
+            **totals,
+            "capped_count": self.capped_count,
+            "by_employee_type": self.by_employee_type.as_list(lambda code: _EMPLOYEE_TYPES[code].value),
+            "by_termination_reason": self.by_termination_reason.as_list(lambda code: _TERMINATION_REASONS[code].value),
+            "by_leaving_year": self.by_leaving_year.as_list(str),
+            "salary_histogram": _bins(SALARY_BIN_EDGES, self.salary_counts),
+            "service_histogram": _bins(SERVICE_BIN_EDGES, self.service_counts)
+        }
+
+def _bins(edges, counts: np.ndarray) -> List[Dict]:
+    uppers = list(edges[1:]) + [None]
+    return [{"lower": lower, "upper": upper, "count": count} for lower, upper, count in zip(edges, uppers, counts.tolist())]
+
+def aggregate_bulk_gratuity(chunks: Iterable[pd.DataFrame]) -> Dict:
+    """
+    Calculate a workforce delivered as normalized chunks and return only its aggregates.
+
+    Each chunk's results are folded into a :class:`BulkAggregator` and dropped, so memory
+    does not grow with the size of the file.
+    """
+    aggregator = BulkAggregator()
+    for chunk_result in iter_bulk_gratuity_chunks(chunks, BulkTotals()):
+        aggregator.add(chunk_result)
+    return aggregator.as_dict()
@@ -0,0 +1,188 @@
+"""
+Apache Parquet and Arrow IPC input and output.
+
+Both formats carry typed columns, so an upload with date and decimal columns needs no
+per-value date or number parsing, and Arrow IPC files are read straight from a
+memory-mapped upload without copying. Results are written with the same types:
+``date32`` dates, ``decimal128(20, 2)`` gratuity amounts built from the paise column of
+:class:`ResultColumns`, and dictionary-encoded enum columns.
+
+pyarrow is an optional dependency; use :func:`app.services.bulk_input.load_arrow_io` to
+import this module so a missing install is reported as a 400 instead of a 500.
+"""
+
+import mmap
+import tempfile
+from typing import BinaryIO, Dict, Iterable, Iterator
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from ..schemas.calculator import EmployeeType, TerminationReason
+from .aggregation import _codes, _salary_values
+from .bulk_input import BulkInputError
+from .metrics import stage
+from .results import ResultColumns
+
+_EMPLOYEE_TYPES = list(EmployeeType)
+_TERMINATION_REASONS = list(TerminationReason)
+
+_ENUM_TYPE = pa.dictionary(pa.int8(), pa.string())
+
+# Columns of an exported Parquet or Arrow file, in the order of export.EXPORT_COLUMNS
+RESULT_SCHEMA = pa.schema([
+    ("employee_name", pa.string()),
+    ("joining_date", pa.date32()),
+    ("leaving_date", pa.date32()),
+    ("last_drawn_salary", pa.float64()),
+    ("years_of_service", pa.int64()),
+    ("gratuity_amount", pa.decimal128(20, 2)),
+    ("employee_type", _ENUM_TYPE),
+    ("termination_reason", _ENUM_TYPE),
+    ("is_eligible", pa.bool_()),
+    ("message", pa.string()),
+])
+
+PARSE_ERROR = "Error parsing file. Please ensure the file is properly formatted."
+
+def _source_buffer(source: BinaryIO) -> pa.Buffer:
+    """
+    Wrap an upload in an Arrow buffer without copying it.
+
+    Files on disk (including spooled uploads, which are rolled over to disk) are
+    memory-mapped; in-memory ``BytesIO`` uploads are exposed through their buffer.
+    """
+    source.seek(0)
+    try:
+        fileno = source.fileno()
+    except (AttributeError, OSError, ValueError):
+        return pa.py_buffer(source.getbuffer())
+    try:
+        return pa.py_buffer(mmap.mmap(fileno, 0, access=mmap.ACCESS_READ))
+    except ValueError:
+        # Empty files cannot be mapped
+        raise BulkInputError(PARSE_ERROR)
+
+def _iter_batches(buffer: pa.Buffer, file_extension: str, chunk_size: int) -> Iterator[pa.RecordBatch]:
+    if file_extension == "parquet":
+        yield from pq.ParquetFile(pa.BufferReader(buffer)).iter_batches(batch_size=chunk_size)
+        return
+
+    try:
+        reader = ipc.open_file(buffer)
+        batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+    except pa.ArrowInvalid:
+        # Not the random-access file format; try the streaming format
+        batches = ipc.open_stream(buffer)
+    for batch in batches:
+        # Batch sizes are chosen by the writer; slices share the batch's memory
+        for start in range(0, batch.num_rows, chunk_size):
+            yield batch.slice(start, chunk_size)
+
+def _batch_frame(batch: pa.RecordBatch) -> pd.DataFrame:
+    """
+    Convert a record batch to the raw DataFrame ``prepare_employee_frame`` expects.
+
+    Dictionary columns are decoded, decimals become float64 (the salary type of a parsed
+    CSV) and time zones are dropped in Arrow; dates arrive as ``datetime64`` columns.
+    Decimals go through their text form, which rounds to the same float as reading the
+    number from a CSV file; a direct cast can be off by one unit in the last place.
+    """
+    columns = []
+    for column in batch.columns:
+        if pa.types.is_dictionary(column.type):
+            column = column.dictionary_decode()
+        if pa.types.is_decimal(column.type):
+            column = column.cast(pa.string()).cast(pa.float64())
+        elif pa.types.is_timestamp(column.type) and column.type.tz is not None:
+            column = column.cast(pa.timestamp(column.type.unit))
+        columns.append(column)
+    return pa.RecordBatch.from_arrays(columns, names=batch.schema.names).to_pandas(date_as_object=False)
+
+def read_arrow_chunks(source: BinaryIO, file_extension: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """
+    Read a Parquet or Arrow IPC (Feather v2) upload ``chunk_size`` rows at a time.
+
+    Parquet files are decoded one batch at a time; Arrow files are memory-mapped and
+    sliced, so only the converted chunk is held in memory.
+    """
+    buffer = _source_buffer(source)
+    batches = _iter_batches(buffer, file_extension, chunk_size)
+    while True:
+        with stage("parse"):
+            try:
+                batch = next(batches, None)
+                frame = None if batch is None else _batch_frame(batch)
+            except (pa.ArrowException, OSError):
+                raise BulkInputError(PARSE_ERROR)
+        if frame is None:
+            return
+        yield frame
+
+def _enum_array(column, members) -> pa.DictionaryArray:
+    indices = pa.array(_codes(column, members).astype(np.int8))
+    return pa.DictionaryArray.from_arrays(indices, pa.array([member.value for member in members]))
+
+def _fixed_width_array(arrow_type: pa.DataType, column) -> pa.Array:
+    """Wrap a stdlib ``array`` column whose layout matches ``arrow_type`` without copying."""
+    return pa.Array.from_buffers(arrow_type, len(column), [None, pa.py_buffer(column)])
+
+def _paise_decimal_array(paise) -> pa.Array:
+    """Paise as ``decimal128(20, 2)``, whose 128-bit values are simply the paise."""
+    values = np.frombuffer(paise, dtype=np.int64)
+    words = np.empty((len(values), 2), dtype=np.int64)
+    words[:, 0] = values
+    words[:, 1] = values >> 63
+    return pa.Array.from_buffers(RESULT_SCHEMA.field("gratuity_amount").type, len(values), [None, pa.py_buffer(words)])
+
+def results_record_batch(results) -> pa.RecordBatch:
+    """Convert bulk results (a :class:`ResultColumns` or list of result dicts) to a record batch."""
+    if not isinstance(results, ResultColumns):
+        results = ResultColumns.from_records(results)
+    return pa.RecordBatch.from_arrays([
+        pa.array(results.employee_name, pa.string()),
+        _fixed_width_array(pa.date32(), results.joining_date),
+        _fixed_width_array(pa.date32(), results.leaving_date),
+        pa.array(_salary_values(results.last_drawn_salary)),
+        _fixed_width_array(pa.int64(), results.years_of_service),
+        _paise_decimal_array(results.gratuity_paise),
+        _enum_array(results.employee_type, _EMPLOYEE_TYPES),
+        _enum_array(results.termination_reason, _TERMINATION_REASONS),
+        pa.array(np.frombuffer(results.is_eligible, dtype=np.int8).astype(bool)),
+        pa.array(results.message, pa.string()),
+    ], schema=RESULT_SCHEMA)
+
+def write_results_arrow(chunk_results: Iterable[Dict], target: BinaryIO, file_type: str) -> None:
+    """
+    Write bulk results to ``target`` as a Parquet file or an Arrow IPC file.
+
+    Each chunk becomes one row group or record batch, so only one chunk of results is
+    converted at a time.
+    """
+    if file_type == "parquet":
+        writer = pq.ParquetWriter(target, RESULT_SCHEMA)
+    else:
+        writer = ipc.new_file(target, RESULT_SCHEMA)
+
+    with writer:
+        for chunk_result in chunk_results:
+            with stage("serialization"):
+                writer.write_batch(results_record_batch(chunk_result["results"]))
+
+def build_results_arrow(chunk_results: Iterable[Dict], file_type: str) -> BinaryIO:
+    """
+    Write a Parquet or Arrow export to an anonymous temporary file on disk.
+
+    Returns the open file positioned at the start; it is deleted once closed.
+    """
+    target = tempfile.TemporaryFile()
+    try:
+        write_results_arrow(chunk_results, target, file_type)
+    except BaseException:
+        target.close()
+        raise
+    target.seek(0)
+    return target
@@ -0,0 +1,98 @@
+"""
+Chunked bulk calculation.
+
+Computes a workforce one chunk at a time and keeps running totals, so the upload never
+has to be parsed into a single DataFrame.
+"""
+
+import json
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator
+
+import pandas as pd
+
+from ..schemas.calculator import BulkCalculationSummary
+from .calculator import calculate_bulk_gratuity
+from .ingestion import BulkInputError
+from .metrics import observe_upload_rows, stage
+from .results import concat_results, iter_result_json
+
+class BulkTotals:
+    """
+    Running summary statistics for a bulk calculation computed in chunks.
+    """
+
+    def __init__(self):
+        self.total_gratuity_amount = Decimal('0.00')
+        self.eligible_count = 0
+        self.ineligible_count = 0
+
+    def add(self, chunk_result: Dict) -> None:
+        """Fold the totals of one chunk's bulk result into the running totals."""
+        self.total_gratuity_amount += chunk_result["total_gratuity_amount"]
+        self.eligible_count += chunk_result["eligible_count"]
+        self.ineligible_count += chunk_result["ineligible_count"]
+
+    @property
+    def row_count(self) -> int:
+        return self.eligible_count + self.ineligible_count
+
+    def as_dict(self) -> Dict:
+        return {
+            "total_gratuity_amount": self.total_gratuity_amount,
+            "eligible_count": self.eligible_count,
+            "ineligible_count": self.ineligible_count
+        }
+
+def iter_bulk_gratuity_chunks(chunks: Iterable[pd.DataFrame], totals: BulkTotals) -> Iterator[Dict]:
+    """
+    Calculate each normalized chunk and yield its bulk result.
+
+    ``totals`` is updated as every chunk is computed, so once the iterator is exhausted
+    it holds the summary for the whole workforce.
+    """
+    for chunk in chunks:
+        chunk_result = calculate_bulk_gratuity(chunk)
+        totals.add(chunk_result)
+        yield chunk_result
+
+def calculate_bulk_gratuity_chunked(chunks: Iterable[pd.DataFrame]) -> Dict:
+    """
+    Calculate gratuity for a workforce delivered as normalized chunks.
+
+    Returns the same structure as :func:`app.services.calculator.calculate_bulk_gratuity`.
+    """
+    totals = BulkTotals()
+    results = concat_results(chunk_result["results"] for chunk_result in iter_bulk_gratuity_chunks(chunks, totals))
+
+    return {"results": results, **totals.as_dict()}
+
+def iter_bulk_gratuity_ndjson(chunks: Iterable[pd.DataFrame]) -> Iterator[bytes]:
+    """
+    Calculate a workforce chunk by chunk and yield newline-delimited JSON.
+
+    Each employee is written as one :class:`GratuityResult` line as soon as its chunk is
+    computed, followed by a final ``{"summary": {...}}`` line with the totals. If a later
+    chunk turns out to be invalid, an ``{"error": ...}`` line is written instead of the
+    summary, since the response status has already been sent.
+    """
+    totals = BulkTotals()
+
+    try:
+        for chunk_result in iter_bulk_gratuity_chunks(chunks, totals):
+            with stage("serialization"):
+                lines = list(iter_result_json(chunk_result["results"]))
+                block = ("\n".join(lines) + "\n").encode("utf-8") if lines else None
+            if block:
+                yield block
+    except BulkInputError as e:
+        yield (json.dumps({"error": e.detail}) + "\n").encode("utf-8")
+        return
+    except (pd.errors.ParserError, UnicodeDecodeError):
+        error = "Error parsing file. Please ensure the file is properly formatted."
+        yield (json.dumps({"error": error}) + "\n").encode("utf-8")
+        return
+
+    observe_upload_rows(totals.row_count)
+    summary = BulkCalculationSummary(**totals.as_dict()).model_dump_json()
+    yield ('{"summary":' + summary + '}\n').encode("utf-8")
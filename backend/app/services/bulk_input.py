@@ -0,0 +1,52 @@
+"""
+The bulk upload format shared by the pandas and pandas-free readers.
+
+Kept free of heavy imports so the lightweight CSV path does not load pandas.
+"""
+
+from typing import Dict, List, Union
+
+REQUIRED_COLUMNS = ["employee_name", "joining_date", "leaving_date", "last_drawn_salary"]
+OPTIONAL_COLUMNS = ["employee_type", "termination_reason"]
+
+# Spreadsheet row number of the first data row (row 1 is the header)
+FIRST_DATA_ROW = 2
+
+# Columnar upload formats read with the optional pyarrow package
+ARROW_EXTENSIONS = ("parquet", "arrow", "feather")
+
+class BulkInputError(ValueError):
+    """
+    Raised when an uploaded workforce file cannot be used for calculation.
+
+    ``detail`` is suitable for an HTTP error response: a plain message for file-level
+    problems, or a message plus the list of row errors for invalid rows.
+    """
+
+    def __init__(self, message: str, errors: List[Dict] = None):
+        super().__init__(message)
+        self.message = message
+        self.errors = errors or []
+
+    @property
+    def detail(self) -> Union[str, Dict]:
+        if not self.errors:
+            return self.message
+        return {"message": self.message, "errors": self.errors}
+
+def enum_error(enum_cls) -> str:
+    """Error text listing the allowed values of an enum, in the style of Pydantic."""
+    values = [f"'{member.value}'" for member in enum_cls]
+    return f"Input should be {', '.join(values[:-1])} or {values[-1]}"
+
+def load_arrow_io():
+    """
+    Import :mod:`app.services.arrow_io`, which needs the optional pyarrow package.
+
+    Raises :class:`BulkInputError` when pyarrow is not installed.
+    """
+    try:
+        from . import arrow_io
+    except ImportError:
+        raise BulkInputError("Parquet and Arrow files are not supported: pyarrow is not installed")
+    return arrow_io
@@ -1,11 +1,64 @@
+import calendar
 from datetime import date
 from decimal import Decimal, ROUND_HALF_UP
+from functools import lru_cache
 from dateutil.relativedelta import relativedelta
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple, Union
 from ..schemas.calculator import EmployeeType, TerminationReason, IndividualCalculatorInput, GratuityResult
+from ..config import BULK_SHARD_SIZE, YEARS_OF_SERVICE_CACHE_SIZE, INDIVIDUAL_CACHE_SIZE, INDIVIDUAL_CACHE_TTL_SECONDS
+from .cache import TTLCache
+from .fixed_point import STANDARD_DENOMINATOR, NON_COVERED_DENOMINATOR, gratuity_paise, paise_to_decimal, rupees_to_paise
+from .metrics import stage, count_rows
+from .results import ResultColumns
 
 # Constants
 MAX_GRATUITY_LIMIT = Decimal('2000000.00')  # ₹20 lakh maximum gratuity limit
+MAX_GRATUITY_PAISE = rupees_to_paise(MAX_GRATUITY_LIMIT)
+
+# Days per month in a common year, indexed by month number
+_MONTH_LENGTHS = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+def _days_in_month(year: int, month: int) -> int:
+    # calendar.monthrange() also computes the first weekday, which is the slow part
+    if month == 2 and calendar.isleap(year):
+        return 29
+    return _MONTH_LENGTHS[month]
+
+def _service_period(joining_date: date, leaving_date: date) -> Tuple[int, int, int]:
+    """
+    Integer equivalent of ``relativedelta(leaving_date, joining_date)`` for
+    ``leaving_date >= joining_date``, returned as (years, months, days).
+    
+    Counts whole months between the dates, steps back one month if the monthly anniversary
+    (clamped to the month's length, as relativedelta does) has not been reached yet, and
+    takes the remaining days from the date ordinals.
+    """
+    months = (leaving_date.year - joining_date.year) * 12 + leaving_date.month - joining_date.month
+    anniversary_day = min(joining_date.day, _days_in_month(leaving_date.year, leaving_date.month))
+    
+    if leaving_date.day < anniversary_day:
+        months -= 1
+    
+    anniversary_year, anniversary_month = divmod(joining_date.year * 12 + joining_date.month - 1 + months, 12)
+    anniversary_month += 1
+    anniversary = date(
+        anniversary_year,
+        anniversary_month,
+        min(joining_date.day, _days_in_month(anniversary_year, anniversary_month))
+    )
+    
+    years, months = divmod(months, 12)
+    return years, months, leaving_date.toordinal() - anniversary.toordinal()
+
+@lru_cache(maxsize=YEARS_OF_SERVICE_CACHE_SIZE)
+def _cached_years_of_service(joining_date: date, leaving_date: date) -> int:
+    years, months, days = _service_period(joining_date, leaving_date)
+    
+    # Check if months are 6 or more, round up to next year
+    if months >= 6 or (months == 5 and days >= 30):
+        years += 1
+    
+    return years
 
 def calculate_years_of_service(joining_date: date, leaving_date: date) -> float:
     """
@@ -14,7 +67,13 @@ def calculate_years_of_service(joining_date: date, leaving_date: date) -> float:
     
     If service period is less than 6 months, it's ignored.
     If service period is 6 months or more, it's rounded to the next year.
+    
+    Results for plain dates are memoized in a bounded LRU cache, since payroll files
+    repeat the same (joining_date, leaving_date) pairs; see years_of_service_cache_stats().
     """
+    if type(joining_date) is date and type(leaving_date) is date and leaving_date >= joining_date:
+        return _cached_years_of_service(joining_date, leaving_date)
+    
     delta = relativedelta(leaving_date, joining_date)
     years = delta.years
     
@@ -24,6 +83,17 @@ def calculate_years_of_service(joining_date: date, leaving_date: date) -> float:
         
     return years
 
+def years_of_service_cache_stats() -> Dict[str, int]:
+    """
+    Return hit/miss counters and occupancy of the years-of-service cache.
+    """
+    info = _cached_years_of_service.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "maxsize": info.maxsize}
+
+def clear_years_of_service_cache() -> None:
+    """Empty the years-of-service cache and reset its counters."""
+    _cached_years_of_service.cache_clear()
+
 def is_eligible_for_gratuity(years_of_service: float, termination_reason: TerminationReason) -> bool:
     """
     Check if an employee is eligible for gratuity based on years of service and termination reason.
@@ -73,10 +143,15 @@ def calculate_gratuity_amount(
         return Decimal('0.00')
     
     # Different formulas for different employee types
-    denominator = Decimal('26') if employee_type == EmployeeType.STANDARD else Decimal('30')
+    denominator = STANDARD_DENOMINATOR if employee_type == EmployeeType.STANDARD else NON_COVERED_DENOMINATOR
+    
+    # Exact integer-paise arithmetic; identical to the Decimal formula below wherever it applies
+    paise = gratuity_paise(last_drawn_salary, years_of_service, denominator, MAX_GRATUITY_PAISE)
+    if paise is not None:
+        return paise_to_decimal(paise)
     
     # Calculate gratuity 
-    gratuity = (last_drawn_salary * Decimal(years_of_service) * Decimal('15')) / denominator
+    gratuity = (last_drawn_salary * Decimal(years_of_service) * Decimal('15')) / Decimal(denominator)
     
     # Apply maximum limit
     gratuity = min(gratuity, MAX_GRATUITY_LIMIT)
@@ -84,6 +159,41 @@ def calculate_gratuity_amount(
     # Round to 2 decimal places
     return gratuity.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
 
+def build_result_message(
+    is_eligible: bool,
+    is_capped: bool,
+    employee_type: EmployeeType,
+    termination_reason: TerminationReason
+) -> Optional[str]:
+    """
+    Build the explanatory message attached to a gratuity result.
+    
+    Shared by the scalar and columnar calculation paths so both produce identical text.
+    """
+    message = None
+    if not is_eligible:
+        if termination_reason == TerminationReason.UNKNOWN or termination_reason not in [TerminationReason.DEATH, TerminationReason.DISABILITY]:
+            message = "No gratuity is payable as the service period is less than 5 years."
+    elif is_capped:
+        message = f"Gratuity amount exceeds the maximum limit of ₹{MAX_GRATUITY_LIMIT:,} and has been capped."
+    
+    # Add note about unknown values if present
+    if employee_type == EmployeeType.UNKNOWN or termination_reason == TerminationReason.UNKNOWN:
+        unknown_fields = []
+        if employee_type == EmployeeType.UNKNOWN:
+            unknown_fields.append("employee type")
+        if termination_reason == TerminationReason.UNKNOWN:
+            unknown_fields.append("termination reason")
+        
+        unknown_message = f"Note: {', '.join(unknown_fields)} not specified. Standard calculation applied."
+        
+        if message:
+            message = f"{message} {unknown_message}"
+        else:
+            message = unknown_message
+    
+    return message
+
 def calculate_individual_gratuity(
     employee_name: str,
     joining_date: date,
@@ -117,27 +227,12 @@ def calculate_individual_gratuity(
         termination_reason
     )
     
-    message = None
-    if not is_eligible:
-        if termination_reason == TerminationReason.UNKNOWN or termination_reason not in [TerminationReason.DEATH, TerminationReason.DISABILITY]:
-            message = "No gratuity is payable as the service period is less than 5 years."
-    elif gratuity_amount >= MAX_GRATUITY_LIMIT:
-        message = f"Gratuity amount exceeds the maximum limit of ₹{MAX_GRATUITY_LIMIT:,} and has been capped."
-    
-    # Add note about unknown values if present
-    if employee_type == EmployeeType.UNKNOWN or termination_reason == TerminationReason.UNKNOWN:
-        unknown_fields = []
-        if employee_type == EmployeeType.UNKNOWN:
-            unknown_fields.append("employee type")
-        if termination_reason == TerminationReason.UNKNOWN:
-            unknown_fields.append("termination reason")
-        
-        unknown_message = f"Note: {', '.join(unknown_fields)} not specified. Standard calculation applied."
-        
-        if message:
-            message = f"{message} {unknown_message}"
-        else:
-            message = unknown_message
+    message = build_result_message(
+        is_eligible,
+        gratuity_amount >= MAX_GRATUITY_LIMIT,
+        employee_type,
+        termination_reason
+    )
     
     return {
         "employee_name": employee_name,
@@ -152,19 +247,116 @@ def calculate_individual_gratuity(
         "message": message
     }
 
-def calculate_bulk_gratuity(employees: List[IndividualCalculatorInput]) -> Dict:
+individual_result_cache = TTLCache(maxsize=INDIVIDUAL_CACHE_SIZE, ttl=INDIVIDUAL_CACHE_TTL_SECONDS)
+
+def normalized_input_key(
+    joining_date: date,
+    leaving_date: date,
+    last_drawn_salary: Decimal,
+    employee_type: EmployeeType,
+    termination_reason: TerminationReason
+) -> Tuple:
+    """
+    Key identifying the inputs that determine a gratuity calculation.
+    
+    Unknown employee types and termination reasons are normalized to the standard rules
+    they are calculated with, so e.g. UNKNOWN and STANDARD share an entry.
+    """
+    if employee_type == EmployeeType.UNKNOWN:
+        employee_type = EmployeeType.STANDARD
+    if termination_reason == TerminationReason.UNKNOWN:
+        termination_reason = TerminationReason.RESIGNATION
+    return (joining_date, leaving_date, last_drawn_salary, employee_type, termination_reason)
+
+def calculate_individual_gratuity_cached(
+    employee_name: str,
+    joining_date: date,
+    leaving_date: date,
+    last_drawn_salary: Decimal,
+    employee_type: EmployeeType = EmployeeType.STANDARD,
+    termination_reason: TerminationReason = TerminationReason.RESIGNATION
+) -> Dict:
+    """
+    Calculate gratuity for an individual employee, reusing cached figures.
+    
+    Years of service, eligibility and the gratuity amount are cached under
+    normalized_input_key(); the name and message are filled in per call, so the
+    result is identical to calculate_individual_gratuity().
+    """
+    key = normalized_input_key(joining_date, leaving_date, last_drawn_salary, employee_type, termination_reason)
+    figures = individual_result_cache.get(key)
+    
+    if figures is None:
+        result = calculate_individual_gratuity(
+            employee_name=employee_name,
+            joining_date=joining_date,
+            leaving_date=leaving_date,
+            last_drawn_salary=last_drawn_salary,
+            employee_type=employee_type,
+            termination_reason=termination_reason
+        )
+        individual_result_cache.set(key, (result["years_of_service"], result["is_eligible"], result["gratuity_amount"]))
+        return result
+    
+    years_of_service, is_eligible, gratuity_amount = figures
+    return {
+        "employee_name": employee_name,
+        "joining_date": joining_date,
+        "leaving_date": leaving_date,
+        "last_drawn_salary": last_drawn_salary,
+        "years_of_service": years_of_service,
+        "gratuity_amount": gratuity_amount,
+        "employee_type": employee_type,
+        "termination_reason": termination_reason,
+        "is_eligible": is_eligible,
+        "message": build_result_message(
+            is_eligible,
+            gratuity_amount >= MAX_GRATUITY_LIMIT,
+            employee_type,
+            termination_reason
+        )
+    }
+
+def calculate_bulk_gratuity(
+    employees: Union[List[IndividualCalculatorInput], "pd.DataFrame"],
+    workers: int = 1,
+    shard_size: int = BULK_SHARD_SIZE
+) -> Dict:
     """
     Calculate gratuity for multiple employees.
     
+    Accepts either a list of validated inputs (:class:`IndividualCalculatorInput`, or
+    :class:`app.services.csv_ingestion.EmployeeRow` from the pandas-free CSV reader) or a
+    pandas DataFrame of employee columns.
+    DataFrames are computed by the columnar engine in :mod:`app.services.columnar`,
+    which produces identical results without a per-row Python loop over the formulas.
+    
+    With ``workers`` greater than 1, workforces larger than ``shard_size`` are split into
+    shards and computed on a process pool (see :mod:`app.services.parallel`); results and
+    totals are identical to the sequential path and stay in input order.
+    
     Returns aggregated results including individual calculations, total amount, and statistics.
+    Individual results are returned as :class:`app.services.results.ResultColumns`, which
+    reads like a list of result dicts but stores them column by column.
     """
-    results = []
-    total_gratuity = Decimal('0.00')
-    eligible_count = 0
-    ineligible_count = 0
+    with stage("calculation"):
+        if workers > 1 and len(employees) > shard_size:
+            from .parallel import calculate_bulk_gratuity_parallel
+            bulk_result = calculate_bulk_gratuity_parallel(employees, workers, shard_size)
+        elif hasattr(employees, "columns"):
+            from .columnar import calculate_bulk_gratuity_columnar
+            bulk_result = calculate_bulk_gratuity_columnar(employees)
+        else:
+            bulk_result = _calculate_bulk_gratuity_scalar(employees)
     
-    for employee in employees:
-        result = calculate_individual_gratuity(
+    count_rows("calculated", len(bulk_result["results"]))
+    return bulk_result
+
+def _calculate_bulk_gratuity_scalar(employees: List[IndividualCalculatorInput]) -> Dict:
+    """Calculate a list of validated inputs one employee at a time with Decimal arithmetic."""
+    # Each result dict is folded into the columns as soon as it is computed
+    results = ResultColumns.from_records(
+        calculate_individual_gratuity(
             employee_name=employee.employee_name,
             joining_date=employee.joining_date,
             leaving_date=employee.leaving_date,
@@ -172,18 +364,13 @@ def calculate_bulk_gratuity(employees: List[IndividualCalculatorInput]) -> Dict:
             employee_type=employee.employee_type,
             termination_reason=employee.termination_reason
         )
-        
-        results.append(result)
-        total_gratuity += result["gratuity_amount"]
-        
-        if result["is_eligible"]:
-            eligible_count += 1
-        else:
-            ineligible_count += 1
+        for employee in employees
+    )
+    eligible_count = results.eligible_count()
     
     return {
         "results": results,
-        "total_gratuity_amount": total_gratuity,
+        "total_gratuity_amount": results.total_gratuity_amount(),
         "eligible_count": eligible_count,
-        "ineligible_count": ineligible_count
-    } 
\ No newline at end of file
+        "ineligible_count": len(results) - eligible_count
+    }
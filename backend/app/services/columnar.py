@@ -0,0 +1,270 @@
+"""
+Columnar gratuity engine.
+
+Computes the same results as :func:`app.services.calculator.calculate_individual_gratuity`
+over whole NumPy/pandas columns instead of one employee at a time. All money is handled
+as integer paise so rounding is exact and matches the Decimal path to the paisa.
+"""
+
+from array import array
+from decimal import Decimal
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..schemas.calculator import EmployeeType, TerminationReason
+from .bulk_input import REQUIRED_COLUMNS
+from .calculator import MAX_GRATUITY_PAISE, build_result_message, calculate_gratuity_amount
+from .fixed_point import (
+    GRATUITY_DAYS,
+    NON_COVERED_DENOMINATOR,
+    STANDARD_DENOMINATOR,
+    paise_to_decimal,
+    round_half_up_div,
+    rupees_to_paise
+)
+from .results import ResultColumns
+
+# Salaries above this are computed with Decimal so the int64 arithmetic cannot overflow
+MAX_FAST_PATH_SALARY = 10 ** 11
+
+# Years of service required for gratuity, except on death or disability
+MIN_YEARS_OF_SERVICE = 5
+
+def to_day_array(values) -> np.ndarray:
+    """
+    Convert a column of dates (date objects, strings or datetime64) to a datetime64[D] array.
+
+    Any time-of-day component is truncated, matching ``pd.to_datetime(value).date()``.
+    """
+    if isinstance(values, np.ndarray) and np.issubdtype(values.dtype, np.datetime64):
+        return values.astype("datetime64[D]")
+
+    parsed = pd.to_datetime(pd.Series(values, copy=False))
+    return parsed.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]")
+
+def _split_dates(days: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Split a datetime64[D] array into (month index since epoch, day of month, month start)."""
+    month_start = days.astype("datetime64[M]")
+    day_of_month = (days - month_start.astype("datetime64[D]")).astype(np.int64) + 1
+    return month_start.astype(np.int64), day_of_month, month_start
+
+def _add_months(joining: np.ndarray, joining_day: np.ndarray, months: np.ndarray) -> np.ndarray:
+    """
+    Vectorized ``joining + relativedelta(months=months)``.
+
+    The day of month is clamped to the length of the target month, like relativedelta does.
+    """
+    target_month = joining.astype("datetime64[M]") + months.astype("timedelta64[M]")
+    target_start = target_month.astype("datetime64[D]")
+    month_length = ((target_month + np.timedelta64(1, "M")).astype("datetime64[D]") - target_start).astype(np.int64)
+    return target_start + (np.minimum(joining_day, month_length) - 1).astype("timedelta64[D]")
+
+def years_of_service_columns(joining: np.ndarray, leaving: np.ndarray) -> np.ndarray:
+    """
+    Vectorized :func:`app.services.calculator.calculate_years_of_service`.
+
+    Reproduces ``relativedelta(leaving_date, joining_date)`` for every row and applies the
+    same rounding rule: 6 months or more (or 5 months and 30 days) counts as a full year.
+    """
+    joining = joining.astype("datetime64[D]")
+    leaving = leaving.astype("datetime64[D]")
+
+    if np.any(leaving < joining):
+        raise ValueError("Leaving date must be after joining date")
+
+    joining_month, joining_day, _ = _split_dates(joining)
+    leaving_month, _, _ = _split_dates(leaving)
+
+    # Whole months between the two dates, stepping back one if the anniversary has not passed
+    months = leaving_month - joining_month
+    anchor = _add_months(joining, joining_day, months)
+    overshoot = leaving < anchor
+    if np.any(overshoot):
+        months = months - overshoot
+        anchor = np.where(overshoot, _add_months(joining, joining_day, months), anchor)
+
+    days = (leaving - anchor).astype(np.int64)
+    years = months // 12
+    remaining_months = months % 12
+
+    rounds_up = (remaining_months >= 6) | ((remaining_months == 5) & (days >= 30))
+    return years + rounds_up
+
+def eligibility_columns(years_of_service: np.ndarray, termination_reason: np.ndarray) -> np.ndarray:
+    """
+    Vectorized :func:`app.services.calculator.is_eligible_for_gratuity`.
+
+    Unknown termination reasons follow the standard 5-year rule.
+    """
+    special = _matches(termination_reason, TerminationReason.DEATH, TerminationReason.DISABILITY)
+    return special | (years_of_service >= MIN_YEARS_OF_SERVICE)
+
+def salary_paise_columns(salary: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Convert salaries to integer paise.
+
+    Returns the paise array and a mask of rows whose salary is exactly representable in
+    paise; the remaining rows must be computed with Decimal to stay exact.
+    """
+    if np.issubdtype(salary.dtype, np.integer):
+        exact = np.abs(salary) < MAX_FAST_PATH_SALARY
+        return np.where(exact, salary, 0).astype(np.int64) * 100, exact
+
+    if np.issubdtype(salary.dtype, np.floating):
+        with np.errstate(invalid="ignore"):
+            exact = np.isfinite(salary) & (np.abs(salary) < MAX_FAST_PATH_SALARY)
+            paise = np.where(exact, np.rint(salary * 100), 0)
+            exact &= (paise / 100) == salary
+        return paise.astype(np.int64), exact
+
+    # Object columns (Decimal, str, ...) are converted element by element
+    paise = np.zeros(len(salary), dtype=np.int64)
+    exact = np.zeros(len(salary), dtype=bool)
+    for i, value in enumerate(salary):
+        scaled = to_decimal(value) * 100
+        if scaled == scaled.to_integral_value() and abs(scaled) < MAX_FAST_PATH_SALARY * 100:
+            paise[i] = int(scaled)
+            exact[i] = True
+    return paise, exact
+
+def gratuity_paise_columns(
+    salary_paise: np.ndarray,
+    years_of_service: np.ndarray,
+    is_eligible: np.ndarray,
+    employee_type: np.ndarray
+) -> np.ndarray:
+    """
+    Vectorized :func:`app.services.fixed_point.gratuity_paise`, the integer-paise engine
+    behind :func:`app.services.calculator.calculate_gratuity_amount`.
+    """
+    denominator = denominator_columns(employee_type)
+    numerator = salary_paise * years_of_service.astype(np.int64) * GRATUITY_DAYS
+    gratuity = round_half_up_div(numerator, denominator)
+    gratuity = np.minimum(gratuity, MAX_GRATUITY_PAISE)
+    return np.where(is_eligible, gratuity, 0)
+
+def denominator_columns(employee_type: np.ndarray) -> np.ndarray:
+    """Days in a month the gratuity formula divides by: 30 for non-covered employees, else 26."""
+    return np.where(_matches(employee_type, EmployeeType.NON_COVERED), NON_COVERED_DENOMINATOR, STANDARD_DENOMINATOR)
+
+def to_decimal(value) -> Decimal:
+    """Convert a salary cell to Decimal the way the Pydantic input schema does."""
+    if isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
+def _matches(column: np.ndarray, *members) -> np.ndarray:
+    """Boolean mask of rows whose enum member is one of ``members``."""
+    # NumPy compares str-based enum scalars as plain strings, so go through pandas hashing
+    return pd.Series(column, copy=False, dtype=object).isin(members).to_numpy()
+
+def _enum_column(values, enum_cls, default) -> np.ndarray:
+    """Map a column of strings or enum members to an object array of enum members."""
+    series = pd.Series(values, copy=False, dtype=object)
+    codes, uniques = pd.factorize(series.fillna(default.value))
+    # Indexing an object array keeps the members; Series.map would infer a string dtype
+    members = np.empty(len(uniques), dtype=object)
+    members[:] = [enum_cls(value) for value in uniques]
+    return members[codes]
+
+def _to_array(typecode: str, values: np.ndarray) -> array:
+    """Copy a NumPy column into a stdlib ``array`` of the matching C type."""
+    column = array(typecode)
+    column.frombytes(np.ascontiguousarray(values, dtype=np.dtype(typecode)).tobytes())
+    return column
+
+def _salary_column(salary: np.ndarray):
+    """
+    Store a salary column compactly for :class:`ResultColumns`.
+
+    Float and int64 columns are kept as numbers, which convert to the same Decimal as
+    :func:`to_decimal` does; other columns are converted to Decimals up front.
+    """
+    if salary.dtype == np.float64:
+        return _to_array("d", salary)
+    if salary.dtype == np.int64:
+        return _to_array("q", salary)
+    return [to_decimal(value) for value in salary.tolist()]
+
+def calculate_bulk_gratuity_columnar(frame: pd.DataFrame) -> Dict:
+    """
+    Calculate gratuity for every row of a DataFrame in a single vectorized pass.
+
+    The frame needs ``employee_name``, ``joining_date``, ``leaving_date`` and
+    ``last_drawn_salary`` columns; ``employee_type`` and ``termination_reason`` are optional
+    and default to standard/resignation like :class:`IndividualCalculatorInput`.
+
+    Returns the same structure as :func:`app.services.calculator.calculate_bulk_gratuity`,
+    with the results built directly as :class:`ResultColumns`.
+    """
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in frame.columns]
+    if missing_columns:
+        raise ValueError(f"Missing required columns: {', '.join(missing_columns)}")
+
+    row_count = len(frame)
+    names = frame["employee_name"].to_numpy(dtype=object)
+    joining = to_day_array(frame["joining_date"].to_numpy())
+    leaving = to_day_array(frame["leaving_date"].to_numpy())
+    salary = frame["last_drawn_salary"].to_numpy()
+
+    employee_types = _enum_column(
+        frame["employee_type"] if "employee_type" in frame.columns else [None] * row_count,
+        EmployeeType,
+        EmployeeType.STANDARD
+    )
+    termination_reasons = _enum_column(
+        frame["termination_reason"] if "termination_reason" in frame.columns else [None] * row_count,
+        TerminationReason,
+        TerminationReason.RESIGNATION
+    )
+
+    years = years_of_service_columns(joining, leaving)
+    eligible = eligibility_columns(years, termination_reasons)
+
+    paise, exact = salary_paise_columns(salary)
+    if np.any(paise < 0):
+        raise ValueError("Last drawn salary must be greater than or equal to 0")
+    gratuity = gratuity_paise_columns(paise, years, eligible, employee_types)
+
+    # Rows that cannot be represented exactly in paise fall back to the Decimal formula
+    fallback_rows = np.flatnonzero(~exact)
+    for i, value in zip(fallback_rows.tolist(), salary[fallback_rows].tolist()):
+        salary_value = to_decimal(value)
+        if salary_value < 0:
+            raise ValueError("Last drawn salary must be greater than or equal to 0")
+        amount = calculate_gratuity_amount(salary_value, int(years[i]), employee_types[i], termination_reasons[i])
+        gratuity[i] = rupees_to_paise(amount)
+
+    capped = gratuity >= MAX_GRATUITY_PAISE
+
+    # Messages only depend on a handful of flags, so build each distinct one once
+    messages = {}
+    message_column = []
+    for key in zip(eligible.tolist(), capped.tolist(), employee_types.tolist(), termination_reasons.tolist()):
+        message = messages.get(key, False)
+        if message is False:
+            message = messages[key] = build_result_message(*key)
+        message_column.append(message)
+
+    results = ResultColumns(
+        names.tolist(),
+        _to_array("i", joining.astype(np.int64)),
+        _to_array("i", leaving.astype(np.int64)),
+        _salary_column(salary),
+        _to_array("q", years),
+        _to_array("q", gratuity),
+        employee_types.tolist(),
+        termination_reasons.tolist(),
+        _to_array("b", eligible),
+        message_column
+    )
+
+    eligible_count = int(eligible.sum())
+    return {
+        "results": results,
+        "total_gratuity_amount": paise_to_decimal(int(gratuity.sum())),
+        "eligible_count": eligible_count,
+        "ineligible_count": row_count - eligible_count
+    }
@@ -0,0 +1,191 @@
+"""
+Pandas-free ingestion of CSV uploads.
+
+Most uploads are plain CSV files with ISO dates and numeric salaries. For those,
+:func:`read_csv_employees` decodes the upload incrementally with the stdlib ``csv`` module
+and validates each row into an :class:`EmployeeRow`, which
+:func:`app.services.calculator.calculate_bulk_gratuity` consumes directly, so neither
+pandas nor a DataFrame is involved.
+
+Results and row errors must match the pandas path in :mod:`app.services.ingestion`
+exactly. Whenever a file uses anything whose pandas interpretation depends on column-wide
+type inference (non-ISO dates, numeric-looking names, unusual number syntax, ragged
+rows), :class:`UnsupportedCsvError` is raised and the caller falls back to pandas.
+"""
+
+import csv
+import io
+import re
+from datetime import date
+from decimal import Decimal
+from typing import BinaryIO, Dict, List, NamedTuple
+
+from ..schemas.calculator import EmployeeType, TerminationReason
+from .bulk_input import REQUIRED_COLUMNS, OPTIONAL_COLUMNS, FIRST_DATA_ROW, BulkInputError, enum_error
+from .metrics import stage, count_rows
+
+# Strings pandas reads as missing values by default
+NA_VALUES = frozenset([
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"
+])
+
+_ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_NUMBER = re.compile(r"[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?")
+# Names pandas could infer as a numeric or boolean column
+_NON_STRING_NAME = re.compile(r"[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?|inf|-inf|True|False|TRUE|FALSE|true|false")
+
+# Optional column values to enum members; missing values mean 'unknown'
+_EMPLOYEE_TYPES = {
+    **dict.fromkeys(NA_VALUES, EmployeeType.UNKNOWN),
+    **{member.value: member for member in EmployeeType}
+}
+_TERMINATION_REASONS = {
+    **dict.fromkeys(NA_VALUES, TerminationReason.UNKNOWN),
+    **{member.value: member for member in TerminationReason}
+}
+
+class UnsupportedCsvError(Exception):
+    """Raised when a CSV upload needs the pandas reader to be interpreted faithfully."""
+
+class EmployeeRow(NamedTuple):
+    """A validated employee row, with the attributes of :class:`IndividualCalculatorInput`."""
+
+    employee_name: str
+    joining_date: date
+    leaving_date: date
+    last_drawn_salary: Decimal
+    employee_type: EmployeeType
+    termination_reason: TerminationReason
+
+_EMPLOYEE_TYPE_ERROR = enum_error(EmployeeType)
+_TERMINATION_REASON_ERROR = enum_error(TerminationReason)
+
+def _parse_date(value: str, cache: Dict[str, date]):
+    """
+    Parse an ISO date not found in ``cache``, returning None for missing or impossible dates.
+    """
+    if value in NA_VALUES:
+        return None
+    if not _ISO_DATE.fullmatch(value):
+        raise UnsupportedCsvError(f"Unsupported date: {value!r}")
+    try:
+        parsed = date.fromisoformat(value)
+    except ValueError:
+        return None
+    cache[value] = parsed
+    return parsed
+
+def _parse_salary(value: str):
+    """
+    Parse a salary the way the pandas path does: as a float, then to the Decimal of its
+    shortest repr. Returns None for missing values.
+    """
+    if value in NA_VALUES:
+        return None
+    if not _NUMBER.fullmatch(value):
+        raise UnsupportedCsvError(f"Unsupported number: {value!r}")
+    parsed = Decimal(repr(float(value)))
+    if not parsed.is_finite():
+        raise UnsupportedCsvError(f"Unsupported number: {value!r}")
+    return parsed
+
+def read_csv_employees(source: BinaryIO) -> List[EmployeeRow]:
+    """
+    Read, validate and normalize a CSV upload without pandas.
+
+    ``source`` is a binary file object; it is decoded incrementally, never into one string.
+    Applies the same rules and error format as :func:`app.services.ingestion.prepare_employee_frame`.
+
+    Raises :class:`BulkInputError` for missing columns or invalid rows
+    and :class:`UnsupportedCsvError` when the file should be read by pandas instead.
+    """
+    text = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+    try:
+        with stage("parse"):
+            rows = _read_rows(text)
+    except UnicodeDecodeError as e:
+        raise UnsupportedCsvError("File is not valid UTF-8") from e
+    finally:
+        # Leave the underlying upload open for a fallback reader
+        text.detach()
+    return rows
+
+def _read_rows(text) -> List[EmployeeRow]:
+    reader = csv.reader(text)
+    header = next(reader, None)
+    if header is None or len(set(header)) != len(header):
+        raise UnsupportedCsvError("Missing or duplicate header")
+
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in header]
+    if missing_columns:
+        raise BulkInputError(f"File is missing required columns: {', '.join(missing_columns)}")
+
+    width = len(header)
+    name_index, joining_index, leaving_index, salary_index = (header.index(col) for col in REQUIRED_COLUMNS)
+    type_index, reason_index = (header.index(col) if col in header else None for col in OPTIONAL_COLUMNS)
+
+    employees = []
+    errors = []
+    date_cache: Dict[str, date] = {}
+    row_number = FIRST_DATA_ROW - 1
+
+    for fields in reader:
+        if not fields:
+            # pandas skips blank lines without counting them as rows
+            continue
+        row_number += 1
+        if len(fields) != width:
+            if len(fields) > width:
+                raise UnsupportedCsvError(f"Row {row_number} has too many fields")
+            fields = fields + [""] * (width - len(fields))
+
+        name = fields[name_index]
+        text = fields[joining_index]
+        joining_date = date_cache.get(text) or _parse_date(text, date_cache)
+        text = fields[leaving_index]
+        leaving_date = date_cache.get(text) or _parse_date(text, date_cache)
+        salary = _parse_salary(fields[salary_index])
+        employee_type = _EMPLOYEE_TYPES.get(fields[type_index]) if type_index is not None else EmployeeType.UNKNOWN
+        termination_reason = _TERMINATION_REASONS.get(fields[reason_index]) if reason_index is not None else TerminationReason.UNKNOWN
+
+        if (
+            name not in NA_VALUES and joining_date is not None and leaving_date is not None
+            and salary is not None and employee_type is not None and termination_reason is not None
+            and leaving_date >= joining_date and salary >= 0
+        ):
+            if _NON_STRING_NAME.fullmatch(name):
+                raise UnsupportedCsvError(f"Row {row_number} has a non-text name")
+            if not errors:
+                employees.append(EmployeeRow(name, joining_date, leaving_date, salary, employee_type, termination_reason))
+            continue
+
+        if _NON_STRING_NAME.fullmatch(name):
+            raise UnsupportedCsvError(f"Row {row_number} has a non-text name")
+
+        # Checks run in the same order as in prepare_employee_frame so errors line up
+        row_errors = []
+        if name in NA_VALUES:
+            row_errors.append(("employee_name", "Input should be a valid string"))
+        if joining_date is None:
+            row_errors.append(("joining_date", "Input should be a valid date"))
+        if leaving_date is None:
+            row_errors.append(("leaving_date", "Input should be a valid date"))
+        elif joining_date is not None and leaving_date < joining_date:
+            row_errors.append(("leaving_date", "Leaving date must be after joining date"))
+        if salary is None:
+            row_errors.append(("last_drawn_salary", "Input should be a valid number"))
+        elif salary < 0:
+            row_errors.append(("last_drawn_salary", "Input should be greater than or equal to 0"))
+        if employee_type is None:
+            row_errors.append(("employee_type", _EMPLOYEE_TYPE_ERROR))
+        if termination_reason is None:
+            row_errors.append(("termination_reason", _TERMINATION_REASON_ERROR))
+        errors.extend({"row": row_number, "field": field, "error": message} for field, message in row_errors)
+
+    if errors:
+        invalid_rows = len({error["row"] for error in errors})
+        count_rows("invalid", invalid_rows)
+        raise BulkInputError(f"File contains {invalid_rows} invalid row(s)", errors)
+
+    return employees
@@ -0,0 +1,365 @@
+"""
+Persistent bulk datasets.
+
+A dataset is the latest version of a workforce file uploaded under a caller-chosen id.
+Every calculated row is stored with a hash of its normalized inputs, and the dataset
+keeps running totals, so a new version of the file only needs the rows that changed to
+be calculated (see :mod:`app.services.incremental`).
+
+The store is a local SQLite database and, like the job store, needs no external services.
+This module does not import pandas or NumPy.
+"""
+
+import base64
+import json
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..config import DATASET_DIR
+from ..schemas.calculator import EmployeeType, TerminationReason
+from .fixed_point import paise_to_decimal
+from .results import EPOCH_ORDINAL, ResultColumns
+
+# Dataset ids are used in URLs and as database keys
+DATASET_ID_PATTERN = r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,127}$"
+
+# Result columns rows can be sorted by, and the stored column behind each;
+# "row" is the order rows were stored in
+SORT_COLUMNS = {
+    "row": "rowid",
+    "employee_name": "employee_name",
+    "joining_date": "joining_date",
+    "leaving_date": "leaving_date",
+    "years_of_service": "years_of_service",
+    "gratuity_amount": "gratuity_paise"
+}
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+class DatasetConflictError(Exception):
+    """Raised when a dataset was changed by another upload while a new version was being calculated."""
+
+class InvalidCursorError(Exception):
+    """Raised when a page cursor is malformed or belongs to a different sort order."""
+
+class DatasetStore:
+    """
+    Dataset summaries and rows in a local SQLite database.
+
+    A connection is opened per operation so the store can be shared between threads.
+    Updates use optimistic concurrency: :meth:`apply_changes` only succeeds if the
+    dataset still has the version its previous state was read at.
+
+    Rows are indexed on the columns results are filtered and sorted by, so pages of a
+    large dataset are read with :meth:`query_rows` without scanning it; the database
+    uses write-ahead logging so pages can be read while a new version is written.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with closing(self._connect()) as connection, connection:
+            connection.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS datasets (
+                    dataset_id TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL,
+                    rules TEXT NOT NULL,
+                    row_count INTEGER NOT NULL,
+                    total_gratuity_paise INTEGER NOT NULL,
+                    eligible_count INTEGER NOT NULL,
+                    ineligible_count INTEGER NOT NULL,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS dataset_rows (
+                    dataset_id TEXT NOT NULL,
+                    row_hash INTEGER NOT NULL,
+                    employee_name TEXT NOT NULL,
+                    joining_date TEXT NOT NULL,
+                    leaving_date TEXT NOT NULL,
+                    last_drawn_salary TEXT NOT NULL,
+                    years_of_service INTEGER NOT NULL,
+                    gratuity_paise INTEGER NOT NULL,
+                    employee_type TEXT NOT NULL,
+                    termination_reason TEXT NOT NULL,
+                    is_eligible INTEGER NOT NULL,
+                    message TEXT
+                );
+                CREATE INDEX IF NOT EXISTS dataset_rows_by_hash ON dataset_rows (dataset_id, row_hash);
+                CREATE INDEX IF NOT EXISTS dataset_rows_by_type ON dataset_rows (dataset_id, employee_type);
+                CREATE INDEX IF NOT EXISTS dataset_rows_by_reason ON dataset_rows (dataset_id, termination_reason);
+                CREATE INDEX IF NOT EXISTS dataset_rows_by_eligibility ON dataset_rows (dataset_id, is_eligible);
+                CREATE INDEX IF NOT EXISTS dataset_rows_by_dataset ON dataset_rows (dataset_id);
+                CREATE INDEX IF NOT EXISTS dataset_rows_by_name ON dataset_rows (dataset_id, employee_name);
+                CREATE INDEX IF NOT EXISTS dataset_rows_by_joining_date ON dataset_rows (dataset_id, joining_date);
+                CREATE INDEX IF NOT EXISTS dataset_rows_by_leaving_date ON dataset_rows (dataset_id, leaving_date);
+                CREATE INDEX IF NOT EXISTS dataset_rows_by_service ON dataset_rows (dataset_id, years_of_service);
+                CREATE INDEX IF NOT EXISTS dataset_rows_by_gratuity ON dataset_rows (dataset_id, gratuity_paise);
+                """
+            )
+
+        with closing(self._connect()) as connection, connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def get(self, dataset_id: str) -> Optional[Dict]:
+        """Return the summary of a dataset, or None if it does not exist."""
+        with closing(self._connect()) as connection, connection:
+            row = connection.execute("SELECT * FROM datasets WHERE dataset_id = ?", (dataset_id,)).fetchone()
+        return _summary(row) if row else None
+
+    def row_hashes(self, dataset_id: str) -> Tuple[Optional[Dict], List[int]]:
+        """Return the summary of a dataset and the hashes of all its rows, read consistently."""
+        with closing(self._connect()) as connection, connection:
+            row = connection.execute("SELECT * FROM datasets WHERE dataset_id = ?", (dataset_id,)).fetchone()
+            if row is None:
+                return None, []
+            hashes = [h for (h,) in connection.execute(
+                "SELECT row_hash FROM dataset_rows WHERE dataset_id = ?", (dataset_id,)
+            )]
+        return _summary(row), hashes
+
+    def apply_changes(
+        self,
+        dataset_id: str,
+        expected_version: int,
+        rules: str,
+        added: ResultColumns,
+        added_hashes: Iterable[int],
+        removed_hashes: Dict[int, int],
+        replace: bool = False
+    ) -> Tuple[Dict, ResultColumns]:
+        """
+        Add and remove rows and update the dataset totals by their difference.
+
+        ``removed_hashes`` maps a row hash to how many rows with that hash to remove;
+        rows with the same hash have the same inputs, so any of them can go. With
+        ``replace`` every existing row is removed first (used when the calculation
+        rules changed). ``expected_version`` is 0 for a dataset that did not exist.
+
+        Returns the new summary and the removed rows. Raises
+        :class:`DatasetConflictError` if the dataset is no longer at ``expected_version``.
+        """
+        timestamp = _now()
+        connection = self._connect()
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute("SELECT * FROM datasets WHERE dataset_id = ?", (dataset_id,)).fetchone()
+            if (row["version"] if row else 0) != expected_version:
+                raise DatasetConflictError(f"Dataset {dataset_id} was updated by another upload")
+
+            if row is None or replace:
+                totals = {"row_count": 0, "total_gratuity_paise": 0, "eligible_count": 0, "ineligible_count": 0}
+                removed = ResultColumns.empty()
+                connection.execute("DELETE FROM dataset_rows WHERE dataset_id = ?", (dataset_id,))
+            else:
+                totals = {key: row[key] for key in ("row_count", "total_gratuity_paise", "eligible_count", "ineligible_count")}
+                removed = self._remove_rows(connection, dataset_id, removed_hashes)
+
+            connection.executemany(
+                "INSERT INTO dataset_rows (dataset_id, row_hash, employee_name, joining_date, leaving_date, "
+                "last_drawn_salary, years_of_service, gratuity_paise, employee_type, termination_reason, "
+                "is_eligible, message) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                _row_values(dataset_id, added, added_hashes)
+            )
+
+            for results, sign in ((added, 1), (removed, -1)):
+                eligible_count = results.eligible_count()
+                totals["row_count"] += sign * len(results)
+                totals["total_gratuity_paise"] += sign * sum(results.gratuity_paise)
+                totals["eligible_count"] += sign * eligible_count
+                totals["ineligible_count"] += sign * (len(results) - eligible_count)
+
+            connection.execute(
+                "INSERT INTO datasets (dataset_id, version, rules, row_count, total_gratuity_paise, eligible_count, "
+                "ineligible_count, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (dataset_id) DO UPDATE SET version = excluded.version, rules = excluded.rules, "
+                "row_count = excluded.row_count, total_gratuity_paise = excluded.total_gratuity_paise, "
+                "eligible_count = excluded.eligible_count, ineligible_count = excluded.ineligible_count, "
+                "updated_at = excluded.updated_at",
+                (
+                    dataset_id, expected_version + 1, rules, totals["row_count"], totals["total_gratuity_paise"],
+                    totals["eligible_count"], totals["ineligible_count"], timestamp, timestamp
+                )
+            )
+            summary = _summary(connection.execute("SELECT * FROM datasets WHERE dataset_id = ?", (dataset_id,)).fetchone())
+            connection.commit()
+            # Refresh the statistics the query planner uses to pick an index
+            connection.execute("PRAGMA optimize")
+        except BaseException:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+        return summary, removed
+
+    def _remove_rows(self, connection: sqlite3.Connection, dataset_id: str, removed_hashes: Dict[int, int]) -> ResultColumns:
+        removed = []
+        for row_hash, count in removed_hashes.items():
+            rows = connection.execute(
+                "SELECT rowid, * FROM dataset_rows WHERE dataset_id = ? AND row_hash = ? LIMIT ?",
+                (dataset_id, row_hash, count)
+            ).fetchall()
+            connection.executemany("DELETE FROM dataset_rows WHERE rowid = ?", [(row["rowid"],) for row in rows])
+            removed.extend(rows)
+        return ResultColumns.from_records(_result_record(row) for row in removed)
+
+    def summaries(self) -> List[Dict]:
+        """Return the summaries of all datasets, by id."""
+        with closing(self._connect()) as connection, connection:
+            rows = connection.execute("SELECT * FROM datasets ORDER BY dataset_id").fetchall()
+        return [_summary(row) for row in rows]
+
+    def query_rows(
+        self,
+        dataset_id: str,
+        employee_type: Optional[str] = None,
+        termination_reason: Optional[str] = None,
+        is_eligible: Optional[bool] = None,
+        leaving_date_from: Optional[date] = None,
+        leaving_date_to: Optional[date] = None,
+        sort: str = "row",
+        descending: bool = False,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> Tuple[Optional[int], ResultColumns, Optional[str]]:
+        """
+        Return one page of a dataset's results, filtered and sorted.
+
+        Pages are read by keyset rather than offset: ``cursor`` is the ``next_cursor``
+        of the previous page, so every page costs the same however deep it is. Returns
+        the number of rows matching the filters, the page and the cursor of the next
+        page (None on the last page). Counting reads every matching row, so the count is
+        only returned for the first page and is None when ``cursor`` is given. Raises
+        :class:`InvalidCursorError` for a cursor from a different sort order.
+        """
+        column = SORT_COLUMNS[sort]
+        conditions = ["dataset_id = ?"]
+        parameters: List = [dataset_id]
+        for condition, value in (
+            ("employee_type = ?", employee_type),
+            ("termination_reason = ?", termination_reason),
+            ("is_eligible = ?", None if is_eligible is None else int(is_eligible)),
+            ("leaving_date >= ?", leaving_date_from and leaving_date_from.isoformat()),
+            ("leaving_date <= ?", leaving_date_to and leaving_date_to.isoformat())
+        ):
+            if value is not None:
+                conditions.append(condition)
+                parameters.append(value)
+        where = " AND ".join(conditions)
+
+        page_conditions, page_parameters = list(conditions), list(parameters)
+        if cursor is not None:
+            value, rowid = _decode_cursor(cursor, sort, descending)
+            operator = "<" if descending else ">"
+            if column == "rowid":
+                page_conditions.append(f"rowid {operator} ?")
+                page_parameters.append(rowid)
+            else:
+                page_conditions.append(f"({column}, rowid) {operator} (?, ?)")
+                page_parameters.extend([value, rowid])
+        direction = "DESC" if descending else "ASC"
+        order = "rowid" if column == "rowid" else f"{column} {direction}, rowid"
+
+        with closing(self._connect()) as connection, connection:
+            total = None
+            if cursor is None:
+                total = connection.execute(f"SELECT COUNT(*) FROM dataset_rows WHERE {where}", parameters).fetchone()[0]
+            rows = connection.execute(
+                f"SELECT rowid, * FROM dataset_rows WHERE {' AND '.join(page_conditions)} "
+                f"ORDER BY {order} {direction} LIMIT ?",
+                [*page_parameters, limit + 1]
+            ).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = _encode_cursor(last[column], last["rowid"], sort, descending)
+        return total, ResultColumns.from_records(_result_record(row) for row in rows), next_cursor
+
+    def delete(self, dataset_id: str) -> bool:
+        """Delete a dataset and its rows; returns False if it did not exist."""
+        with closing(self._connect()) as connection, connection:
+            connection.execute("DELETE FROM dataset_rows WHERE dataset_id = ?", (dataset_id,))
+            deleted = connection.execute("DELETE FROM datasets WHERE dataset_id = ?", (dataset_id,)).rowcount
+        return deleted > 0
+
+def _summary(row: sqlite3.Row) -> Dict:
+    """Convert a ``datasets`` row to a :class:`DatasetSummary` dict (plus version and rules)."""
+    summary = dict(row)
+    summary["total_gratuity_amount"] = paise_to_decimal(summary.pop("total_gratuity_paise"))
+    return summary
+
+def _encode_cursor(value, rowid: int, sort: str, descending: bool) -> str:
+    """Opaque page cursor: the sort key and rowid of the last row on a page."""
+    payload = json.dumps([sort, descending, value, rowid], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def _decode_cursor(cursor: str, sort: str, descending: bool) -> Tuple:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, cursor_descending, value, rowid = json.loads(payload)
+    except (ValueError, TypeError):
+        raise InvalidCursorError("Invalid cursor")
+    if cursor_sort != sort or cursor_descending != descending or not isinstance(rowid, int):
+        raise InvalidCursorError("Cursor belongs to a different sort order")
+    return value, rowid
+
+def _row_values(dataset_id: str, results: ResultColumns, hashes: Iterable[int]) -> Iterable[Tuple]:
+    """Yield ``dataset_rows`` values for every result, with its input hash."""
+    day_text: Dict[int, str] = {}
+
+    def iso(days: int) -> str:
+        text = day_text.get(days)
+        if text is None:
+            text = day_text[days] = date.fromordinal(days + EPOCH_ORDINAL).isoformat()
+        return text
+
+    for row_hash, name, joining, leaving, salary, years, paise, employee_type, reason, eligible, message in zip(
+        hashes, results.employee_name, results.joining_date, results.leaving_date, results.last_drawn_salary,
+        results.years_of_service, results.gratuity_paise, results.employee_type, results.termination_reason,
+        results.is_eligible, results.message
+    ):
+        salary_text = str(salary if isinstance(salary, Decimal) else Decimal(str(salary)))
+        yield (
+            dataset_id, row_hash, name, iso(joining), iso(leaving), salary_text, years, paise,
+            employee_type.value, reason.value, eligible, message
+        )
+
+def _result_record(row: sqlite3.Row) -> Dict:
+    """Convert a stored ``dataset_rows`` row back to a result dict."""
+    return {
+        "employee_name": row["employee_name"],
+        "joining_date": date.fromisoformat(row["joining_date"]),
+        "leaving_date": date.fromisoformat(row["leaving_date"]),
+        "last_drawn_salary": Decimal(row["last_drawn_salary"]),
+        "years_of_service": row["years_of_service"],
+        "gratuity_amount": paise_to_decimal(row["gratuity_paise"]),
+        "employee_type": EmployeeType(row["employee_type"]),
+        "termination_reason": TerminationReason(row["termination_reason"]),
+        "is_eligible": bool(row["is_eligible"]),
+        "message": row["message"]
+    }
+
+_store: Optional[DatasetStore] = None
+_store_lock = threading.Lock()
+
+def get_dataset_store() -> DatasetStore:
+    """Return the process-wide dataset store, creating it on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = DatasetStore(os.path.join(DATASET_DIR, "datasets.sqlite3"))
+        return _store
@@ -0,0 +1,85 @@
+"""
+Executor for CPU-bound work triggered by API requests.
+
+Parsing uploads, building spreadsheets and bulk calculation are synchronous; running
+them directly in an ``async def`` handler blocks the event loop for every other client.
+:class:`CpuExecutor` moves that work onto a bounded thread or process pool and rejects
+new work once too many tasks are queued, instead of letting the backlog grow.
+"""
+
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional
+
+from ..config import CPU_EXECUTOR, CPU_EXECUTOR_MAX_PENDING, CPU_EXECUTOR_WORKERS
+
+class ExecutorBusyError(RuntimeError):
+    """Raised when the CPU executor already has the maximum number of pending tasks."""
+
+class CpuExecutor:
+    """
+    Bounded pool for CPU-bound request work.
+
+    ``kind`` is "thread", "process" or "inline". Work submitted with :meth:`run` must be
+    picklable when ``kind`` is "process"; work that holds open files or iterators goes
+    through :meth:`run_local`, which always uses threads but counts against the same limit.
+    """
+
+    def __init__(self, kind: str = CPU_EXECUTOR, max_workers: int = CPU_EXECUTOR_WORKERS, max_pending: int = CPU_EXECUTOR_MAX_PENDING):
+        if kind not in ("thread", "process", "inline"):
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self._pool: Optional[Executor] = None
+        self._threads: Optional[ThreadPoolExecutor] = None
+
+    def _thread_pool(self) -> ThreadPoolExecutor:
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="cpu")
+        return self._threads
+
+    def _process_pool(self) -> Executor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._pool
+
+    async def _submit(self, executor: Optional[Executor], func: Callable, *args) -> Any:
+        if self.pending >= self.max_pending:
+            raise ExecutorBusyError("Too many requests are being processed. Please retry shortly.")
+
+        # Only the event loop thread touches the counter, so no lock is needed
+        self.pending += 1
+        try:
+            if executor is None:
+                return func(*args)
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, partial(func, *args))
+        finally:
+            self.pending -= 1
+
+    async def run(self, func: Callable, *args) -> Any:
+        """Run ``func(*args)`` on the configured pool and return its result."""
+        if self.kind == "inline":
+            return await self._submit(None, func, *args)
+        if self.kind == "process":
+            return await self._submit(self._process_pool(), func, *args)
+        return await self._submit(self._thread_pool(), func, *args)
+
+    async def run_local(self, func: Callable, *args) -> Any:
+        """Run ``func(*args)`` in this process, on a worker thread unless running inline."""
+        if self.kind == "inline":
+            return await self._submit(None, func, *args)
+        return await self._submit(self._thread_pool(), func, *args)
+
+    def shutdown(self) -> None:
+        """Stop the worker pools, waiting for running tasks to finish."""
+        for pool in (self._pool, self._threads):
+            if pool is not None:
+                pool.shutdown(wait=True)
+        self._pool = None
+        self._threads = None
+
+cpu_executor = CpuExecutor()
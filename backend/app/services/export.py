@@ -0,0 +1,138 @@
+"""
+Export of bulk calculation results to CSV and Excel.
+
+Both writers consume bulk results one chunk at a time so an export never needs every
+result row in memory at once.
+"""
+
+import csv
+import io
+import tempfile
+from datetime import date
+from enum import Enum
+from typing import BinaryIO, Dict, Iterable, Iterator, List
+
+from openpyxl import Workbook
+
+from .metrics import stage
+
+# Columns of an exported result file, in order
+EXPORT_COLUMNS = [
+    "employee_name",
+    "joining_date",
+    "leaving_date",
+    "last_drawn_salary",
+    "years_of_service",
+    "gratuity_amount",
+    "employee_type",
+    "termination_reason",
+    "is_eligible",
+    "message"
+]
+
+# Size of the blocks a finished export file is streamed in
+EXPORT_READ_BLOCK_SIZE = 64 * 1024
+
+def _export_row(result: Dict) -> List:
+    """Convert one result dict to a list of export cell values."""
+    row = []
+    for column in EXPORT_COLUMNS:
+        value = result[column]
+        if isinstance(value, Enum):
+            value = value.value
+        row.append(value)
+    return row
+
+def _csv_cell(value):
+    """Format a cell the way the JSON API renders it."""
+    if value is None:
+        return ""
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+def iter_results_csv(chunk_results: Iterable[Dict]) -> Iterator[bytes]:
+    """
+    Yield a UTF-8 CSV export of bulk results, one encoded block per chunk.
+
+    ``chunk_results`` are bulk result dicts as returned by ``calculate_bulk_gratuity``.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue().encode("utf-8")
+
+    for chunk_result in chunk_results:
+        with stage("serialization"):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows(
+                [_csv_cell(value) for value in _export_row(result)]
+                for result in chunk_result["results"]
+            )
+            block = buffer.getvalue().encode("utf-8")
+        yield block
+
+def build_results_csv(chunk_results: Iterable[Dict]) -> BinaryIO:
+    """
+    Write a CSV export to an anonymous temporary file on disk.
+
+    Every chunk is calculated before the file is returned, so an invalid row anywhere in
+    the upload is raised here rather than in the middle of a streamed download. Returns
+    the open file positioned at the start; it is deleted once closed.
+    """
+    target = tempfile.TemporaryFile()
+    try:
+        for block in iter_results_csv(chunk_results):
+            target.write(block)
+    except BaseException:
+        target.close()
+        raise
+    target.seek(0)
+    return target
+
+def write_results_xlsx(chunk_results: Iterable[Dict], target: BinaryIO) -> None:
+    """
+    Write an Excel export of bulk results to ``target``.
+
+    Uses openpyxl's write-only mode, which flushes rows to a temporary file as they are
+    appended instead of keeping a cell object per value, so memory stays flat.
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Gratuity Results")
+    sheet.append(EXPORT_COLUMNS)
+
+    for chunk_result in chunk_results:
+        with stage("serialization"):
+            for result in chunk_result["results"]:
+                sheet.append(_export_row(result))
+
+    with stage("serialization"):
+        workbook.save(target)
+
+def build_results_xlsx(chunk_results: Iterable[Dict]) -> BinaryIO:
+    """
+    Write an Excel export to an anonymous temporary file on disk.
+
+    Returns the open file positioned at the start; it is deleted once closed.
+    """
+    target = tempfile.TemporaryFile()
+    try:
+        write_results_xlsx(chunk_results, target)
+    except BaseException:
+        target.close()
+        raise
+    target.seek(0)
+    return target
+
+def iter_file_blocks(source: BinaryIO, block_size: int = EXPORT_READ_BLOCK_SIZE) -> Iterator[bytes]:
+    """Yield the contents of ``source`` in blocks, closing it when done."""
+    try:
+        while True:
+            block = source.read(block_size)
+            if not block:
+                break
+            yield block
+    finally:
+        source.close()
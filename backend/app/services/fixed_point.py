@@ -0,0 +1,82 @@
+"""
+Exact fixed-point money arithmetic in integer paise.
+
+The gratuity formula ``salary × years × 15 / denominator`` is a rational number, so it can
+be computed exactly with Python integers and rounded once with explicit ROUND_HALF_UP
+semantics, instead of going through several Decimal operations per employee. The helpers
+work on plain ints and on NumPy int64 arrays alike, so the scalar and columnar engines
+share one definition of the arithmetic.
+"""
+
+from decimal import Decimal
+from typing import Optional
+
+PAISE_PER_RUPEE = 100
+
+# Days of wages paid per completed year of service
+GRATUITY_DAYS = 15
+
+# Working days per month for employees covered by the Act, and for everyone else
+STANDARD_DENOMINATOR = 26
+NON_COVERED_DENOMINATOR = 30
+
+# The Decimal formula runs in the default 28-digit context. Within these bounds its
+# intermediate product is exact and its quotient is rounded far below the distance to any
+# half paisa, so the integer result is identical to it; other salaries use Decimal.
+MAX_SALARY_DIGITS = 20
+MAX_SALARY_DECIMALS = 15
+MAX_YEARS_OF_SERVICE = 9_999
+
+_MAX_SALARY_NUMERATOR = 10 ** MAX_SALARY_DIGITS
+_ONE_PAISA = Decimal('0.01')
+
+def round_half_up_div(numerator, denominator):
+    """
+    ROUND_HALF_UP of ``numerator / denominator`` to an integer, for non-negative numerators.
+
+    Equal to ``floor(n / d + 1/2)``, computed as ``(2n + d) // (2d)`` without leaving integers.
+    """
+    return (2 * numerator + denominator) // (2 * denominator)
+
+def rupees_to_paise(amount: Decimal) -> int:
+    """Convert a rupee amount with at most two decimal places to integer paise."""
+    paise = amount * PAISE_PER_RUPEE
+    if paise != paise.to_integral_value():
+        raise ValueError(f"{amount} is not a whole number of paise")
+    return int(paise)
+
+def paise_to_decimal(paise: int) -> Decimal:
+    """Convert integer paise back to a two-decimal-place rupee amount."""
+    # Multiplying by 0.01 sets the exponent to -2 without rounding (up to 28 digits)
+    return Decimal(int(paise)) * _ONE_PAISA
+
+def gratuity_paise(salary: Decimal, years_of_service, denominator: int, cap_paise: int) -> Optional[int]:
+    """
+    Gratuity in integer paise: ``salary × years × 15 / denominator`` capped at ``cap_paise``
+    and rounded half up to the paisa.
+
+    Returns None when the inputs are outside the range where the result is guaranteed to
+    equal the Decimal formula (negative, non-finite or very long salaries, years that are
+    not an int), so the caller can fall back to it.
+    """
+    if type(salary) is not Decimal or type(years_of_service) is not int:
+        return None
+    if not 0 <= years_of_service <= MAX_YEARS_OF_SERVICE or salary.is_signed() or not salary.is_finite():
+        return None
+
+    # Common case: a whole number of paise, read off the exact ratio without touching digits
+    numerator, ratio_denominator = salary.as_integer_ratio()
+    if PAISE_PER_RUPEE % ratio_denominator == 0 and numerator < _MAX_SALARY_NUMERATOR:
+        salary_paise = numerator * (PAISE_PER_RUPEE // ratio_denominator)
+        paise = round_half_up_div(salary_paise * years_of_service * GRATUITY_DAYS, denominator)
+    else:
+        _, digits, exponent = salary.as_tuple()
+        if len(digits) > MAX_SALARY_DIGITS or exponent < -MAX_SALARY_DECIMALS:
+            return None
+        # salary = coefficient × 10^exponent rupees; move any digits beyond paise into the divisor
+        extra_decimals = max(0, -2 - exponent)
+        salary_units = int(salary.scaleb(2 + extra_decimals))
+        paise = round_half_up_div(salary_units * years_of_service * GRATUITY_DAYS, denominator * 10 ** extra_decimals)
+
+    # The cap is a whole number of paise, so capping after rounding equals capping before
+    return min(paise, cap_paise)
@@ -0,0 +1,147 @@
+"""
+Incremental recalculation of bulk datasets.
+
+Monthly payroll files are mostly identical to the previous month's. Instead of
+recalculating every row, each normalized row is hashed and the hashes are matched
+against the rows stored for the dataset as a multiset: rows whose inputs already exist
+are left alone, rows with new inputs are calculated and stored, and stored rows with no
+counterpart in the new file are removed. A changed row therefore counts as one removal
+and one addition. The dataset totals are updated by the difference, so calculation and
+storage work is proportional to the number of changed rows.
+
+The upload is hashed and matched one chunk at a time, and the new rows of each chunk are
+calculated straight away; only the stored hashes and the results and hashes of added
+rows are kept, so memory does not grow with the size of the file.
+
+Hashes depend on pandas' hashing and on the gratuity rules; when either changes the
+stored rows are discarded and the dataset is recalculated in full.
+"""
+
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .calculator import MAX_GRATUITY_LIMIT, calculate_bulk_gratuity
+from .dataset_store import DatasetStore
+from .metrics import stage
+from .results import ResultColumns, concat_results
+
+# Normalized input columns that determine a row's result, in hashing order
+HASHED_COLUMNS = ["employee_name", "joining_date", "leaving_date", "last_drawn_salary", "employee_type", "termination_reason"]
+
+# Stored with a dataset; stored rows are only reused while this is unchanged
+HASH_RULES = f"hash=pandas-{'.'.join(pd.__version__.split('.')[:2])};max_gratuity={MAX_GRATUITY_LIMIT}"
+
+def row_hashes(frame: pd.DataFrame) -> np.ndarray:
+    """64-bit hashes of the normalized inputs of every row, as signed ints for SQLite."""
+    inputs = frame[HASHED_COLUMNS].copy()
+    # Hash dates as day numbers so the datetime resolution pandas parsed them at does not matter
+    for column in ("joining_date", "leaving_date"):
+        inputs[column] = inputs[column].to_numpy().astype("datetime64[D]").astype(np.int64)
+    return pd.util.hash_pandas_object(inputs, index=False).to_numpy().view(np.int64)
+
+def _occurrence_ranks(hashes: np.ndarray) -> np.ndarray:
+    """For every position, how many earlier positions hold the same hash."""
+    order = np.argsort(hashes, kind="stable")
+    sorted_hashes = hashes[order]
+    positions = np.arange(len(hashes))
+    group_starts = np.ones(len(hashes), dtype=bool)
+    group_starts[1:] = sorted_hashes[1:] != sorted_hashes[:-1]
+    ranks = np.empty(len(hashes), dtype=np.int64)
+    ranks[order] = positions - np.maximum.accumulate(np.where(group_starts, positions, 0))
+    return ranks
+
+class RowHashMatcher:
+    """
+    Match the rows of a new file against the stored rows by hash, as multisets, one
+    chunk of the file at a time.
+
+    When a hash occurs more often in the new file than before, its later occurrences
+    (across all chunks) are the added ones.
+    """
+
+    def __init__(self, previous: np.ndarray):
+        self.unique, self.counts = np.unique(previous, return_counts=True)
+        # How often each stored hash has occurred in the chunks matched so far
+        self.seen = np.zeros(len(self.unique), dtype=np.int64)
+
+    def match(self, hashes: np.ndarray) -> np.ndarray:
+        """Return the positions in the next chunk's ``hashes`` of rows to add."""
+        if len(self.unique) == 0:
+            return np.arange(len(hashes))
+
+        index = np.minimum(np.searchsorted(self.unique, hashes), len(self.unique) - 1)
+        stored = self.unique[index] == hashes
+        occurrence = _occurrence_ranks(hashes) + self.seen[index]
+        np.add.at(self.seen, index[stored], 1)
+        return np.flatnonzero(~stored | (occurrence >= self.counts[index]))
+
+    def removed(self) -> Dict[int, int]:
+        """``{hash: count}`` of stored rows with no counterpart in the chunks matched."""
+        excess = self.counts - np.minimum(self.seen, self.counts)
+        return dict(zip(self.unique[excess > 0].tolist(), excess[excess > 0].tolist()))
+
+def diff_row_hashes(previous: np.ndarray, current: np.ndarray) -> Tuple[np.ndarray, Dict[int, int]]:
+    """
+    Match the rows of a new file against the stored rows by hash, as multisets.
+
+    Returns the positions in ``current`` of rows to add, and ``{hash: count}`` of stored
+    rows to remove.
+    """
+    matcher = RowHashMatcher(previous)
+    added = matcher.match(current)
+    return added, matcher.removed()
+
+def update_dataset(store: DatasetStore, dataset_id: str, chunks: Iterable[pd.DataFrame]) -> Dict:
+    """
+    Replace a dataset with a new version of its file, recalculating only changed rows.
+
+    ``chunks`` are normalized frames as yielded by
+    :func:`app.services.ingestion.iter_employee_chunks`. Returns a
+    :class:`DatasetUpdate` dict whose ``added`` and ``removed`` results are
+    :class:`ResultColumns`.
+    """
+    summary, stored = store.row_hashes(dataset_id)
+    replace = summary is not None and summary["rules"] != HASH_RULES
+    matcher = RowHashMatcher(np.array([] if replace else stored, dtype=np.int64))
+    # The list of Python ints is several times larger than the array built from it
+    del stored
+
+    added_parts: List[ResultColumns] = []
+    added_hashes: List[int] = []
+    for chunk in chunks:
+        if not len(chunk):
+            continue
+        with stage("hashing"):
+            hashes = row_hashes(chunk)
+            positions = matcher.match(hashes)
+        if len(positions):
+            added_parts.append(calculate_bulk_gratuity(chunk.iloc[positions].reset_index(drop=True))["results"])
+            added_hashes.extend(hashes[positions].tolist())
+
+    added = concat_results(added_parts)
+
+    summary, removed = store.apply_changes(
+        dataset_id,
+        expected_version=summary["version"] if summary else 0,
+        rules=HASH_RULES,
+        added=added,
+        added_hashes=added_hashes,
+        removed_hashes=matcher.removed(),
+        replace=replace
+    )
+
+    return {
+        "dataset_id": dataset_id,
+        "row_count": summary["row_count"],
+        "added_count": len(added),
+        "removed_count": len(removed),
+        "unchanged_count": summary["row_count"] - len(added),
+        "full_recalculation": summary["version"] == 1 or replace,
+        "total_gratuity_amount": summary["total_gratuity_amount"],
+        "eligible_count": summary["eligible_count"],
+        "ineligible_count": summary["ineligible_count"],
+        "added": added,
+        "removed": removed
+    }
@@ -0,0 +1,279 @@
+"""
+Bulk upload ingestion.
+
+Turns a raw DataFrame read from an uploaded CSV, Excel, Parquet or Arrow file into the
+normalized columns consumed by :func:`app.services.columnar.calculate_bulk_gratuity_columnar`.
+Dates and salaries are parsed once per column and every row is validated in one batch,
+so all invalid rows can be reported together instead of failing on the first one.
+"""
+
+import zipfile
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..config import XLSX_HEADER_ROW, XLSX_SHEET
+from ..schemas.calculator import EmployeeType, TerminationReason
+from .bulk_input import REQUIRED_COLUMNS, OPTIONAL_COLUMNS, FIRST_DATA_ROW, ARROW_EXTENSIONS, BulkInputError, enum_error, load_arrow_io
+from .metrics import stage, count_rows
+
+def _parse_dates(column: pd.Series) -> pd.Series:
+    """
+    Parse a date column once, truncating any time of day.
+
+    The format is inferred from the column; values that do not match it are retried
+    individually so mixed formats parse the same way ``pd.to_datetime`` does per value.
+    Typed date columns (from Parquet or Arrow files) are only truncated.
+    """
+    if pd.api.types.is_datetime64_dtype(column):
+        return column.dt.normalize()
+    parsed = pd.to_datetime(column, errors="coerce")
+    retry = parsed.isna() & column.notna()
+    if retry.any():
+        parsed = parsed.copy()
+        parsed[retry] = pd.to_datetime(column[retry], errors="coerce", format="mixed")
+    return parsed.dt.normalize()
+
+def _normalize_optional(column: pd.Series) -> pd.Series:
+    """Fill missing and empty optional values with 'unknown'."""
+    column = column.fillna("unknown").astype(str)
+    return column.replace("", "unknown")
+
+def prepare_employee_frame(df: pd.DataFrame, row_offset: int = 0) -> pd.DataFrame:
+    """
+    Validate and normalize an uploaded workforce DataFrame.
+
+    Applies the same rules as :class:`IndividualCalculatorInput` to whole columns:
+    names must be strings, dates must parse, leaving date must not precede joining date,
+    salaries must be non-negative numbers and optional columns must hold valid enum values
+    (missing or empty values become 'unknown').
+
+    ``row_offset`` is the number of data rows that precede ``df`` in the file, so row
+    numbers in errors stay correct when a file is validated one chunk at a time.
+
+    Returns a new DataFrame with parsed ``datetime64`` date columns and a float salary
+    column. Raises :class:`BulkInputError` for missing columns or any invalid rows.
+    """
+    missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing_columns:
+        raise BulkInputError(f"File is missing required columns: {', '.join(missing_columns)}")
+
+    with stage("normalization"):
+        frame = pd.DataFrame(index=df.index)
+        # Names are handed to the results as Python strings; with Arrow-backed string
+        # columns they are otherwise recreated on every access
+        frame["employee_name"] = df["employee_name"].astype(object)
+        frame["joining_date"] = _parse_dates(df["joining_date"])
+        frame["leaving_date"] = _parse_dates(df["leaving_date"])
+        frame["last_drawn_salary"] = pd.to_numeric(df["last_drawn_salary"], errors="coerce").astype(float)
+
+        for col in OPTIONAL_COLUMNS:
+            if col in df.columns:
+                frame[col] = _normalize_optional(df[col])
+            else:
+                frame[col] = "unknown"
+
+    with stage("validation"):
+        errors = _validate_frame(frame, row_offset)
+
+    if errors:
+        invalid_rows = len({error["row"] for error in errors})
+        count_rows("invalid", invalid_rows)
+        raise BulkInputError(f"File contains {invalid_rows} invalid row(s)", errors)
+
+    return frame.reset_index(drop=True)
+
+def _validate_frame(frame: pd.DataFrame, row_offset: int) -> List[Dict]:
+    """Check every row of a normalized frame, returning row errors sorted by row."""
+    # Each check is a boolean mask over all rows; errors are collected before raising
+    checks = [
+        (
+            "employee_name",
+            ~frame["employee_name"].map(lambda value: isinstance(value, str)).astype(bool),
+            "Input should be a valid string"
+        ),
+        ("joining_date", frame["joining_date"].isna(), "Input should be a valid date"),
+        ("leaving_date", frame["leaving_date"].isna(), "Input should be a valid date"),
+        (
+            "leaving_date",
+            frame["leaving_date"] < frame["joining_date"],
+            "Leaving date must be after joining date"
+        ),
+        (
+            "last_drawn_salary",
+            ~np.isfinite(frame["last_drawn_salary"]),
+            "Input should be a valid number"
+        ),
+        (
+            "last_drawn_salary",
+            frame["last_drawn_salary"] < 0,
+            "Input should be greater than or equal to 0"
+        ),
+        (
+            "employee_type",
+            ~frame["employee_type"].isin([member.value for member in EmployeeType]),
+            enum_error(EmployeeType)
+        ),
+        (
+            "termination_reason",
+            ~frame["termination_reason"].isin([member.value for member in TerminationReason]),
+            enum_error(TerminationReason)
+        ),
+    ]
+
+    errors = []
+    for field, mask, message in checks:
+        positions = np.flatnonzero(np.asarray(mask, dtype=bool))
+        for position in positions.tolist():
+            errors.append({"row": position + row_offset + FIRST_DATA_ROW, "field": field, "error": message})
+
+    errors.sort(key=lambda error: error["row"])
+    return errors
+
+def read_csv_chunks(source: BinaryIO, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """
+    Read a CSV upload ``chunk_size`` rows at a time.
+
+    ``source`` is the binary file object behind an upload (e.g. ``UploadFile.file``); it is
+    decoded incrementally, so neither the raw bytes nor the decoded text is held in full.
+    """
+    source.seek(0)
+    with pd.read_csv(source, chunksize=chunk_size, encoding="utf-8") as reader:
+        while True:
+            with stage("parse"):
+                chunk = next(reader, None)
+            if chunk is None:
+                return
+            yield chunk
+
+def _sheet_row(row: tuple, width: int) -> tuple:
+    """Pad or trim a worksheet row to the width of its header."""
+    if len(row) < width:
+        return row + (None,) * (width - len(row))
+    return row[:width]
+
+def read_xlsx_chunks(source: BinaryIO, chunk_size: int, sheet: Optional[str] = None, header_row: int = 1) -> Iterator[pd.DataFrame]:
+    """
+    Read an .xlsx upload ``chunk_size`` rows at a time.
+
+    The workbook is opened in openpyxl's read-only mode, which parses the sheet XML as
+    rows are iterated instead of building a cell object for every value first, so time
+    and memory stay proportional to one chunk. ``sheet`` names the worksheet to read
+    (the first one by default) and ``header_row`` is the 1-based row holding the column
+    names; rows above it are ignored. As with ``pd.read_excel``, blank rows after the
+    last row of data are dropped while blank rows between rows of data are kept (and
+    reported as invalid), so row numbers in errors match the sheet.
+    """
+    from openpyxl import load_workbook
+    from openpyxl.utils.exceptions import InvalidFileException
+
+    source.seek(0)
+    with stage("parse"):
+        try:
+            workbook = load_workbook(source, read_only=True, data_only=True)
+        except (zipfile.BadZipFile, InvalidFileException, KeyError, ValueError):
+            raise BulkInputError("Error parsing file. Please ensure the file is properly formatted.")
+
+    try:
+        if sheet is None:
+            worksheet = workbook.worksheets[0]
+        elif sheet in workbook.sheetnames:
+            worksheet = workbook[sheet]
+        else:
+            raise BulkInputError(f"Workbook has no worksheet named '{sheet}'")
+
+        rows = worksheet.iter_rows(min_row=header_row, values_only=True)
+        header = next(rows, None) or ()
+        columns = [f"Unnamed: {i}" if name is None else name for i, name in enumerate(header)]
+
+        # Blank rows are only counted until a row of data follows them
+        blank_rows = 0
+        first = True
+        while True:
+            with stage("parse"):
+                batch = []
+                for row in rows:
+                    if all(value is None for value in row):
+                        blank_rows += 1
+                        continue
+                    batch.extend([(None,) * len(columns)] * blank_rows)
+                    blank_rows = 0
+                    batch.append(_sheet_row(row, len(columns)))
+                    if len(batch) >= chunk_size:
+                        break
+            # An empty first chunk still has its columns checked
+            if not batch and not first:
+                return
+            first = False
+            yield pd.DataFrame.from_records(batch, columns=columns)
+    finally:
+        workbook.close()
+
+def iter_prepared_chunks(chunks: Iterable[pd.DataFrame], row_offset: int = 0) -> Iterator[pd.DataFrame]:
+    """
+    Validate and normalize a sequence of raw chunks, yielding each normalized chunk.
+
+    Once a chunk contains invalid rows nothing more is yielded, but the remaining chunks
+    are still validated so the :class:`BulkInputError` raised at the end lists every
+    invalid row in the file. ``row_offset`` is the number of sheet rows above the header
+    row, so row numbers in errors match the sheet.
+    """
+    errors = []
+
+    for chunk in chunks:
+        try:
+            prepared = prepare_employee_frame(chunk, row_offset=row_offset)
+        except BulkInputError as e:
+            if not e.errors:
+                raise
+            errors.extend(e.errors)
+        else:
+            if not errors:
+                yield prepared
+        row_offset += len(chunk)
+
+    if errors:
+        invalid_rows = len({error["row"] for error in errors})
+        raise BulkInputError(f"File contains {invalid_rows} invalid row(s)", errors)
+
+def split_frame(frame: pd.DataFrame, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Yield consecutive slices of at most ``chunk_size`` rows from an already parsed frame."""
+    for start in range(0, len(frame), chunk_size):
+        yield frame.iloc[start:start + chunk_size]
+
+def iter_employee_chunks(
+    source: BinaryIO,
+    file_extension: str,
+    chunk_size: int,
+    sheet: Optional[str] = None,
+    header_row: Optional[int] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Read, validate and normalize an uploaded workforce file as chunks of rows.
+
+    CSV, .xlsx, Parquet and Arrow files are read incrementally; legacy .xls files are
+    parsed whole and then split. ``sheet`` and ``header_row`` select what is read from
+    Excel files and default to ``XLSX_SHEET`` and ``XLSX_HEADER_ROW``.
+    """
+    if file_extension == "csv":
+        return iter_prepared_chunks(read_csv_chunks(source, chunk_size))
+    if file_extension in ARROW_EXTENSIONS:
+        return iter_prepared_chunks(load_arrow_io().read_arrow_chunks(source, file_extension, chunk_size))
+
+    sheet = XLSX_SHEET if sheet is None else sheet
+    header_row = XLSX_HEADER_ROW if header_row is None else header_row
+    if file_extension == "xlsx":
+        return iter_prepared_chunks(read_xlsx_chunks(source, chunk_size, sheet, header_row), row_offset=header_row - 1)
+
+    return _read_whole_excel(source, chunk_size, sheet, header_row)
+
+def _read_whole_excel(source: BinaryIO, chunk_size: int, sheet: Optional[str], header_row: int) -> Iterator[pd.DataFrame]:
+    """Parse a legacy .xls upload whole, on the first request for a chunk, and split it."""
+    source.seek(0)
+    with stage("parse"):
+        try:
+            df = pd.read_excel(source, sheet_name=0 if sheet is None else sheet, header=header_row - 1)
+        except ValueError as e:
+            raise BulkInputError(str(e))
+    yield from split_frame(prepare_employee_frame(df, row_offset=header_row - 1), chunk_size)
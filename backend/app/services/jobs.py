@@ -0,0 +1,467 @@
+"""
+Asynchronous bulk calculation jobs.
+
+Uploads are saved to disk and processed by a pool of in-process worker threads, so the
+event loop stays free while large files are parsed and calculated. Job state and results
+are kept in a pluggable :class:`JobStore` (SQLite or plain files) that needs no external
+services.
+
+Finished jobs and their results are deleted once they are older than the configured
+time to live, and submissions beyond the queue limit are rejected instead of piling up
+on disk. Jobs cannot survive a restart of the process that runs them. Several worker
+processes on one host may share the job directory: each job records the pid of the
+process that owns it and uploads are kept in a directory per process, so a new runner
+only fails the jobs, and removes the uploads, of processes that are no longer running.
+"""
+
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import BinaryIO, Dict, Iterator, List, Optional
+
+from ..config import BULK_CHUNK_SIZE, BULK_JOB_DIR, BULK_JOB_MAX_QUEUED, BULK_JOB_STORE, BULK_JOB_TTL_SECONDS, BULK_JOB_WORKERS
+from ..schemas.calculator import BulkJobStatus
+from .executor import ExecutorBusyError
+from .metrics import observe_upload_rows
+from .results import concat_results, render_bulk_job_json, render_bulk_result_json
+
+# Jobs in these states are no longer updated
+FINISHED_STATUSES = (BulkJobStatus.COMPLETED.value, BulkJobStatus.FAILED.value)
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+class JobStore(ABC):
+    """
+    Storage backend for job state and results.
+
+    Jobs are plain dicts with the fields of :class:`BulkJob` except ``result``, plus the
+    ``owner`` pid of the process running them; results are stored separately as
+    serialized JSON because they can be large.
+    """
+
+    @abstractmethod
+    def create(self, job: Dict) -> None:
+        """Persist a new job."""
+
+    @abstractmethod
+    def update(self, job_id: str, **fields) -> None:
+        """Update fields of an existing job and refresh its ``updated_at``."""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Return a job, or None if it does not exist."""
+
+    @abstractmethod
+    def set_result(self, job_id: str, result_json: str) -> None:
+        """Store the serialized :class:`BulkCalculationResult` of a job."""
+
+    @abstractmethod
+    def get_result(self, job_id: str) -> Optional[str]:
+        """Return the serialized result of a job, or None if there is none."""
+
+    @abstractmethod
+    def list_jobs(self) -> List[Dict]:
+        """Return every stored job, without results."""
+
+    @abstractmethod
+    def delete(self, job_id: str) -> None:
+        """Remove a job and its result, if they exist."""
+
+class SQLiteJobStore(JobStore):
+    """
+    Job store backed by a local SQLite database.
+
+    A connection is opened per operation so the store can be shared between threads.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS bulk_jobs (
+                    job_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    filename TEXT NOT NULL,
+                    rows_processed INTEGER NOT NULL DEFAULT 0,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    error TEXT,
+                    result TEXT,
+                    owner INTEGER
+                )
+                """
+            )
+            # Stores created before jobs recorded their owner
+            columns = {row["name"] for row in connection.execute("PRAGMA table_info(bulk_jobs)")}
+            if "owner" not in columns:
+                connection.execute("ALTER TABLE bulk_jobs ADD COLUMN owner INTEGER")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """
+        Yield a connection whose transaction is committed, or rolled back on error.
+
+        ``sqlite3.Connection`` as a context manager only ends the transaction, so the
+        connection is closed explicitly rather than left for the garbage collector.
+        """
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def create(self, job: Dict) -> None:
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT INTO bulk_jobs (job_id, status, filename, rows_processed, created_at, updated_at, error, owner) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job["job_id"], job["status"], job["filename"], job["rows_processed"],
+                    job["created_at"], job["updated_at"], json.dumps(job["error"]), job.get("owner")
+                )
+            )
+
+    def update(self, job_id: str, **fields) -> None:
+        fields["updated_at"] = _now()
+        if "error" in fields:
+            fields["error"] = json.dumps(fields["error"])
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with self._connect() as connection:
+            connection.execute(
+                f"UPDATE bulk_jobs SET {assignments} WHERE job_id = ?",
+                (*fields.values(), job_id)
+            )
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT job_id, status, filename, rows_processed, created_at, updated_at, error, owner "
+                "FROM bulk_jobs WHERE job_id = ?",
+                (job_id,)
+            ).fetchone()
+        return _job(row) if row else None
+
+    def set_result(self, job_id: str, result_json: str) -> None:
+        with self._connect() as connection:
+            connection.execute("UPDATE bulk_jobs SET result = ? WHERE job_id = ?", (result_json, job_id))
+
+    def get_result(self, job_id: str) -> Optional[str]:
+        with self._connect() as connection:
+            row = connection.execute("SELECT result FROM bulk_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return row["result"] if row else None
+
+    def list_jobs(self) -> List[Dict]:
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT job_id, status, filename, rows_processed, created_at, updated_at, error, owner FROM bulk_jobs"
+            ).fetchall()
+        return [_job(row) for row in rows]
+
+    def delete(self, job_id: str) -> None:
+        with self._connect() as connection:
+            connection.execute("DELETE FROM bulk_jobs WHERE job_id = ?", (job_id,))
+
+def _job(row: sqlite3.Row) -> Dict:
+    job = dict(row)
+    job["error"] = json.loads(job["error"]) if job["error"] else None
+    return job
+
+class FileSystemJobStore(JobStore):
+    """
+    Job store that keeps one JSON file per job, plus one file per result, in a directory.
+
+    Files are replaced atomically so readers never see a partially written job.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, job_id: str, suffix: str) -> str:
+        # Job ids are generated by the runner, but never let one escape the directory
+        return os.path.join(self.directory, f"{os.path.basename(job_id)}.{suffix}")
+
+    def _write(self, path: str, content: str) -> None:
+        temporary_path = f"{path}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as handle:
+            handle.write(content)
+        os.replace(temporary_path, path)
+
+    def create(self, job: Dict) -> None:
+        self._write(self._path(job["job_id"], "json"), json.dumps(job))
+
+    def update(self, job_id: str, **fields) -> None:
+        with self._lock:
+            job = self.get(job_id)
+            if job is None:
+                return
+            job.update(fields, updated_at=_now())
+            self._write(self._path(job_id, "json"), json.dumps(job))
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        try:
+            with open(self._path(job_id, "json"), encoding="utf-8") as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            return None
+
+    def set_result(self, job_id: str, result_json: str) -> None:
+        self._write(self._path(job_id, "result.json"), result_json)
+
+    def get_result(self, job_id: str) -> Optional[str]:
+        try:
+            with open(self._path(job_id, "result.json"), encoding="utf-8") as handle:
+                return handle.read()
+        except FileNotFoundError:
+            return None
+
+    def list_jobs(self) -> List[Dict]:
+        jobs = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json") and not name.endswith(".result.json"):
+                job = self.get(name[:-len(".json")])
+                if job is not None:
+                    jobs.append(job)
+        return jobs
+
+    def delete(self, job_id: str) -> None:
+        for suffix in ("json", "result.json"):
+            try:
+                os.remove(self._path(job_id, suffix))
+            except FileNotFoundError:
+                pass
+
+def _process_exists(pid: Optional[int]) -> bool:
+    """Whether a process with this pid is running on this host."""
+    if pid is None:
+        return False
+    if os.name == "nt":
+        # os.kill would terminate the process instead of probing it
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def _remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+class JobRunner:
+    """
+    Runs bulk calculation jobs on a pool of in-process worker threads.
+
+    At most ``max_queued`` jobs are queued or running at once; further submissions raise
+    :class:`ExecutorBusyError` before their upload is copied. Finished jobs are deleted
+    ``ttl`` seconds after they finish. A limit or ``ttl`` of 0 disables it.
+
+    Uploads are saved under ``upload_dir`` in a directory named after the pid of the
+    process, which owns the jobs it submits.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        upload_dir: str,
+        max_workers: int = BULK_JOB_WORKERS,
+        max_queued: int = BULK_JOB_MAX_QUEUED,
+        ttl: float = BULK_JOB_TTL_SECONDS
+    ):
+        self.store = store
+        self.owner = os.getpid()
+        self.upload_root = upload_dir
+        self.upload_dir = os.path.join(upload_dir, str(self.owner))
+        self.max_queued = max_queued
+        self.ttl = ttl
+        self.pending = 0
+        self._lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bulk-job")
+        self._fail_interrupted_jobs()
+        os.makedirs(self.upload_dir, exist_ok=True)
+        self.remove_expired()
+
+    def _is_interrupted(self, owner: Optional[int]) -> bool:
+        # A new runner never inherits jobs, so its own pid can only come from an earlier
+        # process that had the same pid
+        return owner == self.owner or not _process_exists(owner)
+
+    def _fail_interrupted_jobs(self) -> None:
+        """
+        Mark jobs left unfinished by processes that are no longer running as failed and
+        drop their uploads; jobs of other live processes are left alone.
+        """
+        for job in self.store.list_jobs():
+            if job["status"] not in FINISHED_STATUSES and self._is_interrupted(job.get("owner")):
+                self.store.update(
+                    job["job_id"],
+                    status=BulkJobStatus.FAILED.value,
+                    error="The job was interrupted before it finished. Please submit the file again."
+                )
+        os.makedirs(self.upload_root, exist_ok=True)
+        for name in os.listdir(self.upload_root):
+            if name.isdigit() and not self._is_interrupted(int(name)):
+                continue
+            path = os.path.join(self.upload_root, name)
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                _remove_file(path)
+
+    def _is_expired(self, job: Dict) -> bool:
+        if not self.ttl or job["status"] not in FINISHED_STATUSES:
+            return False
+        age = datetime.now(timezone.utc) - datetime.fromisoformat(job["updated_at"])
+        return age.total_seconds() > self.ttl
+
+    def remove_expired(self) -> int:
+        """Delete finished jobs older than the time to live; returns how many were deleted."""
+        expired = [job["job_id"] for job in self.store.list_jobs() if self._is_expired(job)]
+        for job_id in expired:
+            self.store.delete(job_id)
+        return len(expired)
+
+    def submit(self, source: BinaryIO, filename: str, file_extension: str) -> Dict:
+        """
+        Save an upload to disk, queue it for processing and return the new job.
+
+        Raises :class:`ExecutorBusyError` when the queue is full.
+        """
+        with self._lock:
+            if self.max_queued and self.pending >= self.max_queued:
+                raise ExecutorBusyError("Too many bulk jobs are waiting to be processed. Please retry shortly.")
+            self.pending += 1
+
+        job_id = uuid.uuid4().hex
+        upload_path = os.path.join(self.upload_dir, f"{job_id}.{file_extension}")
+        try:
+            self.remove_expired()
+
+            source.seek(0)
+            with open(upload_path, "wb") as target:
+                shutil.copyfileobj(source, target)
+
+            timestamp = _now()
+            job = {
+                "job_id": job_id,
+                "status": BulkJobStatus.QUEUED.value,
+                "filename": filename,
+                "rows_processed": 0,
+                "created_at": timestamp,
+                "updated_at": timestamp,
+                "error": None,
+                "owner": self.owner
+            }
+            self.store.create(job)
+            self.executor.submit(self._run, job_id, upload_path, file_extension)
+        except BaseException:
+            self._finish()
+            _remove_file(upload_path)
+            raise
+        return job
+
+    def _finish(self) -> None:
+        with self._lock:
+            self.pending -= 1
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Return a job without its result, or None if it does not exist or has expired."""
+        job = self.store.get(job_id)
+        if job is not None and self._is_expired(job):
+            self.store.delete(job_id)
+            return None
+        return job
+
+    def get_json(self, job_id: str) -> Optional[bytes]:
+        """
+        Return a job encoded as :class:`BulkJob` JSON, with its result once it has completed.
+
+        The stored result JSON is copied into the response without being decoded, so
+        polling a large completed job costs no more than reading its result.
+        """
+        job = self.get(job_id)
+        if job is None:
+            return None
+        result_json = None
+        if job["status"] == BulkJobStatus.COMPLETED.value:
+            result_json = self.store.get_result(job_id)
+        return render_bulk_job_json(job, result_json)
+
+    def _run(self, job_id: str, upload_path: str, file_extension: str) -> None:
+        """Process one job; runs on a worker thread."""
+        # Imported here so the API can depend on the runner without loading pandas
+        import pandas as pd
+        from .bulk import BulkTotals, iter_bulk_gratuity_chunks
+        from .ingestion import BulkInputError, iter_employee_chunks
+
+        self.store.update(job_id, status=BulkJobStatus.RUNNING.value)
+
+        try:
+            with open(upload_path, "rb") as source:
+                totals = BulkTotals()
+                parts = []
+                rows_processed = 0
+                chunks = iter_employee_chunks(source, file_extension, BULK_CHUNK_SIZE)
+
+                for chunk_result in iter_bulk_gratuity_chunks(chunks, totals):
+                    parts.append(chunk_result["results"])
+                    rows_processed += len(chunk_result["results"])
+                    self.store.update(job_id, rows_processed=rows_processed)
+
+            observe_upload_rows(totals.row_count)
+            result = {"results": concat_results(parts), **totals.as_dict()}
+            self.store.set_result(job_id, render_bulk_result_json(result).decode("utf-8"))
+            self.store.update(job_id, status=BulkJobStatus.COMPLETED.value)
+        except BulkInputError as e:
+            self.store.update(job_id, status=BulkJobStatus.FAILED.value, error=e.detail)
+        except (pd.errors.ParserError, UnicodeDecodeError):
+            self.store.update(
+                job_id,
+                status=BulkJobStatus.FAILED.value,
+                error="Error parsing file. Please ensure the file is properly formatted."
+            )
+        except Exception as e:
+            self.store.update(
+                job_id,
+                status=BulkJobStatus.FAILED.value,
+                error=f"An error occurred while processing the file: {str(e)}"
+            )
+        finally:
+            self._finish()
+            _remove_file(upload_path)
+
+def create_job_store(kind: str = BULK_JOB_STORE, directory: str = BULK_JOB_DIR) -> JobStore:
+    """Create the configured job store."""
+    if kind == "sqlite":
+        return SQLiteJobStore(os.path.join(directory, "jobs.sqlite3"))
+    if kind == "filesystem":
+        return FileSystemJobStore(os.path.join(directory, "jobs"))
+    raise ValueError(f"Unknown job store: {kind}")
+
+_runner: Optional[JobRunner] = None
+_runner_lock = threading.Lock()
+
+def get_job_runner() -> JobRunner:
+    """Return the process-wide job runner, creating it on first use."""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner(create_job_store(), os.path.join(BULK_JOB_DIR, "uploads"))
+        return _runner
@@ -0,0 +1,136 @@
+"""
+Admission control for bulk uploads.
+
+Every bulk request holds an uploaded file and, while it is processed, parsed frames and
+results in memory, so a few oversized or simultaneous uploads can exhaust a worker for
+everyone. :class:`BulkLimitMiddleware` bounds both per process:
+
+- request bodies larger than ``max_upload_bytes`` are rejected with 413, from the
+  Content-Length header before any of the body is read, or as soon as a body sent
+  without one grows past the limit;
+- at most ``max_concurrent`` bulk requests are in flight at once. Further requests get
+  503 with a Retry-After header straight away, before their upload is read, instead of
+  queueing.
+
+Uploaded files themselves are spooled to disk by the multipart parser once they pass
+``UPLOAD_SPOOL_MAX_BYTES``; :func:`configure_upload_spooling` sets this up and is called
+once from :mod:`app.main`.
+"""
+
+from typing import Optional
+
+from starlette.exceptions import HTTPException
+from starlette.formparsers import MultiPartParser
+from starlette.responses import JSONResponse
+
+from ..config import BULK_MAX_CONCURRENT_REQUESTS, BULK_MAX_UPLOAD_BYTES, RETRY_AFTER_SECONDS, UPLOAD_SPOOL_MAX_BYTES
+
+# Requests under this path that send a body are limited
+BULK_PATH_PREFIX = "/calculator/bulk"
+
+def configure_upload_spooling(max_bytes: int = UPLOAD_SPOOL_MAX_BYTES) -> None:
+    """
+    Spool uploaded files larger than ``max_bytes`` to a temporary file on disk.
+
+    Starlette has no per-request setting for this (``max_part_size`` only bounds
+    non-file fields), so the multipart parser's class default is changed for the whole
+    process. Raises ``RuntimeError`` if Starlette no longer has that default, rather than
+    silently keeping its own.
+    """
+    if not isinstance(getattr(MultiPartParser, "spool_max_size", None), int):
+        raise RuntimeError("starlette.formparsers.MultiPartParser.spool_max_size no longer exists; upload spooling cannot be configured")
+    MultiPartParser.spool_max_size = max_bytes
+
+class BulkLimiter:
+    """
+    Limits and in-flight count shared by the bulk endpoints of one process.
+
+    A limit of 0 disables that check.
+    """
+
+    def __init__(self, max_upload_bytes: int = BULK_MAX_UPLOAD_BYTES, max_concurrent: int = BULK_MAX_CONCURRENT_REQUESTS):
+        self.max_upload_bytes = max_upload_bytes
+        self.max_concurrent = max_concurrent
+        self.active = 0
+
+    def too_large_message(self) -> str:
+        return f"Upload is too large. The maximum size is {self.max_upload_bytes} bytes."
+
+    def is_full(self) -> bool:
+        return bool(self.max_concurrent) and self.active >= self.max_concurrent
+
+bulk_limiter = BulkLimiter()
+
+def _content_length(scope) -> Optional[int]:
+    for name, value in scope["headers"]:
+        if name == b"content-length":
+            try:
+                return int(value)
+            except ValueError:
+                return None
+    return None
+
+class BulkLimitMiddleware:
+    """
+    ASGI middleware enforcing a :class:`BulkLimiter` on POST and PUT requests to the bulk
+    endpoints.
+
+    Requests count as in flight until the last body chunk of their response has been
+    sent, so streamed downloads hold their slot for as long as they use memory.
+    """
+
+    def __init__(self, app, limiter: BulkLimiter = bulk_limiter, path_prefix: str = BULK_PATH_PREFIX):
+        self.app = app
+        self.limiter = limiter
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("POST", "PUT") or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiter
+        if limiter.max_upload_bytes:
+            content_length = _content_length(scope)
+            if content_length is not None and content_length > limiter.max_upload_bytes:
+                response = JSONResponse({"detail": limiter.too_large_message()}, status_code=413)
+                await response(scope, receive, send)
+                return
+            receive = self._limit_body(receive)
+
+        if limiter.is_full():
+            response = JSONResponse(
+                {"detail": "Too many uploads are being processed. Please retry shortly."},
+                status_code=503,
+                headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+            )
+            await response(scope, receive, send)
+            return
+
+        # Only the event loop thread touches the counter, so no lock is needed
+        limiter.active += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.active -= 1
+
+    def _limit_body(self, receive):
+        """
+        Wrap ``receive`` to stop reading a body once it passes the upload limit.
+
+        The 413 is raised as an ``HTTPException`` from inside the request body parsing,
+        which FastAPI passes on to its exception handlers.
+        """
+        limiter = self.limiter
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limiter.max_upload_bytes:
+                    raise HTTPException(status_code=413, detail=limiter.too_large_message())
+            return message
+
+        return limited_receive
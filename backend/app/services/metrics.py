@@ -0,0 +1,269 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Bulk uploads are timed per stage (upload read, parse, normalization, validation,
+hashing, calculation, serialization) with :func:`stage`, rows are counted with :func:`count_rows`,
+the size of each upload is recorded with :func:`observe_upload_rows` and every HTTP
+request is timed by :class:`MetricsMiddleware`. The registry is rendered
+by the ``/metrics`` endpoint.
+
+When metrics are disabled (``GRATIFY_METRICS_ENABLED=0``) :func:`stage` returns a shared
+no-op context manager and the counters return immediately, so the hooks can stay on the
+hot path. Work run on a process pool is recorded in the worker processes and does not
+show up here.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from ..config import METRICS_ENABLED
+
+# Upper bounds, in seconds, of the duration histogram buckets
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Upper bounds of the rows-per-upload histogram buckets
+ROW_BUCKETS = (10, 100, 1_000, 10_000, 100_000, 1_000_000)
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labelnames: Sequence[str], values: Sequence, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+class Counter:
+    """A monotonically increasing value per combination of label values."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, *labelvalues) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues) -> float:
+        return self._values.get(labelvalues, 0)
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = list(self._values.items())
+        for labelvalues, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}"
+
+class Histogram:
+    """Observations counted into cumulative buckets, with their sum and count."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DURATION_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labelvalues -> [per-bucket counts (last is +Inf), sum]
+        self._values: Dict[Tuple, List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labelvalues)
+            if entry is None:
+                entry = self._values[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def count(self, *labelvalues) -> int:
+        entry = self._values.get(labelvalues)
+        return sum(entry[0]) if entry else 0
+
+    def total(self, *labelvalues) -> float:
+        entry = self._values.get(labelvalues)
+        return entry[1] if entry else 0.0
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = [(labelvalues, list(counts), total) for labelvalues, (counts, total) in self._values.items()]
+        for labelvalues, counts, total in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, labelvalues, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, labelvalues)
+            yield f"{self.name}_sum{labels} {_format_value(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+class CallbackMetric:
+    """
+    A metric whose samples are read from a callback at scrape time.
+
+    ``callback`` returns ``(labelvalues, value)`` pairs; it is used to expose counters
+    that are already kept elsewhere, such as cache statistics.
+    """
+
+    def __init__(self, name: str, help: str, type: str, labelnames: Sequence[str], callback: Callable[[], Iterable[Tuple[Tuple, float]]]):
+        self.name = name
+        self.help = help
+        self.type = type
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+
+    def samples(self) -> Iterable[str]:
+        for labelvalues, value in self.callback():
+            yield f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}"
+
+class MetricsRegistry:
+    """A named collection of metrics rendered together."""
+
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        self._metrics: Dict[str, object] = {}
+
+    def register(self, metric):
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+registry = MetricsRegistry()
+
+stage_duration = registry.register(Histogram(
+    "gratify_stage_duration_seconds",
+    "Time spent in each stage of bulk processing.",
+    ["stage"]
+))
+rows_total = registry.register(Counter(
+    "gratify_rows_total",
+    "Bulk rows processed, by outcome.",
+    ["outcome"]
+))
+upload_rows = registry.register(Histogram(
+    "gratify_bulk_upload_rows",
+    "Rows per bulk upload.",
+    buckets=ROW_BUCKETS
+))
+requests_total = registry.register(Counter(
+    "gratify_http_requests_total",
+    "HTTP requests handled, by route and status.",
+    ["method", "route", "status"]
+))
+request_duration = registry.register(Histogram(
+    "gratify_http_request_duration_seconds",
+    "HTTP request latency until the response body has been sent.",
+    ["method", "route"]
+))
+
+class _StageTimer:
+    __slots__ = ("name", "started")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        stage_duration.observe(time.perf_counter() - self.started, self.name)
+        return False
+
+_DISABLED_STAGE = nullcontext()
+
+def stage(name: str):
+    """
+    Time a block of bulk processing as stage ``name``::
+
+        with stage("parse"):
+            df = pd.read_csv(source)
+    """
+    if not registry.enabled:
+        return _DISABLED_STAGE
+    return _StageTimer(name)
+
+def count_rows(outcome: str, rows: int) -> None:
+    """Add ``rows`` to the bulk row counter for ``outcome`` (e.g. "calculated", "invalid")."""
+    if registry.enabled and rows:
+        rows_total.inc(rows, outcome)
+
+def observe_upload_rows(rows: int) -> None:
+    """
+    Record the number of rows of one bulk upload.
+
+    Called once per request from its final totals, since chunked and incremental uploads
+    call the calculator many times, with only part of the upload each time.
+    """
+    if registry.enabled:
+        upload_rows.observe(rows)
+
+class MetricsMiddleware:
+    """
+    ASGI middleware that counts and times HTTP requests by route template.
+
+    Timing ends once the last body chunk has been sent, so streamed responses are
+    measured in full.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not registry.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            # Route templates keep label cardinality bounded; unmatched paths share one label
+            route_path = getattr(route, "path", "unmatched")
+            request_duration.observe(time.perf_counter() - started, scope["method"], route_path)
+            requests_total.inc(1, scope["method"], route_path, str(status))
+
+def register_stats(name: str, help: str, label: str, sources: Dict[str, Callable[[], Dict]], key: str, type: str = "counter") -> CallbackMetric:
+    """
+    Expose one field of several ``stats()`` dicts as a labelled callback metric.
+
+    For example ``register_stats("gratify_cache_hits_total", ..., "cache", caches, "hits")``
+    yields one ``gratify_cache_hits_total{cache="..."}`` sample per cache.
+    """
+    def collect():
+        for source, stats in sources.items():
+            yield (source,), stats()[key]
+
+    return registry.register(CallbackMetric(name, help, type, [label], collect))
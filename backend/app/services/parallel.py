@@ -0,0 +1,62 @@
+"""
+Multi-core bulk calculation.
+
+Splits a workforce into shards, computes them on a process pool and merges the shard
+results back in input order. Each shard runs the regular sequential path, so results are
+identical to computing the whole workforce in one process.
+"""
+
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+from .bulk import BulkTotals
+from .results import concat_results
+
+_pools: Dict[int, ProcessPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+def get_process_pool(workers: int) -> ProcessPoolExecutor:
+    """Return a shared process pool with ``workers`` processes, creating it on first use."""
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=workers)
+            _pools[workers] = pool
+        return pool
+
+def shutdown_process_pools() -> None:
+    """Stop all shared process pools."""
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown(wait=True)
+        _pools.clear()
+
+def split_shards(employees, shard_size: int) -> List:
+    """Split a list of inputs or a DataFrame into consecutive shards of ``shard_size``."""
+    if hasattr(employees, "iloc"):
+        return [employees.iloc[start:start + shard_size] for start in range(0, len(employees), shard_size)]
+    return [employees[start:start + shard_size] for start in range(0, len(employees), shard_size)]
+
+def merge_shard_results(shard_results: Sequence[Dict]) -> Dict:
+    """Concatenate shard results in order and add up their totals."""
+    totals = BulkTotals()
+    for shard_result in shard_results:
+        totals.add(shard_result)
+    results = concat_results(shard_result["results"] for shard_result in shard_results)
+    return {"results": results, **totals.as_dict()}
+
+def calculate_bulk_gratuity_parallel(employees, workers: int, shard_size: int, pool: Optional[ProcessPoolExecutor] = None) -> Dict:
+    """
+    Calculate gratuity for a workforce in shards on a process pool.
+
+    ``employees`` is anything :func:`app.services.calculator.calculate_bulk_gratuity`
+    accepts. Returns the same structure, with results in input order.
+    """
+    from .calculator import calculate_bulk_gratuity
+
+    shards = split_shards(employees, shard_size)
+    pool = pool or get_process_pool(workers)
+
+    # map() yields results in submission order regardless of completion order
+    return merge_shard_results(list(pool.map(calculate_bulk_gratuity, shards)))
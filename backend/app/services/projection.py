@@ -0,0 +1,253 @@
+"""
+Gratuity liability projection.
+
+:func:`app.services.calculator.calculate_individual_gratuity` answers what is owed on one
+leaving date. For provisioning, the liability of a whole workforce is needed at many
+future dates, such as every month end for the next ten years: the gratuity each employee
+would be owed if they left on that date.
+
+The projection is computed as an employees x dates matrix of integer paise. Rounded years
+of service only change at a handful of dates per employee, so instead of evaluating
+``relativedelta`` for every cell, each employee's next step date is kept and the years
+column is advanced as the grid passes it. Eligibility, the gratuity formula and the cap
+are the vectorized rules of :mod:`app.services.columnar`, applied to whole grid columns.
+
+The matrix is computed a block of employees at a time and the blocks are kept as they
+are rather than stacked into one array. Per-employee results are bounded by a maximum
+number of employee x date cells; totals alone have no limit.
+"""
+
+from bisect import bisect_right
+from collections.abc import Sequence
+from datetime import date
+from json.encoder import encode_basestring
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..config import PROJECTION_MAX_CELLS
+from ..schemas.calculator import EmployeeType, TerminationReason
+from .bulk_input import BulkInputError
+from .calculator import MAX_GRATUITY_PAISE, calculate_gratuity_amount
+from .columnar import (
+    MIN_YEARS_OF_SERVICE,
+    _add_months,
+    _enum_column,
+    _split_dates,
+    denominator_columns,
+    eligibility_columns,
+    salary_paise_columns,
+    to_day_array,
+    to_decimal,
+    years_of_service_columns
+)
+from .fixed_point import GRATUITY_DAYS, paise_to_decimal, round_half_up_div, rupees_to_paise
+from .ingestion import split_frame
+from .metrics import stage
+
+# Employee x date cells computed at a time, which bounds the size of the intermediate
+# matrices of project_liability_frame
+BLOCK_CELLS = 1_000_000
+
+def month_end_grid(start: date, periods: int) -> List[date]:
+    """Return ``periods`` consecutive month ends, starting with the month of ``start``."""
+    months = np.datetime64(start, "M") + np.arange(1, periods + 1).astype("timedelta64[M]")
+    return (months.astype("datetime64[D]") - np.timedelta64(1, "D")).tolist()
+
+def _next_step(joining: np.ndarray, joining_day: np.ndarray, years: np.ndarray) -> np.ndarray:
+    """
+    First date on which rounded years of service exceed ``years``.
+
+    Service rounds up to ``years + 1`` once it reaches ``years`` years and 6 months, or
+    ``years`` years, 5 months and 30 days, whichever comes first.
+    """
+    months = years.astype(np.int64) * 12 + 5
+    five_months = _add_months(joining, joining_day, months)
+    six_months = _add_months(joining, joining_day, months + 1)
+    return np.minimum(five_months + np.timedelta64(30, "D"), six_months)
+
+def years_of_service_grid(joining: np.ndarray, grid: np.ndarray) -> np.ndarray:
+    """
+    Rounded years of service of every employee on every grid date, as an int32 matrix.
+
+    Equivalent to :func:`app.services.columnar.years_of_service_columns` for each grid
+    column (with dates before joining counting as joining day), but built incrementally:
+    each column starts from the previous one and only employees whose next step date has
+    passed are advanced. ``grid`` must be sorted in ascending order.
+    """
+    joining = joining.astype("datetime64[D]")
+    years = np.zeros((len(joining), len(grid)), dtype=np.int32)
+    if len(grid) == 0 or len(joining) == 0:
+        return years
+
+    _, joining_day, _ = _split_dates(joining)
+    current = years_of_service_columns(joining, np.maximum(joining, grid[0]))
+    next_step = _next_step(joining, joining_day, current)
+
+    for column, day in enumerate(grid):
+        due = np.flatnonzero(next_step <= day)
+        # Grids coarser than half a year can step an employee more than once
+        while len(due):
+            current[due] += 1
+            next_step[due] = _next_step(joining[due], joining_day[due], current[due])
+            due = due[next_step[due] <= day]
+        years[:, column] = current
+    return years
+
+def project_liability_frame(frame: pd.DataFrame, grid: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Project the gratuity liability of every employee in a normalized frame.
+
+    Each employee is projected from their joining date up to and including their leaving
+    date, which is read as the date they are expected to leave (for example on
+    retirement); outside that range they contribute nothing.
+
+    Returns employees x dates matrices of the liabilities in paise, of whether each
+    employee is eligible for gratuity, and of whether they are still employed.
+    """
+    joining = to_day_array(frame["joining_date"].to_numpy())
+    leaving = to_day_array(frame["leaving_date"].to_numpy())
+    salary = frame["last_drawn_salary"].to_numpy()
+    employee_types = _enum_column(frame["employee_type"], EmployeeType, EmployeeType.STANDARD)
+    termination_reasons = _enum_column(frame["termination_reason"], TerminationReason, TerminationReason.RESIGNATION)
+
+    years = years_of_service_grid(joining, grid)
+    active = (grid[None, :] >= joining[:, None]) & (grid[None, :] <= leaving[:, None])
+    # Death and disability are eligible with no minimum service; everyone else after 5 years
+    always_eligible = eligibility_columns(np.zeros(len(frame), dtype=np.int64), termination_reasons)
+    eligible = (always_eligible[:, None] | (years >= MIN_YEARS_OF_SERVICE)) & active
+
+    paise, exact = salary_paise_columns(salary)
+    denominator = denominator_columns(employee_types)[:, None]
+    numerator = paise[:, None] * years.astype(np.int64) * GRATUITY_DAYS
+    liability = np.minimum(round_half_up_div(numerator, denominator), MAX_GRATUITY_PAISE)
+    liability = np.where(eligible, liability, 0)
+
+    # Salaries that are not whole paise use the Decimal formula, one cell at a time
+    for i in np.flatnonzero(~exact).tolist():
+        salary_value = to_decimal(salary[i])
+        for j in np.flatnonzero(eligible[i]).tolist():
+            amount = calculate_gratuity_amount(salary_value, int(years[i, j]), employee_types[i], termination_reasons[i])
+            liability[i, j] = rupees_to_paise(amount)
+
+    return liability, eligible, active
+
+def project_liability(
+    chunks: Iterable[pd.DataFrame],
+    dates: List[date],
+    include_employees: bool = True,
+    max_cells: int = PROJECTION_MAX_CELLS
+) -> Dict:
+    """
+    Project the gratuity liability of a workforce on every date of a grid.
+
+    ``chunks`` are normalized frames as yielded by
+    :func:`app.services.ingestion.iter_employee_chunks` and ``dates`` must be in ascending
+    order. Returns a :class:`LiabilityProjection` dict whose ``employees`` (None unless
+    ``include_employees``) is a :class:`LiabilityMatrix`.
+
+    Raises :class:`BulkInputError` as soon as per-employee results would exceed
+    ``max_cells`` employee x date cells (0 disables the limit).
+    """
+    grid = np.array(dates, dtype="datetime64[D]")
+    if np.any(grid[1:] <= grid[:-1]):
+        raise ValueError("Projection dates must be in ascending order without duplicates")
+
+    totals = np.zeros(len(grid), dtype=np.int64)
+    employee_count = np.zeros(len(grid), dtype=np.int64)
+    eligible_count = np.zeros(len(grid), dtype=np.int64)
+    names: List[str] = []
+    blocks: List[np.ndarray] = []
+    block_rows = max(1, BLOCK_CELLS // max(1, len(grid)))
+
+    for frame in chunks:
+        if include_employees and max_cells and (len(names) + len(frame)) * len(grid) > max_cells:
+            raise BulkInputError(
+                f"A projection with per-employee liabilities can cover at most {max_cells} "
+                "employee-dates. Request fewer dates, or only the totals with summary_only."
+            )
+        for block in split_frame(frame, block_rows):
+            with stage("calculation"):
+                liability, eligible, active = project_liability_frame(block, grid)
+                employee_count += active.sum(axis=0)
+                eligible_count += eligible.sum(axis=0)
+                totals += liability.sum(axis=0)
+            if include_employees:
+                names.extend(block["employee_name"].tolist())
+                blocks.append(liability)
+
+    employees = LiabilityMatrix(names, blocks) if include_employees else None
+
+    return {
+        "dates": grid.tolist(),
+        "total_liability": [paise_to_decimal(total) for total in totals.tolist()],
+        "employee_count": employee_count.tolist(),
+        "eligible_count": eligible_count.tolist(),
+        "employees": employees
+    }
+
+def _paise_json(paise: int) -> str:
+    rupees, remainder = divmod(paise, 100)
+    return f'"{rupees}.{remainder:02d}"'
+
+class LiabilityMatrix(Sequence):
+    """
+    Per-employee projected liabilities, stored as int64 paise matrices of consecutive
+    employees, one per calculated block.
+
+    Reads as a sequence of :class:`EmployeeLiability` dicts, built on demand.
+    """
+
+    __slots__ = ("employee_name", "blocks", "_starts")
+
+    def __init__(self, employee_name: List[str], blocks: List[np.ndarray]):
+        self.employee_name = employee_name
+        self.blocks = blocks
+        # Index of the first employee of every block
+        self._starts = np.cumsum([0] + [len(block) for block in blocks]).tolist()
+
+    def __len__(self) -> int:
+        return len(self.employee_name)
+
+    def _row(self, index: int) -> np.ndarray:
+        block = bisect_right(self._starts, index) - 1
+        return self.blocks[block][index - self._starts[block]]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("employee index out of range")
+        return {
+            "employee_name": self.employee_name[index],
+            "liabilities": [paise_to_decimal(paise) for paise in self._row(index).tolist()]
+        }
+
+    def iter_json(self) -> Iterator[str]:
+        """Yield every employee as compact JSON, as ``EmployeeLiability.model_dump_json`` would."""
+        zero = _paise_json(0)
+        names = iter(self.employee_name)
+        for block in self.blocks:
+            # The block comes first so zip stops without taking a name from the next block
+            for row, name in zip(block.tolist(), names):
+                liabilities = ",".join([_paise_json(paise) if paise else zero for paise in row])
+                yield f'{{"employee_name":{encode_basestring(name)},"liabilities":[{liabilities}]}}'
+
+def render_projection_json(projection: Dict) -> bytes:
+    """Encode a projection dict the way ``LiabilityProjection(...).model_dump_json()`` would."""
+    dates = ",".join(f'"{day.isoformat()}"' for day in projection["dates"])
+    totals = ",".join(f'"{total}"' for total in projection["total_liability"])
+    employees = projection["employees"]
+    employees_json = "null" if employees is None else "[" + ",".join(employees.iter_json()) + "]"
+    return (
+        f'{{"dates":[{dates}],"total_liability":[{totals}],'
+        f'"employee_count":{_int_list(projection["employee_count"])},'
+        f'"eligible_count":{_int_list(projection["eligible_count"])},'
+        f'"employees":{employees_json}}}'
+    ).encode("utf-8")
+
+def _int_list(values: Iterable[int]) -> str:
+    return "[" + ",".join(str(int(value)) for value in values) + "]"
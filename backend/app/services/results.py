@@ -0,0 +1,353 @@
+"""
+Compact storage and direct JSON encoding of bulk calculation results.
+
+A bulk result used to be a list with one ten-key dict per employee, each holding its own
+Decimal and date objects. :class:`ResultColumns` keeps the same data column by column
+instead: dates, years and gratuity amounts live in stdlib ``array`` columns, and text and
+enum columns hold references to shared objects. Per-row memory drops by about an order
+of magnitude, and the container needs neither NumPy nor pandas.
+
+It still behaves as a sequence of result dicts (indexing and iteration build the dicts on
+demand), so code that reads results row by row keeps working. The API encodes it straight
+to JSON with :func:`render_bulk_result_json`, without validating every row through
+:class:`app.schemas.calculator.BulkCalculationResult`.
+"""
+
+import json
+from array import array
+from collections.abc import Sequence
+from datetime import date
+from decimal import Decimal
+from json.encoder import encode_basestring
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from ..schemas.calculator import BulkCalculationResult, BulkJob, EmployeeType, GratuityResult, TerminationReason
+from .fixed_point import PAISE_PER_RUPEE, paise_to_decimal, rupees_to_paise
+
+# Dates are stored as days since 1970-01-01, the same epoch as NumPy's datetime64[D]
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+# Rows materialized at a time when iterating or encoding
+ITER_BLOCK_SIZE = 4096
+
+# JSON string literals of every enum member, encoded once
+_ENUM_JSON = {member: f'"{member.value}"' for member in (*EmployeeType, *TerminationReason)}
+
+def _to_decimal(value) -> Decimal:
+    """Convert a stored salary to Decimal the way the Pydantic input schema does."""
+    if isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
+class ResultColumns(Sequence):
+    """
+    Bulk results stored as one column per :class:`GratuityResult` field.
+
+    ``joining_date`` and ``leaving_date`` are ``array('i')`` of days since 1970-01-01,
+    ``years_of_service`` and ``gratuity_paise`` are ``array('q')`` and ``is_eligible``
+    is ``array('b')``. ``last_drawn_salary`` is an ``array('d')`` or ``array('q')`` of
+    numeric salaries or a list of Decimals; the remaining columns are lists.
+
+    Indexing and iteration yield the same dicts as
+    :func:`app.services.calculator.calculate_individual_gratuity`; slicing returns
+    another :class:`ResultColumns`.
+    """
+
+    __slots__ = (
+        "employee_name",
+        "joining_date",
+        "leaving_date",
+        "last_drawn_salary",
+        "years_of_service",
+        "gratuity_paise",
+        "employee_type",
+        "termination_reason",
+        "is_eligible",
+        "message"
+    )
+
+    def __init__(
+        self,
+        employee_name: List[str],
+        joining_date: array,
+        leaving_date: array,
+        last_drawn_salary,
+        years_of_service: array,
+        gratuity_paise: array,
+        employee_type: List[EmployeeType],
+        termination_reason: List[TerminationReason],
+        is_eligible: array,
+        message: List
+    ):
+        self.employee_name = employee_name
+        self.joining_date = joining_date
+        self.leaving_date = leaving_date
+        self.last_drawn_salary = last_drawn_salary
+        self.years_of_service = years_of_service
+        self.gratuity_paise = gratuity_paise
+        self.employee_type = employee_type
+        self.termination_reason = termination_reason
+        self.is_eligible = is_eligible
+        self.message = message
+
+    @classmethod
+    def empty(cls) -> "ResultColumns":
+        return cls([], array("i"), array("i"), [], array("q"), array("q"), [], [], array("b"), [])
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict]) -> "ResultColumns":
+        """
+        Build columns from result dicts, consuming ``records`` one at a time.
+
+        Identical messages are stored once, so a generator of fresh dicts leaves nothing
+        per row behind but the column entries.
+        """
+        columns = cls.empty()
+        messages = {}
+        for record in records:
+            columns.employee_name.append(record["employee_name"])
+            columns.joining_date.append(record["joining_date"].toordinal() - EPOCH_ORDINAL)
+            columns.leaving_date.append(record["leaving_date"].toordinal() - EPOCH_ORDINAL)
+            columns.last_drawn_salary.append(record["last_drawn_salary"])
+            columns.years_of_service.append(record["years_of_service"])
+            columns.gratuity_paise.append(rupees_to_paise(record["gratuity_amount"]))
+            columns.employee_type.append(record["employee_type"])
+            columns.termination_reason.append(record["termination_reason"])
+            columns.is_eligible.append(record["is_eligible"])
+            message = record["message"]
+            columns.message.append(messages.setdefault(message, message))
+        return columns
+
+    def _columns(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __len__(self) -> int:
+        return len(self.gratuity_paise)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ResultColumns(*(column[index] for column in self._columns()))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("result index out of range")
+        return next(self._iter_rows(index, index + 1))
+
+    def __iter__(self) -> Iterator[Dict]:
+        for start in range(0, len(self), ITER_BLOCK_SIZE):
+            yield from self._iter_rows(start, start + ITER_BLOCK_SIZE)
+
+    def __eq__(self, other):
+        if isinstance(other, ResultColumns) or isinstance(other, list):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"ResultColumns(<{len(self)} results>)"
+
+    def _iter_rows(self, start: int, stop: int) -> Iterator[Dict]:
+        """Yield result dicts for rows ``start`` to ``stop``."""
+        columns = [list(column[start:stop]) for column in self._columns()]
+        for name, joining, leaving, salary, years, paise, employee_type, reason, eligible, message in zip(*columns):
+            yield {
+                "employee_name": name,
+                "joining_date": date.fromordinal(joining + EPOCH_ORDINAL),
+                "leaving_date": date.fromordinal(leaving + EPOCH_ORDINAL),
+                "last_drawn_salary": _to_decimal(salary),
+                "years_of_service": years,
+                "gratuity_amount": paise_to_decimal(paise),
+                "employee_type": employee_type,
+                "termination_reason": reason,
+                "is_eligible": bool(eligible),
+                "message": message
+            }
+
+    def total_gratuity_amount(self) -> Decimal:
+        """Sum of all gratuity amounts, equal to adding up the Decimal amounts."""
+        return paise_to_decimal(sum(self.gratuity_paise))
+
+    def eligible_count(self) -> int:
+        return sum(self.is_eligible)
+
+    def iter_json(self) -> Iterator[str]:
+        """
+        Yield each result as a compact JSON object.
+
+        The text is identical to ``GratuityResult(**row).model_dump_json()`` and to the
+        rows of a ``BulkCalculationResult`` rendered by ``JSONResponse``.
+        """
+        for block in self.iter_json_blocks():
+            yield from block
+
+    def iter_json_blocks(self) -> Iterator[List[str]]:
+        """
+        Yield the JSON objects of :meth:`iter_json` in lists of up to ``ITER_BLOCK_SIZE``.
+
+        Dates and the fields after the gratuity amount take few distinct values, so their
+        JSON is built once and reused.
+        """
+        day_text: Dict[int, str] = {}
+        years_text: Dict[int, str] = {}
+        tails: Dict[tuple, str] = {}
+
+        for start in range(0, len(self), ITER_BLOCK_SIZE):
+            stop = start + ITER_BLOCK_SIZE
+            # Amounts are formatted for the whole block at once, outside the row loop
+            salaries = self.last_drawn_salary[start:stop]
+            if isinstance(salaries, array):
+                salary_texts = map(str, map(Decimal, map(str, salaries)))
+            else:
+                salary_texts = map(str, map(_to_decimal, salaries))
+            gratuity_texts = [f"{paise // PAISE_PER_RUPEE}.{paise % PAISE_PER_RUPEE:02d}" for paise in self.gratuity_paise[start:stop]]
+
+            block = []
+            append = block.append
+            for name, joining, leaving, salary_text, years, gratuity_text, employee_type, reason, eligible, message in zip(
+                self.employee_name[start:stop], self.joining_date[start:stop], self.leaving_date[start:stop],
+                salary_texts, self.years_of_service[start:stop], gratuity_texts, self.employee_type[start:stop],
+                self.termination_reason[start:stop], self.is_eligible[start:stop], self.message[start:stop]
+            ):
+                joining_text = day_text.get(joining)
+                if joining_text is None:
+                    joining_text = day_text[joining] = date.fromordinal(joining + EPOCH_ORDINAL).isoformat()
+                leaving_text = day_text.get(leaving)
+                if leaving_text is None:
+                    leaving_text = day_text[leaving] = date.fromordinal(leaving + EPOCH_ORDINAL).isoformat()
+                year_text = years_text.get(years)
+                if year_text is None:
+                    year_text = years_text[years] = repr(float(years))
+                key = (employee_type, reason, eligible, message)
+                tail = tails.get(key)
+                if tail is None:
+                    tail = tails[key] = _result_json_tail(*key)
+
+                append(
+                    f'{{"employee_name":{encode_basestring(name)},'
+                    f'"joining_date":"{joining_text}","leaving_date":"{leaving_text}",'
+                    f'"last_drawn_salary":"{salary_text}","years_of_service":{year_text},'
+                    f'"gratuity_amount":"{gratuity_text}",{tail}'
+                )
+            yield block
+
+def _result_json_tail(employee_type, termination_reason, is_eligible, message) -> str:
+    """The JSON of a result from ``employee_type`` to the end of the object."""
+    return (
+        f'"employee_type":{_ENUM_JSON[employee_type]},"termination_reason":{_ENUM_JSON[termination_reason]},'
+        f'"is_eligible":{"true" if is_eligible else "false"},"message":{json.dumps(message, ensure_ascii=False)}}}'
+    )
+
+def render_result_json(result: Dict) -> bytes:
+    """
+    Encode one result dict the way ``response_model=GratuityResult`` would.
+
+    ``result`` is a dict as returned by
+    :func:`app.services.calculator.calculate_individual_gratuity`.
+    """
+    return (
+        f'{{"employee_name":{encode_basestring(result["employee_name"])},'
+        f'"joining_date":"{result["joining_date"].isoformat()}","leaving_date":"{result["leaving_date"].isoformat()}",'
+        f'"last_drawn_salary":"{result["last_drawn_salary"]}","years_of_service":{float(result["years_of_service"])!r},'
+        f'"gratuity_amount":"{result["gratuity_amount"]}",'
+        + _result_json_tail(result["employee_type"], result["termination_reason"], result["is_eligible"], result["message"])
+    ).encode("utf-8")
+
+def concat_results(parts: Iterable) -> Sequence:
+    """
+    Concatenate the results of several chunks or shards in order.
+
+    :class:`ResultColumns` parts are joined column by column; anything else (such as
+    plain lists of dicts) is concatenated into a list.
+    """
+    parts = list(parts)
+    if not parts:
+        return ResultColumns.empty()
+    if not all(isinstance(part, ResultColumns) for part in parts):
+        results = []
+        for part in parts:
+            results.extend(part)
+        return results
+
+    merged = []
+    for name in ResultColumns.__slots__:
+        columns = [getattr(part, name) for part in parts]
+        first = columns[0]
+        # Salary columns of different storage types are merged into a list of values
+        if isinstance(first, array) and all(isinstance(column, array) and column.typecode == first.typecode for column in columns):
+            target = array(first.typecode)
+        else:
+            target = []
+        for column in columns:
+            target.extend(column)
+        merged.append(target)
+    return ResultColumns(*merged)
+
+def iter_result_json(results: Iterable) -> Iterator[str]:
+    """Yield every result as compact JSON, validating rows that are not :class:`ResultColumns`."""
+    if isinstance(results, ResultColumns):
+        return results.iter_json()
+    return (GratuityResult(**result).model_dump_json() for result in results)
+
+def _results_json_array(results: "ResultColumns") -> str:
+    rows = []
+    for block in results.iter_json_blocks():
+        rows.extend(block)
+    return "[" + ",".join(rows) + "]"
+
+def render_bulk_result_json(result: Dict) -> bytes:
+    """
+    Encode a bulk result dict the way ``JSONResponse(BulkCalculationResult(...))`` would.
+
+    :class:`ResultColumns` are written directly; other results are validated through
+    :class:`BulkCalculationResult` first.
+    """
+    results = result["results"]
+    if not isinstance(results, ResultColumns):
+        return BulkCalculationResult(**result).model_dump_json().encode("utf-8")
+
+    summary = (
+        f'"total_gratuity_amount":"{result["total_gratuity_amount"]}",'
+        f'"eligible_count":{int(result["eligible_count"])},'
+        f'"ineligible_count":{int(result["ineligible_count"])}'
+    )
+    return ('{"results":' + _results_json_array(results) + "," + summary + "}").encode("utf-8")
+
+def render_dataset_update_json(update: Dict) -> bytes:
+    """
+    Encode a dataset update dict the way ``DatasetUpdate(...).model_dump_json()`` would.
+
+    ``update`` is a dict as returned by :func:`app.services.incremental.update_dataset`,
+    whose ``added`` and ``removed`` results are :class:`ResultColumns`.
+    """
+    return (
+        f'{{"dataset_id":{encode_basestring(update["dataset_id"])},'
+        f'"row_count":{int(update["row_count"])},"added_count":{int(update["added_count"])},'
+        f'"removed_count":{int(update["removed_count"])},"unchanged_count":{int(update["unchanged_count"])},'
+        f'"full_recalculation":{"true" if update["full_recalculation"] else "false"},'
+        f'"total_gratuity_amount":"{update["total_gratuity_amount"]}",'
+        f'"eligible_count":{int(update["eligible_count"])},"ineligible_count":{int(update["ineligible_count"])},'
+        f'"added":{_results_json_array(update["added"])},"removed":{_results_json_array(update["removed"])}}}'
+    ).encode("utf-8")
+
+def render_result_page_json(page: Dict) -> bytes:
+    """Encode a page of dataset results the way ``DatasetResultPage(...).model_dump_json()`` would."""
+    next_cursor = page["next_cursor"]
+    total_count = page["total_count"]
+    return (
+        f'{{"dataset_id":{encode_basestring(page["dataset_id"])},'
+        f'"total_count":{"null" if total_count is None else int(total_count)},'
+        f'"results":{_results_json_array(page["results"])},'
+        f'"next_cursor":{"null" if next_cursor is None else encode_basestring(next_cursor)}}}'
+    ).encode("utf-8")
+
+def render_bulk_job_json(job: Dict, result_json: Optional[str]) -> bytes:
+    """
+    Encode a job dict the way ``BulkJob(**job, result=...).model_dump_json()`` would.
+
+    ``result_json`` is the stored result as written by :func:`render_bulk_result_json`;
+    it is spliced into the envelope as it is instead of being parsed and validated again.
+    """
+    envelope = BulkJob(**job).model_dump_json(exclude={"result"})
+    result = "null" if result_json is None else result_json
+    return (envelope[:-1] + ',"result":' + result + "}").encode("utf-8")
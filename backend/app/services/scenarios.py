@@ -0,0 +1,220 @@
+"""
+Scenario (what-if) analysis of a workforce.
+
+Finance reruns the same workforce under alternative parameters: a different gratuity
+cap, assumed salary increases, or other monthly denominators. None of these change
+anyone's years of service or eligibility, so a workforce is prepared once — parsed,
+with service periods and eligibility computed and ineligible employees dropped — and
+kept in an in-process cache under the hash of its file. Any number of scenarios are then
+evaluated against the prepared columns together, as scenarios x employees matrices.
+
+All money is integer paise, so the baseline scenario reproduces ``/calculator/bulk`` to
+the paisa. Salaries that are not whole paise (or too large for int64 arithmetic under
+every allowed increase) use the same formula in Decimal.
+"""
+
+import hashlib
+from decimal import ROUND_HALF_UP, Decimal
+from typing import BinaryIO, Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..config import SCENARIO_CACHE_SIZE, SCENARIO_CACHE_TTL_SECONDS
+from ..schemas.calculator import EmployeeType, TerminationReason
+from .cache import TTLCache
+from .calculator import MAX_GRATUITY_LIMIT
+from .columnar import (
+    _enum_column,
+    _matches,
+    eligibility_columns,
+    salary_paise_columns,
+    to_day_array,
+    to_decimal,
+    years_of_service_columns
+)
+from .fixed_point import GRATUITY_DAYS, NON_COVERED_DENOMINATOR, STANDARD_DENOMINATOR, paise_to_decimal, round_half_up_div, rupees_to_paise
+from .ingestion import iter_employee_chunks
+from .metrics import stage
+
+# Salary increases are whole hundredths of a percent, applied as (10000 + n) / 10000
+INCREASE_SCALE = 10_000
+
+# Largest salary increase a scenario may assume, in percent
+MAX_SALARY_INCREASE_PERCENT = 1000
+
+# Nearest-rank percentiles reported for each scenario's eligible gratuity amounts
+PERCENTILES = (10, 25, 50, 75, 90, 99)
+
+# Scenarios evaluated together are limited to about this many matrix cells
+BLOCK_CELLS = 1 << 22
+
+# Products below this fit in int64 with room for rounding
+_INT64_SAFE = 2 ** 62
+
+prepared_workforce_cache = TTLCache(maxsize=SCENARIO_CACHE_SIZE, ttl=SCENARIO_CACHE_TTL_SECONDS)
+
+class PreparedWorkforce:
+    """
+    The parts of a workforce that scenarios cannot change, for its eligible employees.
+
+    ``paise`` and ``years`` feed the integer formula; rows in ``decimal_rows`` instead use
+    their Decimal ``salary`` in every scenario.
+    """
+
+    def __init__(self, row_count: int, paise: np.ndarray, years: np.ndarray, non_covered: np.ndarray, salary: List[Decimal], decimal_rows: np.ndarray):
+        self.row_count = row_count
+        self.paise = paise
+        self.years = years
+        self.non_covered = non_covered
+        self.salary = salary
+        self.decimal_rows = decimal_rows
+
+    @property
+    def eligible_count(self) -> int:
+        return len(self.years)
+
+def prepare_workforce(chunks: Iterable[pd.DataFrame]) -> PreparedWorkforce:
+    """
+    Compute service periods and eligibility for a workforce, keeping only eligible rows.
+
+    ``chunks`` are normalized frames as yielded by
+    :func:`app.services.ingestion.iter_employee_chunks`.
+    """
+    row_count = 0
+    parts = []
+    for frame in chunks:
+        with stage("calculation"):
+            row_count += len(frame)
+            joining = to_day_array(frame["joining_date"].to_numpy())
+            leaving = to_day_array(frame["leaving_date"].to_numpy())
+            reasons = _enum_column(frame["termination_reason"], TerminationReason, TerminationReason.RESIGNATION)
+            employee_types = _enum_column(frame["employee_type"], EmployeeType, EmployeeType.STANDARD)
+
+            years = years_of_service_columns(joining, leaving)
+            eligible = eligibility_columns(years, reasons)
+            salary = frame["last_drawn_salary"].to_numpy()[eligible]
+            paise, exact = salary_paise_columns(salary)
+            parts.append((paise, exact, years[eligible], _matches(employee_types[eligible], EmployeeType.NON_COVERED), salary))
+
+    if not parts:
+        parts.append((np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool), np.zeros(0)))
+    paise, exact, years, non_covered, salary = (np.concatenate(column) for column in zip(*parts))
+
+    # The integer formula multiplies salary, increase, years, days and 2 for rounding
+    largest_factor = (INCREASE_SCALE + MAX_SALARY_INCREASE_PERCENT * 100) * GRATUITY_DAYS * 2
+    exact &= paise.astype(float) * years * largest_factor < _INT64_SAFE
+
+    decimal_rows = np.flatnonzero(~exact)
+    return PreparedWorkforce(
+        row_count,
+        np.where(exact, paise, 0),
+        years.astype(np.int64),
+        non_covered,
+        [to_decimal(value) for value in salary[decimal_rows].tolist()],
+        decimal_rows
+    )
+
+def workforce_id_of(source: BinaryIO, file_extension: str) -> str:
+    """Hash an uploaded file's type and contents into the id its prepared workforce is cached under."""
+    digest = hashlib.sha256(file_extension.encode("utf-8") + b"\0")
+    source.seek(0)
+    for block in iter(lambda: source.read(1 << 20), b""):
+        digest.update(block)
+    source.seek(0)
+    return digest.hexdigest()[:32]
+
+def load_workforce(source: BinaryIO, file_extension: str, chunk_size: int) -> Tuple[str, PreparedWorkforce]:
+    """Return the id and prepared workforce of an upload, preparing it only if it is not cached."""
+    workforce_id = workforce_id_of(source, file_extension)
+    workforce = prepared_workforce_cache.get(workforce_id)
+    if workforce is None:
+        workforce = prepare_workforce(iter_employee_chunks(source, file_extension, chunk_size))
+        prepared_workforce_cache.set(workforce_id, workforce)
+    return workforce_id, workforce
+
+def _scenario_parameters(scenario: Dict):
+    increase = Decimal(scenario.get("salary_increase_percent") or 0) * 100
+    if increase != increase.to_integral_value():
+        raise ValueError("Salary increases must be whole hundredths of a percent")
+    cap = scenario.get("max_gratuity")
+    return (
+        INCREASE_SCALE + int(increase),
+        scenario.get("standard_denominator") or STANDARD_DENOMINATOR,
+        scenario.get("non_covered_denominator") or NON_COVERED_DENOMINATOR,
+        rupees_to_paise(MAX_GRATUITY_LIMIT if cap is None else Decimal(cap))
+    )
+
+def _decimal_gratuity_paise(salary: Decimal, years: int, multiplier: int, denominator: int, cap_paise: int) -> int:
+    """The scenario formula in Decimal, like the fallback of ``calculate_gratuity_amount``."""
+    gratuity = salary * Decimal(multiplier) / Decimal(INCREASE_SCALE) * Decimal(years) * Decimal(GRATUITY_DAYS) / Decimal(denominator)
+    gratuity = min(gratuity, paise_to_decimal(cap_paise))
+    return rupees_to_paise(gratuity.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
+
+def evaluate_scenarios(workforce: PreparedWorkforce, scenarios: List[Dict]) -> List[Dict]:
+    """
+    Evaluate scenarios against a prepared workforce.
+
+    Each scenario is a :class:`Scenario` dict; missing parameters keep the current
+    rules. Returns a :class:`ScenarioResult` dict per scenario, in order.
+    """
+    parameters = np.array([_scenario_parameters(scenario) for scenario in scenarios], dtype=np.int64).reshape(-1, 4)
+    eligible_count = workforce.eligible_count
+    block_size = max(1, BLOCK_CELLS // max(eligible_count, 1))
+    service = workforce.years * GRATUITY_DAYS
+
+    results = []
+    for start in range(0, len(scenarios), block_size):
+        with stage("calculation"):
+            block = parameters[start:start + block_size]
+            multiplier, standard, non_covered, cap = (block[:, [column]] for column in range(4))
+
+            # One row per scenario, one column per eligible employee
+            denominator = np.where(workforce.non_covered, non_covered, standard)
+            gratuity = round_half_up_div(workforce.paise * multiplier * service, denominator * INCREASE_SCALE)
+            gratuity = np.minimum(gratuity, cap)
+
+            for row, scenario in enumerate(block.tolist()):
+                for i, salary in zip(workforce.decimal_rows.tolist(), workforce.salary):
+                    gratuity[row, i] = _decimal_gratuity_paise(
+                        salary, int(workforce.years[i]), scenario[0],
+                        scenario[2] if workforce.non_covered[i] else scenario[1], scenario[3]
+                    )
+
+            totals = gratuity.sum(axis=1)
+            capped = (gratuity >= cap).sum(axis=1)
+            gratuity.sort(axis=1)
+
+        for row in range(len(block)):
+            results.append(_scenario_result(scenarios[start + row], gratuity[row], int(totals[row]), int(capped[row])))
+    return results
+
+def _scenario_result(scenario: Dict, sorted_gratuity: np.ndarray, total: int, capped_count: int) -> Dict:
+    count = len(sorted_gratuity)
+    percentiles = {}
+    for percentile in PERCENTILES:
+        # Nearest rank: the smallest amount at or above the given share of employees
+        rank = max(-(-percentile * count // 100) - 1, 0)
+        percentiles[f"p{percentile}"] = paise_to_decimal(int(sorted_gratuity[rank]) if count else 0)
+
+    return {
+        "name": scenario.get("name"),
+        "total_gratuity_amount": paise_to_decimal(total),
+        "eligible_count": count,
+        "capped_count": capped_count,
+        "average_gratuity_amount": paise_to_decimal(round_half_up_div(total, count) if count else 0),
+        "max_gratuity_amount": paise_to_decimal(int(sorted_gratuity[-1]) if count else 0),
+        "percentiles": percentiles
+    }
+
+def analyze_scenarios(workforce_id: str, workforce: PreparedWorkforce, scenarios: List[Dict]) -> Dict:
+    """Evaluate the current rules and the given scenarios; returns a :class:`ScenarioAnalysis` dict."""
+    baseline, *results = evaluate_scenarios(workforce, [{"name": "baseline"}, *scenarios])
+    return {
+        "workforce_id": workforce_id,
+        "row_count": workforce.row_count,
+        "eligible_count": workforce.eligible_count,
+        "ineligible_count": workforce.row_count - workforce.eligible_count,
+        "baseline": baseline,
+        "scenarios": results
+    }
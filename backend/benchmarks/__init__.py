@@ -0,0 +1,6 @@
+"""
+Performance benchmarks for the gratuity calculator.
+
+These are scripts, not tests: run them with ``python -m benchmarks.<name>`` from the
+backend directory. ``benchmarks.suite`` records JSON baselines for regression checks.
+"""
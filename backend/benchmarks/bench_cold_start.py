@@ -0,0 +1,96 @@
+"""
+Cold-start time of the app per endpoint, as a fresh serverless instance sees it.
+
+Each measurement runs in a new interpreter that imports ``app.main`` and serves one
+request through an in-process ASGI client, reporting the import time, the first request
+time and whether pandas/openpyxl were loaded. Pass several ``--app-dir`` values to compare
+checkouts, e.g. the current tree against a worktree of an earlier commit:
+
+    git worktree add /tmp/gratify-before <commit>
+    python -m benchmarks.bench_cold_start --app-dir . /tmp/gratify-before/backend
+
+Usage (from the backend directory):
+
+    python -m benchmarks.bench_cold_start --repeat 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from .data import workforce_csv
+
+# Runs in the child interpreter; the HTTP client is imported before the clock starts
+# because it is not part of the app's cold start
+CHILD = """
+import asyncio, json, sys, time
+import httpx
+request = json.loads(sys.argv[1])
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+async def first_request():
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://cold") as client:
+        files = request.pop("files", None)
+        if files:
+            request["files"] = {"file": ("cold.csv", files.encode("utf-8"), "text/csv")}
+        return await client.request(**request)
+
+status = asyncio.run(first_request()).status_code
+finished = time.perf_counter()
+print(json.dumps({
+    "status": status,
+    "import_ms": (imported - started) * 1000,
+    "first_request_ms": (finished - imported) * 1000,
+    "pandas": "pandas" in sys.modules,
+    "openpyxl": "openpyxl" in sys.modules
+}))
+"""
+
+ENDPOINTS = {
+    "/health": {"method": "GET", "url": "/health"},
+    "/calculator/individual": {
+        "method": "POST",
+        "url": "/calculator/individual",
+        "json": {
+            "employee_name": "Jane Smith",
+            "joining_date": "2018-01-01",
+            "leaving_date": "2023-01-01",
+            "last_drawn_salary": 25000
+        }
+    },
+    "/calculator/bulk": {"method": "POST", "url": "/calculator/bulk", "files": workforce_csv(10).decode("utf-8")},
+    "/calculator/bulk/template": {"method": "GET", "url": "/calculator/bulk/template?file_type=excel"},
+}
+
+def measure(app_dir: str, request: dict) -> dict:
+    """Start a fresh interpreter in ``app_dir`` and time one cold request."""
+    completed = subprocess.run(
+        [sys.executable, "-c", CHILD, json.dumps(request)],
+        cwd=app_dir, capture_output=True, text=True, check=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"}
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--app-dir", nargs="+", default=["."], help="backend directories to compare")
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per endpoint")
+    args = parser.parse_args()
+
+    print(f"{'app dir':<28}{'endpoint':<28}{'import ms':>10}{'request ms':>12}{'total ms':>10}  loaded")
+    for app_dir in args.app_dir:
+        for endpoint, request in ENDPOINTS.items():
+            runs = [measure(app_dir, dict(request)) for _ in range(args.repeat)]
+            import_ms = statistics.median(run["import_ms"] for run in runs)
+            request_ms = statistics.median(run["first_request_ms"] for run in runs)
+            loaded = ", ".join(name for name in ("pandas", "openpyxl") if runs[-1][name]) or "-"
+            print(f"{app_dir[-27:]:<28}{endpoint:<28}{import_ms:>10.0f}{request_ms:>12.0f}{import_ms + request_ms:>10.0f}  {loaded}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Scaling of sharded bulk calculation from 1 to N worker processes.
+
+Generates a synthetic normalized workforce, computes it sequentially and then with an
+increasing number of worker processes, checks every run matches the sequential result
+and prints the speedup per worker count.
+
+Usage (from the backend directory):
+
+    python -m benchmarks.bench_parallel_scaling --rows 500000 --max-workers 8
+"""
+
+import argparse
+import os
+import time
+
+from app.services.calculator import calculate_bulk_gratuity
+from app.services.ingestion import prepare_employee_frame
+from app.services.parallel import get_process_pool, shutdown_process_pools
+
+from .data import generate_workforce
+
+def time_best(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--shard-size", type=int, default=None, help="default: rows split evenly per worker")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    frame = prepare_employee_frame(generate_workforce(args.rows))
+    baseline, expected = time_best(lambda: calculate_bulk_gratuity(frame), args.repeat)
+
+    print(f"{args.rows} rows")
+    print(f"{'workers':>8}{'shard':>10}{'seconds':>10}{'rows/s':>12}{'speedup':>10}")
+    print(f"{1:>8}{'-':>10}{baseline:>10.3f}{args.rows / baseline:>12.0f}{1.0:>10.2f}")
+
+    try:
+        for workers in range(2, args.max_workers + 1):
+            shard_size = args.shard_size or -(-args.rows // workers)
+            # Start the pool before timing so process start-up is not measured
+            list(get_process_pool(workers).map(abs, range(workers)))
+
+            seconds, result = time_best(
+                lambda: calculate_bulk_gratuity(frame, workers=workers, shard_size=shard_size),
+                args.repeat
+            )
+            assert result == expected, "parallel result differs from sequential result"
+            print(f"{workers:>8}{shard_size:>10}{seconds:>10.3f}{args.rows / seconds:>12.0f}{baseline / seconds:>10.2f}")
+    finally:
+        shutdown_process_pools()
+
+if __name__ == "__main__":
+    main()
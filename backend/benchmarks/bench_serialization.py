@@ -0,0 +1,70 @@
+"""
+Serialization time of bulk and individual results.
+
+Calculates a synthetic workforce once, then times encoding its results to JSON bytes the
+way FastAPI's ``response_model`` handling does (validate, ``jsonable_encoder``,
+``json.dumps``), with Pydantic's ``model_dump_json`` and with the direct encoders in
+:mod:`app.services.results`. Every method is checked to produce identical bytes.
+
+Usage (from the backend directory):
+
+    python -m benchmarks.bench_serialization --rows 100000
+"""
+
+import argparse
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.schemas.calculator import BulkCalculationResult, GratuityResult
+from app.services.calculator import calculate_bulk_gratuity
+from app.services.ingestion import prepare_employee_frame
+from app.services.results import render_bulk_result_json, render_result_json
+
+from .data import generate_workforce
+
+def time_best(func, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        output = func()
+        best = min(best, time.perf_counter() - started)
+    return best, output
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    result = calculate_bulk_gratuity(prepare_employee_frame(generate_workforce(args.rows)))
+    rows = list(result["results"])
+    materialized = {**result, "results": rows}
+
+    bulk_methods = {
+        "response_model": lambda: JSONResponse(jsonable_encoder(BulkCalculationResult(**materialized))).body,
+        "model_dump_json": lambda: BulkCalculationResult(**materialized).model_dump_json().encode("utf-8"),
+        "direct": lambda: render_bulk_result_json(result)
+    }
+    individual_methods = {
+        "response_model": lambda: [JSONResponse(jsonable_encoder(GratuityResult(**row))).body for row in rows],
+        "model_dump_json": lambda: [GratuityResult(**row).model_dump_json().encode("utf-8") for row in rows],
+        "direct": lambda: [render_result_json(row) for row in rows]
+    }
+
+    for label, methods in (("bulk response", bulk_methods), ("individual responses", individual_methods)):
+        print(f"{label}, {args.rows} results")
+        print(f"{'method':<18}{'seconds':>10}{'results/s':>14}{'speedup':>10}")
+        reference_seconds, reference = None, None
+        for name, method in methods.items():
+            seconds, output = time_best(method, args.repeat)
+            if reference is None:
+                reference_seconds, reference = seconds, output
+            elif output != reference:
+                raise SystemExit(f"{name} output differs from response_model")
+            print(f"{name:<18}{seconds:>10.3f}{args.rows / seconds:>14.0f}{reference_seconds / seconds:>9.1f}x")
+        print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Synthetic payroll data for benchmarks.
+"""
+
+import numpy as np
+import pandas as pd
+
+EMPLOYEE_TYPES = ["standard", "non-covered", ""]
+TERMINATION_REASONS = ["resignation", "retirement", "death", "disability", ""]
+
+def generate_workforce(rows: int, seed: int = 1972) -> pd.DataFrame:
+    """
+    Generate a raw workforce table shaped like an uploaded payroll file.
+
+    Joining dates span 1990-2017 and service periods up to ~27 years; a share of rows
+    repeat the same dates, as batch hires and fiscal-year-end exits do in real files.
+    """
+    rng = np.random.default_rng(seed)
+    joining = np.datetime64("1990-01-01") + rng.integers(0, 10000, rows).astype("timedelta64[D]")
+    leaving = joining + rng.integers(0, 10000, rows).astype("timedelta64[D]")
+
+    # Every tenth employee joined on the first of a month and left around a March year end
+    batch = np.arange(rows) % 10 == 0
+    joining[batch] = joining[batch].astype("datetime64[M]").astype("datetime64[D]")
+    leaving[batch] = (joining[batch].astype("datetime64[Y]") + np.timedelta64(10, "Y")).astype("datetime64[D]") + np.timedelta64(89, "D")
+
+    return pd.DataFrame({
+        "employee_name": [f"Employee {i}" for i in range(rows)],
+        "joining_date": joining,
+        "leaving_date": leaving,
+        "last_drawn_salary": rng.integers(10000, 300000, rows),
+        "employee_type": rng.choice(EMPLOYEE_TYPES, rows),
+        "termination_reason": rng.choice(TERMINATION_REASONS, rows),
+    })
+
+def workforce_csv(rows: int, seed: int = 1972) -> bytes:
+    """Generate a synthetic payroll CSV upload."""
+    return generate_workforce(rows, seed).to_csv(index=False).encode("utf-8")
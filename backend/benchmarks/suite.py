@@ -0,0 +1,345 @@
+"""
+Benchmark suite for the calculator service and HTTP endpoints.
+
+Times the service functions directly and the /calculator/bulk and /calculator/individual
+endpoints through an in-process ASGI client, over synthetic workforces of several sizes.
+Each case runs in a forked child process so its peak RSS is measured in isolation.
+Results can be saved as a JSON baseline and later runs compared against it; a case whose
+throughput, p99 latency or peak RSS is worse than the baseline by more than the tolerance
+is reported as a regression and the command exits with status 1.
+
+Usage (from the backend directory):
+
+    python -m benchmarks.suite --save benchmarks/baselines/main.json
+    python -m benchmarks.suite --compare benchmarks/baselines/main.json --tolerance 0.15
+    python -m benchmarks.suite --sizes 1000 100000 --cases bulk_columnar bulk_endpoint
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Callable, Dict, List
+
+import httpx
+import numpy as np
+import pandas as pd
+
+from app.main import app
+from app.schemas.calculator import EmployeeType, IndividualCalculatorInput, TerminationReason
+from app.services.calculator import (
+    calculate_bulk_gratuity,
+    calculate_gratuity_amount,
+    calculate_years_of_service,
+    clear_years_of_service_cache,
+    individual_result_cache
+)
+from app.services.ingestion import prepare_employee_frame
+from app.services.projection import month_end_grid, project_liability
+
+from .data import generate_workforce, workforce_csv
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+
+# Cases that build a Python object per row are skipped above this many rows by default
+DEFAULT_MAX_SCALAR_ROWS = 100_000
+
+# Number of /calculator/individual requests per size-independent run
+INDIVIDUAL_REQUESTS = 2_000
+
+# Metrics compared against a baseline, and whether a larger value is better
+COMPARED_METRICS = {
+    "rows_per_s": True,
+    "p99_ms": False,
+    "peak_rss_mb": False
+}
+
+def latency_summary(seconds: List[float]) -> Dict:
+    """p50/p95/p99/max of a list of durations, in milliseconds."""
+    ordered = sorted(seconds)
+
+    def at(fraction):
+        return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))] * 1000
+
+    return {"p50_ms": at(0.50), "p95_ms": at(0.95), "p99_ms": at(0.99), "max_ms": ordered[-1] * 1000}
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of the current process, in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def _date_pairs(rows: int):
+    raw = generate_workforce(rows)
+    return raw["joining_date"].dt.date.tolist(), raw["leaving_date"].dt.date.tolist()
+
+def bench_years_of_service(rows: int, repeat: int) -> Dict:
+    """Per-call latency of calculate_years_of_service with a cold cache."""
+    joining, leaving = _date_pairs(rows)
+    timings = []
+    total = 0.0
+    clock = time.perf_counter
+
+    for _ in range(repeat):
+        clear_years_of_service_cache()
+        started = clock()
+        for joining_date, leaving_date in zip(joining, leaving):
+            call_started = clock()
+            calculate_years_of_service(joining_date, leaving_date)
+            timings.append(clock() - call_started)
+        total += clock() - started
+
+    return {"rows_per_s": rows * repeat / total, **latency_summary(timings)}
+
+def bench_gratuity_amount(rows: int, repeat: int) -> Dict:
+    """Per-call latency of calculate_gratuity_amount on Decimal inputs."""
+    raw = generate_workforce(rows)
+    arguments = [
+        (Decimal(int(row.last_drawn_salary)), int(row.last_drawn_salary) % 40,
+         EmployeeType(row.employee_type or "unknown"), TerminationReason(row.termination_reason or "unknown"))
+        for row in raw.itertuples(index=False)
+    ]
+    timings = []
+    total = 0.0
+    clock = time.perf_counter
+
+    for _ in range(repeat):
+        started = clock()
+        for salary, service, employee_type, termination_reason in arguments:
+            call_started = clock()
+            calculate_gratuity_amount(salary, service, employee_type, termination_reason)
+            timings.append(clock() - call_started)
+        total += clock() - started
+
+    return {"rows_per_s": rows * repeat / total, **latency_summary(timings)}
+
+def _time_bulk(func: Callable, rows: int, repeat: int) -> Dict:
+    timings = []
+    for _ in range(repeat):
+        clear_years_of_service_cache()
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return {"rows_per_s": rows / statistics.median(timings), "seconds": statistics.median(timings), **latency_summary(timings)}
+
+def bench_bulk_scalar(rows: int, repeat: int) -> Dict:
+    """calculate_bulk_gratuity over a list of validated inputs (the Decimal path)."""
+    frame = prepare_employee_frame(generate_workforce(rows))
+    employees = [
+        IndividualCalculatorInput(
+            employee_name=row.employee_name,
+            joining_date=row.joining_date.date(),
+            leaving_date=row.leaving_date.date(),
+            last_drawn_salary=row.last_drawn_salary,
+            employee_type=row.employee_type,
+            termination_reason=row.termination_reason
+        )
+        for row in frame.itertuples(index=False)
+    ]
+    return _time_bulk(lambda: calculate_bulk_gratuity(employees), rows, repeat)
+
+def bench_bulk_columnar(rows: int, repeat: int) -> Dict:
+    """calculate_bulk_gratuity over a normalized frame (the columnar path)."""
+    frame = prepare_employee_frame(generate_workforce(rows))
+    return _time_bulk(lambda: calculate_bulk_gratuity(frame), rows, repeat)
+
+def bench_ingestion(rows: int, repeat: int) -> Dict:
+    """Reading and validating a CSV upload into a normalized frame."""
+    upload = workforce_csv(rows)
+
+    def ingest():
+        prepare_employee_frame(pd.read_csv(io.BytesIO(upload)))
+
+    return _time_bulk(ingest, rows, repeat)
+
+def bench_projection(rows: int, repeat: int) -> Dict:
+    """project_liability over 120 month ends (10 years), building the full liability matrix."""
+    frame = prepare_employee_frame(generate_workforce(rows))
+    dates = month_end_grid(date(2018, 1, 1), 120)
+    return _time_bulk(lambda: project_liability([frame], dates), rows, repeat)
+
+async def _post_many(requests: List[Dict]) -> List[float]:
+    timings = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for request in requests:
+            started = time.perf_counter()
+            response = await client.post(**request)
+            response.raise_for_status()
+            timings.append(time.perf_counter() - started)
+    return timings
+
+def bench_bulk_endpoint(rows: int, repeat: int) -> Dict:
+    """POST /calculator/bulk with a CSV upload, end to end including JSON encoding."""
+    upload = workforce_csv(rows)
+    request = {"url": "/calculator/bulk", "files": {"file": ("bench.csv", upload, "text/csv")}}
+    timings = asyncio.run(_post_many([request] * repeat))
+    return {
+        "rows_per_s": rows / statistics.median(timings),
+        "seconds": statistics.median(timings),
+        "upload_mb": len(upload) / (1024 * 1024),
+        **latency_summary(timings)
+    }
+
+def bench_individual_endpoint(rows: int, repeat: int) -> Dict:
+    """POST /calculator/individual with distinct payloads, so every request is calculated."""
+    individual_result_cache.clear()
+    raw = generate_workforce(INDIVIDUAL_REQUESTS * repeat)
+    requests = [
+        {
+            "url": "/calculator/individual",
+            "json": {
+                "employee_name": row.employee_name,
+                "joining_date": row.joining_date.date().isoformat(),
+                "leaving_date": row.leaving_date.date().isoformat(),
+                "last_drawn_salary": int(row.last_drawn_salary)
+            }
+        }
+        for row in raw.itertuples(index=False)
+    ]
+    timings = asyncio.run(_post_many(requests))
+    return {"rows_per_s": len(timings) / sum(timings), **latency_summary(timings)}
+
+# name -> (function, scales with --sizes, builds a Python object per row)
+CASES = {
+    "years_of_service": (bench_years_of_service, True, True),
+    "gratuity_amount": (bench_gratuity_amount, True, True),
+    "bulk_scalar": (bench_bulk_scalar, True, True),
+    "bulk_columnar": (bench_bulk_columnar, True, False),
+    "ingestion": (bench_ingestion, True, False),
+    "projection": (bench_projection, True, False),
+    "bulk_endpoint": (bench_bulk_endpoint, True, False),
+    "individual_endpoint": (bench_individual_endpoint, False, False),
+}
+
+def _run_case(name: str, rows: int, repeat: int) -> Dict:
+    metrics = CASES[name][0](rows, repeat)
+    metrics["peak_rss_mb"] = peak_rss_mb()
+    return metrics
+
+def _child(connection, name: str, rows: int, repeat: int) -> None:
+    try:
+        connection.send(_run_case(name, rows, repeat))
+    except Exception as e:
+        connection.send({"error": repr(e)})
+    finally:
+        connection.close()
+
+def run_isolated(name: str, rows: int, repeat: int) -> Dict:
+    """Run one case in a forked child process and return its metrics."""
+    context = multiprocessing.get_context("fork")
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_child, args=(sender, name, rows, repeat))
+    process.start()
+    sender.close()
+    try:
+        metrics = receiver.recv()
+    except EOFError:
+        metrics = None
+    process.join()
+    if metrics is None:
+        metrics = {"error": f"benchmark process exited with code {process.exitcode}"}
+    return metrics
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def environment() -> Dict:
+    """Where a run was recorded; baselines are only comparable on similar machines."""
+    return {
+        "recorded_at": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__
+    }
+
+def run_suite(cases: List[str], sizes: List[int], repeat: int, max_scalar_rows: int, isolate: bool = True) -> Dict:
+    """Run the selected cases and return ``{"environment": ..., "results": {key: metrics}}``."""
+    results = {}
+    for name in cases:
+        _, sized, scalar = CASES[name]
+        for rows in (sizes if sized else [INDIVIDUAL_REQUESTS]):
+            if scalar and rows > max_scalar_rows:
+                continue
+            key = f"{name}[{rows}]" if sized else name
+            metrics = run_isolated(name, rows, repeat) if isolate else _run_case(name, rows, repeat)
+            results[key] = metrics
+            print(format_row(key, metrics), flush=True)
+    return {"environment": environment(), "results": results}
+
+def compare(current: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Return a description of every metric that regressed by more than ``tolerance``."""
+    regressions = []
+    for key, metrics in current["results"].items():
+        reference = baseline["results"].get(key)
+        if not reference or "error" in metrics or "error" in reference:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            if metric not in metrics or metric not in reference or not reference[metric]:
+                continue
+            change = metrics[metric] / reference[metric] - 1
+            if (-change if higher_is_better else change) > tolerance:
+                regressions.append(f"{key} {metric}: {reference[metric]:.2f} -> {metrics[metric]:.2f} ({change:+.1%})")
+    return regressions
+
+def format_row(key: str, metrics: Dict) -> str:
+    if "error" in metrics:
+        return f"{key:<32}{metrics['error']}"
+    return (
+        f"{key:<32}{metrics['rows_per_s']:>14.0f}{metrics['p50_ms']:>11.3f}{metrics['p95_ms']:>11.3f}"
+        f"{metrics['p99_ms']:>11.3f}{metrics['peak_rss_mb']:>11.1f}"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES, help="workforce sizes in rows")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case")
+    parser.add_argument("--max-scalar-rows", type=int, default=DEFAULT_MAX_SCALAR_ROWS,
+                        help="skip per-row Python cases above this size")
+    parser.add_argument("--in-process", action="store_true", help="do not fork a process per case")
+    parser.add_argument("--save", metavar="PATH", help="write results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare results with a saved baseline")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="allowed relative regression")
+    args = parser.parse_args()
+
+    print(f"{'case':<32}{'rows/s':>14}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}{'RSS MiB':>11}")
+    report = run_suite(args.cases, args.sizes, args.repeat, args.max_scalar_rows, isolate=not args.in_process)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+        print(f"saved baseline to {args.save}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regression(s) against {args.compare} (commit {baseline['environment']['commit']}):")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"no regressions against {args.compare}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+"""Helpers shared by the bulk upload tests."""
+
+import io
+
+import pandas as pd
+
+def to_csv(rows):
+    """Encode employee rows (a list of dicts or a dict of columns) as an uploaded CSV file"""
+    csv_buffer = io.StringIO()
+    pd.DataFrame(rows).to_csv(csv_buffer, index=False)
+    return csv_buffer.getvalue().encode('utf-8')
@@ -0,0 +1,121 @@
+import io
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+pa = pytest.importorskip("pyarrow")
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from app.main import app
+from app.services.arrow_io import RESULT_SCHEMA, read_arrow_chunks
+from app.services.export import EXPORT_COLUMNS
+
+from helpers import to_csv
+from test_columnar_calculator import random_employees
+
+client = TestClient(app)
+
+def typed_table(rows):
+    """Employee rows as an Arrow table with date, decimal and dictionary columns"""
+    return pa.table({
+        "employee_name": [row["employee_name"] for row in rows],
+        "joining_date": pa.array([row["joining_date"] for row in rows], pa.date32()),
+        "leaving_date": pa.array([row["leaving_date"] for row in rows], pa.date32()),
+        "last_drawn_salary": pa.array([Decimal(str(row["last_drawn_salary"])) for row in rows], pa.decimal128(18, 2)),
+        "employee_type": pa.array([row["employee_type"] for row in rows]).dictionary_encode(),
+        "termination_reason": pa.array([row["termination_reason"] for row in rows]).dictionary_encode(),
+    })
+
+def to_parquet(table, **kwargs):
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer, **kwargs)
+    return buffer.getvalue()
+
+def to_arrow(table, stream=False, max_chunksize=None):
+    buffer = io.BytesIO()
+    with (ipc.new_stream if stream else ipc.new_file)(buffer, table.schema) as writer:
+        writer.write_table(table, max_chunksize=max_chunksize)
+    return buffer.getvalue()
+
+def bulk(filename, contents):
+    return client.post("/calculator/bulk", files={"file": (filename, contents, "application/octet-stream")})
+
+@pytest.mark.parametrize("filename, encode", [
+    ("workforce.parquet", lambda table: to_parquet(table, row_group_size=70)),
+    ("workforce.arrow", lambda table: to_arrow(table, max_chunksize=70)),
+    ("workforce.feather", lambda table: to_arrow(table, stream=True)),
+])
+def test_typed_upload_matches_csv(monkeypatch, filename, encode):
+    monkeypatch.setattr('app.api.calculator.BULK_CHUNK_SIZE', 50)
+    rows = random_employees(300, seed=51)
+
+    response = bulk(filename, encode(typed_table(rows)))
+
+    assert response.status_code == 200
+    assert response.json() == bulk("workforce.csv", to_csv(rows)).json()
+
+def test_typed_upload_reports_invalid_rows(monkeypatch):
+    monkeypatch.setattr('app.api.calculator.BULK_CHUNK_SIZE', 2)
+    rows = random_employees(6, seed=52)
+    table = typed_table(rows)
+    # A null joining date and a timestamp leaving date before it
+    table = table.set_column(1, "joining_date", pa.array([*table["joining_date"].to_pylist()[:1], None, *table["joining_date"].to_pylist()[2:]], pa.date32()))
+    leaving = [datetime(row["leaving_date"].year, row["leaving_date"].month, row["leaving_date"].day, 9, tzinfo=timezone.utc) for row in rows]
+    leaving[4] = datetime(1900, 1, 1, tzinfo=timezone.utc)
+    table = table.set_column(2, "leaving_date", pa.array(leaving, pa.timestamp("us", tz="UTC")))
+
+    response = bulk("workforce.parquet", to_parquet(table))
+
+    assert response.status_code == 400
+    assert [(error["row"], error["field"]) for error in response.json()["detail"]["errors"]] == [(3, "joining_date"), (6, "leaving_date")]
+
+def test_unreadable_files_are_rejected():
+    for filename in ("workforce.parquet", "workforce.arrow"):
+        assert bulk(filename, b"not a columnar file").status_code == 400
+        assert bulk(filename, b"").status_code == 400
+
+def test_arrow_file_on_disk_is_memory_mapped(tmp_path):
+    rows = random_employees(25, seed=53)
+    path = tmp_path / "workforce.arrow"
+    path.write_bytes(to_arrow(typed_table(rows)))
+
+    with open(path, "rb") as source:
+        chunks = list(read_arrow_chunks(source, "arrow", 10))
+
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    assert pd.api.types.is_datetime64_dtype(chunks[0]["joining_date"])
+    assert pd.concat(chunks)["employee_name"].tolist() == [row["employee_name"] for row in rows]
+
+@pytest.mark.parametrize("file_type, read", [
+    ("parquet", lambda content: pq.read_table(io.BytesIO(content))),
+    ("arrow", lambda content: ipc.open_file(content).read_all()),
+])
+def test_download_keeps_column_types(monkeypatch, file_type, read):
+    monkeypatch.setattr('app.api.calculator.BULK_CHUNK_SIZE', 40)
+    rows = random_employees(100, seed=54)
+    rows[0]["last_drawn_salary"] = 12345.67
+
+    response = client.post(f"/calculator/bulk/download?file_type={file_type}", files={"file": ("test.csv", to_csv(rows), "text/csv")})
+
+    assert response.status_code == 200
+    assert response.headers["content-disposition"].endswith(f".{file_type}")
+    table = read(response.content)
+    assert table.schema == RESULT_SCHEMA
+    assert table.column_names == EXPORT_COLUMNS
+
+    expected = bulk("test.csv", to_csv(rows)).json()["results"]
+    for row, result in zip(table.to_pylist(), expected):
+        assert row["employee_name"] == result["employee_name"]
+        assert row["joining_date"] == date.fromisoformat(result["joining_date"])
+        assert row["leaving_date"] == date.fromisoformat(result["leaving_date"])
+        assert row["last_drawn_salary"] == float(result["last_drawn_salary"])
+        assert row["years_of_service"] == result["years_of_service"]
+        assert row["gratuity_amount"] == Decimal(result["gratuity_amount"])
+        assert row["employee_type"] == result["employee_type"]
+        assert row["termination_reason"] == result["termination_reason"]
+        assert row["is_eligible"] == result["is_eligible"]
+        assert row["message"] == result["message"]
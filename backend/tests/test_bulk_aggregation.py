@@ -0,0 +1,82 @@
+from decimal import Decimal
+
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.aggregation import SALARY_BIN_EDGES, SERVICE_BIN_EDGES, BulkAggregator, aggregate_bulk_gratuity
+from app.services.calculator import MAX_GRATUITY_LIMIT, calculate_bulk_gratuity
+from app.services.ingestion import prepare_employee_frame, split_frame
+
+from helpers import to_csv
+from test_columnar_calculator import random_employees
+
+client = TestClient(app)
+
+def reference_groups(results, key):
+    """Group totals computed row by row from full results"""
+    groups = {}
+    for row in results:
+        group = groups.setdefault(key(row), {"count": 0, "eligible_count": 0, "total_gratuity_amount": Decimal("0.00")})
+        group["count"] += 1
+        group["eligible_count"] += row["is_eligible"]
+        group["total_gratuity_amount"] += row["gratuity_amount"]
+    return groups
+
+def reference_histogram(values, edges):
+    return [sum(lower <= value < upper for value in values) for lower, upper in zip(edges, list(edges[1:]) + [float("inf")])]
+
+def as_groups(aggregates):
+    return {group.pop("key"): group for group in aggregates}
+
+def test_aggregates_match_full_results():
+    rows = random_employees(1500, seed=71)
+    frame = prepare_employee_frame(pd.DataFrame(rows))
+    result = calculate_bulk_gratuity(frame)
+    results = list(result["results"])
+
+    summary = aggregate_bulk_gratuity(split_frame(frame, 400))
+
+    assert summary["row_count"] == len(results)
+    assert (summary["total_gratuity_amount"], summary["eligible_count"], summary["ineligible_count"]) == (
+        result["total_gratuity_amount"], result["eligible_count"], result["ineligible_count"]
+    )
+    assert summary["capped_count"] == sum(row["gratuity_amount"] == MAX_GRATUITY_LIMIT for row in results) > 0
+    assert as_groups(summary["by_employee_type"]) == reference_groups(results, lambda row: row["employee_type"].value)
+    assert as_groups(summary["by_termination_reason"]) == reference_groups(results, lambda row: row["termination_reason"].value)
+    assert as_groups(summary["by_leaving_year"]) == reference_groups(results, lambda row: str(row["leaving_date"].year))
+    assert [b["count"] for b in summary["salary_histogram"]] == reference_histogram([row["last_drawn_salary"] for row in results], SALARY_BIN_EDGES)
+    assert [b["count"] for b in summary["service_histogram"]] == reference_histogram([row["years_of_service"] for row in results], SERVICE_BIN_EDGES)
+    assert summary["salary_histogram"][-1]["upper"] is None
+
+def test_aggregator_accepts_plain_result_lists():
+    frame = prepare_employee_frame(pd.DataFrame(random_employees(200, seed=72)))
+    result = calculate_bulk_gratuity(frame)
+
+    columns, plain = BulkAggregator(), BulkAggregator()
+    columns.add(result)
+    plain.add({**result, "results": list(result["results"])})
+
+    assert columns.as_dict() == plain.as_dict()
+
+def test_summary_endpoint():
+    rows = random_employees(300, seed=73)
+    expected = client.post("/calculator/bulk", files={"file": ("test.csv", to_csv(rows), "text/csv")}).json()
+
+    response = client.post("/calculator/bulk/summary", files={"file": ("test.csv", to_csv(rows), "text/csv")})
+
+    assert response.status_code == 200
+    summary = response.json()
+    assert "results" not in summary
+    assert summary["total_gratuity_amount"] == expected["total_gratuity_amount"]
+    assert sum(group["count"] for group in summary["by_leaving_year"]) == 300
+    assert sum(b["count"] for b in summary["service_histogram"]) == 300
+
+def test_summary_endpoint_rejects_invalid_rows():
+    rows = random_employees(3, seed=74)
+    rows[1]["last_drawn_salary"] = -1
+
+    response = client.post("/calculator/bulk/summary", files={"file": ("test.csv", to_csv(rows), "text/csv")})
+
+    assert response.status_code == 400
+    assert response.json()["detail"]["errors"][0]["row"] == 3
@@ -0,0 +1,111 @@
+import csv
+import io
+
+from fastapi.testclient import TestClient
+from openpyxl import load_workbook
+
+from app.main import app
+from app.services.export import EXPORT_COLUMNS
+
+from helpers import to_csv
+
+client = TestClient(app)
+
+def create_test_csv():
+    """Create a test CSV file for upload testing"""
+    data = {
+        'employee_name': ['John Doe', 'Jane Smith', 'Sam Brown'],
+        'joining_date': ['2015-01-01', '2010-06-15', '2020-03-01'],
+        'leaving_date': ['2023-01-01', '2023-01-01', '2023-05-15'],
+        'last_drawn_salary': [25000, 35000, 30000],
+        'employee_type': ['standard', 'non-covered', ''],
+        'termination_reason': ['resignation', 'retirement', '']
+    }
+
+    return to_csv(data)
+
+def test_download_bulk_results_csv(monkeypatch):
+    monkeypatch.setattr('app.api.calculator.BULK_CHUNK_SIZE', 2)
+    test_csv = create_test_csv()
+
+    expected = client.post("/calculator/bulk", files={"file": ("test.csv", test_csv, "text/csv")}).json()
+    response = client.post(
+        "/calculator/bulk/download",
+        files={"file": ("test.csv", test_csv, "text/csv")}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert "gratuity_calculation_results.csv" in response.headers["content-disposition"]
+
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert len(rows) == 3
+    assert list(rows[0].keys()) == EXPORT_COLUMNS
+    for row, result in zip(rows, expected["results"]):
+        assert row["employee_name"] == result["employee_name"]
+        assert row["joining_date"] == result["joining_date"]
+        assert row["gratuity_amount"] == result["gratuity_amount"]
+        assert row["employee_type"] == result["employee_type"]
+        assert row["message"] == (result["message"] or "")
+
+def test_download_bulk_results_excel():
+    test_csv = create_test_csv()
+
+    expected = client.post("/calculator/bulk", files={"file": ("test.csv", test_csv, "text/csv")}).json()
+    response = client.post(
+        "/calculator/bulk/download?file_type=excel",
+        files={"file": ("test.csv", test_csv, "text/csv")}
+    )
+
+    assert response.status_code == 200
+    assert "gratuity_calculation_results.xlsx" in response.headers["content-disposition"]
+
+    sheet = load_workbook(io.BytesIO(response.content)).active
+    rows = list(sheet.iter_rows(values_only=True))
+    assert list(rows[0]) == EXPORT_COLUMNS
+    assert len(rows) == 4
+    assert rows[1][0] == "John Doe"
+    assert rows[1][5] == float(expected["results"][0]["gratuity_amount"])
+    assert rows[3][8] is False
+
+def test_download_bulk_results_invalid_rows():
+    rows = {
+        'employee_name': ['John Doe'],
+        'joining_date': ['2015-01-01'],
+        'leaving_date': ['2013-01-01'],
+        'last_drawn_salary': [25000],
+    }
+
+    response = client.post(
+        "/calculator/bulk/download",
+        files={"file": ("test.csv", to_csv(rows), "text/csv")}
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"]["errors"][0]["row"] == 2
+
+def test_download_bulk_results_invalid_row_after_first_chunk(monkeypatch):
+    monkeypatch.setattr('app.api.calculator.BULK_CHUNK_SIZE', 2)
+    rows = {
+        'employee_name': ['John Doe', 'Jane Smith', 'Sam Brown'],
+        'joining_date': ['2015-01-01', '2010-06-15', '2020-03-01'],
+        'leaving_date': ['2023-01-01', '2023-01-01', '2019-05-15'],
+        'last_drawn_salary': [25000, 35000, 30000],
+    }
+
+    response = client.post(
+        "/calculator/bulk/download",
+        files={"file": ("test.csv", to_csv(rows), "text/csv")}
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"]["errors"][0]["row"] == 4
+
+def test_download_bulk_results_invalid_file_type():
+    response = client.post(
+        "/calculator/bulk/download",
+        files={"file": ("test.txt", b"not a workforce file", "text/plain")}
+    )
+
+    assert response.status_code == 400
+    assert "CSV or Excel" in response.json()["detail"]
@@ -0,0 +1,340 @@
+import io
+import json
+from datetime import date
+from decimal import Decimal
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.schemas.calculator import IndividualCalculatorInput
+from app.services.calculator import calculate_bulk_gratuity
+from app.services.ingestion import prepare_employee_frame, iter_prepared_chunks, BulkInputError
+
+from helpers import to_csv
+
+client = TestClient(app)
+
+def test_prepare_employee_frame_normalizes_columns():
+    df = pd.DataFrame({
+        'employee_name': ['John Doe', 'Jane Smith', 'Sam Brown'],
+        'joining_date': ['2015-01-01', '2010-06-15', '2018-03-01'],
+        'leaving_date': ['2023-01-01', '2023-01-01', '2023-05-15'],
+        'last_drawn_salary': [25000, 35000, 30000],
+        'employee_type': ['standard', 'non-covered', None],
+    })
+
+    frame = prepare_employee_frame(df)
+
+    assert list(frame['employee_type']) == ['standard', 'non-covered', 'unknown']
+    assert list(frame['termination_reason']) == ['unknown'] * 3
+    assert frame['joining_date'].iloc[1].date() == date(2010, 6, 15)
+    assert frame['last_drawn_salary'].dtype == float
+
+def test_prepare_employee_frame_mixed_date_formats():
+    # Column-wise inference must not reject values a per-row parse would accept
+    df = pd.DataFrame({
+        'employee_name': ['John Doe', 'Jane Smith'],
+        'joining_date': ['2015-01-01', 'June 15, 2010'],
+        'leaving_date': ['2023-01-01', '2023-01-01'],
+        'last_drawn_salary': [25000, 35000],
+    })
+
+    frame = prepare_employee_frame(df)
+
+    assert frame['joining_date'].iloc[1].date() == date(2010, 6, 15)
+
+def test_prepare_employee_frame_reports_all_invalid_rows():
+    df = pd.DataFrame({
+        'employee_name': ['John Doe', 'Jane Smith', 'Sam Brown', 'Ana Diaz'],
+        'joining_date': ['2015-01-01', 'not a date', '2018-03-01', '2012-01-01'],
+        'leaving_date': ['2023-01-01', '2023-01-01', '2017-05-15', '2023-01-01'],
+        'last_drawn_salary': [25000, 35000, -1, 'abc'],
+        'employee_type': ['standard', 'standard', 'standard', 'contractor'],
+    })
+
+    with pytest.raises(BulkInputError) as exc_info:
+        prepare_employee_frame(df)
+
+    errors = exc_info.value.errors
+    assert exc_info.value.message == "File contains 3 invalid row(s)"
+    assert {(error['row'], error['field']) for error in errors} == {
+        (3, 'joining_date'),
+        (4, 'leaving_date'),
+        (4, 'last_drawn_salary'),
+        (5, 'last_drawn_salary'),
+        (5, 'employee_type'),
+    }
+
+def test_ingestion_matches_per_row_conversion():
+    data = {
+        'employee_name': ['John Doe', 'Jane Smith', 'Sam Brown'],
+        'joining_date': ['2015-01-01', '2010-06-15', '2018-03-01'],
+        'leaving_date': ['2023-01-01', '2023-01-01', '2023-05-15'],
+        'last_drawn_salary': [25000, 35000.5, 30000],
+        'employee_type': ['standard', 'non-covered', 'unknown'],
+        'termination_reason': ['resignation', 'retirement', 'unknown']
+    }
+    df = pd.DataFrame(data)
+
+    # The conversion the bulk endpoint used to do one row at a time
+    employees = [
+        IndividualCalculatorInput(
+            employee_name=row['employee_name'],
+            joining_date=pd.to_datetime(row['joining_date']).date(),
+            leaving_date=pd.to_datetime(row['leaving_date']).date(),
+            last_drawn_salary=float(row['last_drawn_salary']),
+            employee_type=row['employee_type'],
+            termination_reason=row['termination_reason']
+        )
+        for _, row in df.iterrows()
+    ]
+
+    assert calculate_bulk_gratuity(prepare_employee_frame(df)) == calculate_bulk_gratuity(employees)
+
+def test_calculate_bulk_api_reports_invalid_rows():
+    test_csv = to_csv({
+        'employee_name': ['John Doe', 'Jane Smith', 'Sam Brown'],
+        'joining_date': ['2015-01-01', '2023-06-15', '2018-03-01'],
+        'leaving_date': ['2023-01-01', '2023-01-01', '2023-05-15'],
+        'last_drawn_salary': [25000, 35000, ''],
+    })
+
+    response = client.post(
+        "/calculator/bulk",
+        files={"file": ("test.csv", test_csv, "text/csv")}
+    )
+
+    assert response.status_code == 400
+    detail = response.json()["detail"]
+    assert detail["message"] == "File contains 2 invalid row(s)"
+    assert [error["row"] for error in detail["errors"]] == [3, 4]
+    assert detail["errors"][0]["error"] == "Leaving date must be after joining date"
+
+def test_calculate_bulk_api_computes_results():
+    test_csv = to_csv({
+        'employee_name': ['John Doe', 'Jane Smith'],
+        'joining_date': ['2015-01-01', '2010-06-15'],
+        'leaving_date': ['2023-01-01', '2023-01-01'],
+        'last_drawn_salary': [25000, 35000],
+        'employee_type': ['standard', 'non-covered'],
+        'termination_reason': ['resignation', 'retirement']
+    })
+
+    response = client.post(
+        "/calculator/bulk",
+        files={"file": ("test.csv", test_csv, "text/csv")}
+    )
+
+    assert response.status_code == 200
+    result = response.json()
+    assert result["results"][0]["gratuity_amount"] == "115384.62"
+    assert result["results"][1]["gratuity_amount"] == "227500.00"
+    assert result["results"][1]["last_drawn_salary"] == "35000.0"
+    assert Decimal(result["total_gratuity_amount"]) == Decimal("342884.62")
+    assert result["eligible_count"] == 2
+
+def test_iter_prepared_chunks_reports_rows_across_chunks():
+    df = pd.DataFrame({
+        'employee_name': [f'Employee {i}' for i in range(10)],
+        'joining_date': ['2015-01-01'] * 10,
+        'leaving_date': ['2023-01-01'] * 4 + ['2014-01-01'] + ['2023-01-01'] * 4 + ['bad'],
+        'last_drawn_salary': [25000] * 10,
+    })
+    chunks = [df.iloc[i:i + 3] for i in range(0, 10, 3)]
+
+    with pytest.raises(BulkInputError) as exc_info:
+        list(iter_prepared_chunks(chunks))
+
+    assert [error['row'] for error in exc_info.value.errors] == [6, 11]
+
+def test_calculate_bulk_api_chunked_matches_whole_file(monkeypatch):
+    monkeypatch.setattr('app.api.calculator.BULK_CHUNK_SIZE', 2)
+    test_csv = to_csv({
+        'employee_name': ['John Doe', 'Jane Smith', 'Sam Brown', 'Ana Diaz', 'Li Wei'],
+        'joining_date': ['2015-01-01', '2010-06-15', '2018-03-01', '2001-02-28', '2022-01-01'],
+        'leaving_date': ['2023-01-01', '2023-01-01', '2023-05-15', '2023-08-31', '2023-01-01'],
+        'last_drawn_salary': [25000, 35000, 30000, 990000, 41000.25],
+        'termination_reason': ['resignation', 'retirement', '', 'retirement', 'death']
+    })
+
+    whole = client.post("/calculator/bulk", files={"file": ("test.csv", test_csv, "text/csv")})
+    chunked = client.post("/calculator/bulk?chunked=true", files={"file": ("test.csv", test_csv, "text/csv")})
+
+    assert whole.status_code == 200
+    assert chunked.status_code == 200
+    assert chunked.json() == whole.json()
+
+def test_calculate_bulk_api_chunked_reports_invalid_rows(monkeypatch):
+    monkeypatch.setattr('app.api.calculator.BULK_CHUNK_SIZE', 2)
+    test_csv = to_csv({
+        'employee_name': ['John Doe', 'Jane Smith', 'Sam Brown', 'Ana Diaz', 'Li Wei'],
+        'joining_date': ['2015-01-01', '2010-06-15', '2018-03-01', '2001-02-28', '2022-01-01'],
+        'leaving_date': ['2023-01-01', '2009-01-01', '2023-05-15', '2023-08-31', '2023-01-01'],
+        'last_drawn_salary': [25000, 35000, 30000, 990000, -1],
+    })
+
+    response = client.post("/calculator/bulk?chunked=true", files={"file": ("test.csv", test_csv, "text/csv")})
+
+    assert response.status_code == 400
+    assert [error["row"] for error in response.json()["detail"]["errors"]] == [3, 6]
+
+def parse_ndjson(response):
+    """Split an NDJSON response body into decoded records"""
+    return [json.loads(line) for line in response.text.splitlines()]
+
+@pytest.mark.parametrize("chunk_size", [2, 50000])
+def test_calculate_bulk_api_ndjson_stream(monkeypatch, chunk_size):
+    monkeypatch.setattr('app.api.calculator.BULK_CHUNK_SIZE', chunk_size)
+    test_csv = to_csv({
+        'employee_name': ['John Doe', 'Jane Smith', 'Sam Brown', 'Ana Diaz', 'Li Wei'],
+        'joining_date': ['2015-01-01', '2010-06-15', '2018-03-01', '2001-02-28', '2022-01-01'],
+        'leaving_date': ['2023-01-01', '2023-01-01', '2023-05-15', '2023-08-31', '2023-01-01'],
+        'last_drawn_salary': [25000, 35000, 30000, 990000, 41000.25],
+        'termination_reason': ['resignation', 'retirement', '', 'retirement', 'death']
+    })
+
+    whole = client.post("/calculator/bulk", files={"file": ("test.csv", test_csv, "text/csv")}).json()
+    response = client.post(
+        "/calculator/bulk",
+        files={"file": ("test.csv", test_csv, "text/csv")},
+        headers={"Accept": "application/x-ndjson"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    records = parse_ndjson(response)
+    assert records[:-1] == whole["results"]
+    assert records[-1] == {"summary": {
+        "total_gratuity_amount": whole["total_gratuity_amount"],
+        "eligible_count": whole["eligible_count"],
+        "ineligible_count": whole["ineligible_count"]
+    }}
+
+def test_calculate_bulk_api_ndjson_excel():
+    excel_buffer = io.BytesIO()
+    pd.DataFrame({
+        'employee_name': ['John Doe', 'Jane Smith'],
+        'joining_date': ['2015-01-01', '2010-06-15'],
+        'leaving_date': ['2023-01-01', '2023-01-01'],
+        'last_drawn_salary': [25000, 35000],
+    }).to_excel(excel_buffer, index=False)
+
+    response = client.post(
+        "/calculator/bulk",
+        files={"file": ("test.xlsx", excel_buffer.getvalue(), "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")},
+        headers={"Accept": "application/x-ndjson"}
+    )
+
+    records = parse_ndjson(response)
+    assert [record.get("employee_name") for record in records[:-1]] == ['John Doe', 'Jane Smith']
+    assert records[-1]["summary"]["eligible_count"] == 2
+
+def test_calculate_bulk_api_ndjson_late_invalid_rows(monkeypatch):
+    monkeypatch.setattr('app.api.calculator.BULK_CHUNK_SIZE', 2)
+    test_csv = to_csv({
+        'employee_name': ['John Doe', 'Jane Smith', 'Sam Brown', 'Ana Diaz', 'Li Wei'],
+        'joining_date': ['2015-01-01', '2010-06-15', '2018-03-01', '2001-02-28', '2022-01-01'],
+        'leaving_date': ['2023-01-01', '2023-01-01', '2023-05-15', '2023-08-31', '2023-01-01'],
+        'last_drawn_salary': [25000, 35000, 30000, 990000, -1],
+    })
+
+    response = client.post(
+        "/calculator/bulk",
+        files={"file": ("test.csv", test_csv, "text/csv")},
+        headers={"Accept": "application/x-ndjson"}
+    )
+
+    # The first two chunks streamed before the invalid row was reached
+    assert response.status_code == 200
+    records = parse_ndjson(response)
+    assert len(records) == 5
+    assert "summary" not in records[-1]
+    assert records[-1]["error"]["errors"][0]["row"] == 6
+
+def workbook_bytes(sheets):
+    """Build an .xlsx file from a dict of sheet name to rows (the first row is not special)"""
+    from openpyxl import Workbook
+
+    workbook = Workbook()
+    workbook.remove(workbook.active)
+    for name, rows in sheets.items():
+        sheet = workbook.create_sheet(name)
+        for row in rows:
+            sheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+EXCEL_HEADER = ['employee_name', 'joining_date', 'leaving_date', 'last_drawn_salary', 'employee_type']
+
+def test_read_xlsx_chunks_matches_read_excel():
+    from app.services.ingestion import read_xlsx_chunks
+
+    rows = [
+        ['John Doe', date(2015, 1, 1), date(2023, 1, 1), 25000, 'standard'],
+        ['Jane Smith', '2010-06-15', '2023-01-01', 35000.5, None],
+        ['Sam Brown', date(2018, 3, 1), date(2023, 5, 15), 30000],
+        ['Ana Diaz', date(2001, 2, 28), date(2023, 8, 31), 990000, 'non-covered'],
+        [None, None, None, None, None],
+    ]
+    content = workbook_bytes({'Sheet': [EXCEL_HEADER, *rows]})
+
+    chunks = list(read_xlsx_chunks(io.BytesIO(content), 2))
+
+    # Trailing blank rows are dropped and short rows padded, as pandas does
+    assert [len(chunk) for chunk in chunks] == [2, 2]
+    streamed = prepare_employee_frame(pd.concat(chunks, ignore_index=True))
+    pd.testing.assert_frame_equal(streamed, prepare_employee_frame(pd.read_excel(io.BytesIO(content))), check_dtype=False)
+
+def test_calculate_bulk_api_excel_sheet_and_header_row(monkeypatch):
+    monkeypatch.setattr('app.api.calculator.BULK_CHUNK_SIZE', 2)
+    rows = [
+        ['John Doe', date(2015, 1, 1), date(2023, 1, 1), 25000, 'standard'],
+        ['Jane Smith', date(2010, 6, 15), date(2023, 1, 1), 35000, 'non-covered'],
+        ['Sam Brown', date(2018, 3, 1), date(2023, 5, 15), 30000, 'standard'],
+    ]
+    content = workbook_bytes({
+        'Cover': [['Not employee data']],
+        'Payroll': [['Payroll export'], ['Generated 2023-09-01'], EXCEL_HEADER, *rows],
+    })
+    expected = client.post("/calculator/bulk", files={"file": ("test.csv", to_csv(dict(zip(EXCEL_HEADER, zip(*rows)))), "text/csv")}).json()
+
+    for query in ("?sheet=Payroll&header_row=3", "?sheet=Payroll&header_row=3&chunked=true"):
+        response = client.post(f"/calculator/bulk{query}", files={"file": ("test.xlsx", content)})
+        assert response.status_code == 200
+        assert response.json() == expected
+
+    # The first sheet has none of the required columns
+    response = client.post("/calculator/bulk", files={"file": ("test.xlsx", content)})
+    assert response.status_code == 400
+    assert "missing required columns" in response.json()["detail"]
+
+    response = client.post("/calculator/bulk?sheet=Missing", files={"file": ("test.xlsx", content)})
+    assert response.status_code == 400
+    assert "Missing" in response.json()["detail"]
+
+def test_calculate_bulk_api_excel_rows_numbered_from_header_row(monkeypatch):
+    monkeypatch.setattr('app.api.calculator.BULK_CHUNK_SIZE', 2)
+    content = workbook_bytes({'Payroll': [
+        ['Payroll export'],
+        EXCEL_HEADER,
+        ['John Doe', date(2015, 1, 1), date(2023, 1, 1), 25000],
+        [None, None, None, None],
+        ['Jane Smith', date(2010, 6, 15), date(2023, 1, 1), 35000],
+        ['Sam Brown', date(2018, 3, 1), date(2017, 5, 15), 30000],
+        [None, None, None, None],
+    ]})
+
+    response = client.post("/calculator/bulk?header_row=2", files={"file": ("test.xlsx", content)})
+
+    # The blank row between rows of data is reported; the trailing one is not
+    assert response.status_code == 400
+    errors = response.json()["detail"]["errors"]
+    assert {error["row"] for error in errors} == {4, 6}
+    assert {"row": 6, "field": "leaving_date", "error": "Leaving date must be after joining date"} in errors
+
+def test_calculate_bulk_api_unreadable_excel():
+    response = client.post("/calculator/bulk", files={"file": ("test.xlsx", b"not a workbook")})
+    assert response.status_code == 400
@@ -0,0 +1,211 @@
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import RETRY_AFTER_SECONDS
+from app.main import app
+from app.schemas import BulkJob
+from app.services.jobs import JobRunner, SQLiteJobStore, FileSystemJobStore, create_job_store, get_job_runner
+
+from helpers import to_csv
+
+client = TestClient(app)
+
+def create_test_csv(leaving_dates=('2023-01-01', '2023-01-01')):
+    """Create a test CSV file for upload testing"""
+    data = {
+        'employee_name': ['John Doe', 'Jane Smith'],
+        'joining_date': ['2015-01-01', '2010-06-15'],
+        'leaving_date': list(leaving_dates),
+        'last_drawn_salary': [25000, 35000],
+        'employee_type': ['standard', 'non-covered'],
+        'termination_reason': ['resignation', 'retirement']
+    }
+
+    return to_csv(data)
+
+@pytest.fixture(params=["sqlite", "filesystem"])
+def runner(request, tmp_path):
+    """Job runner using each store backend, installed as the API dependency"""
+    if request.param == "sqlite":
+        store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+    else:
+        store = FileSystemJobStore(str(tmp_path / "jobs"))
+
+    job_runner = JobRunner(store, str(tmp_path / "uploads"), max_workers=1)
+    app.dependency_overrides[get_job_runner] = lambda: job_runner
+    yield job_runner
+    app.dependency_overrides.clear()
+    job_runner.executor.shutdown(wait=True)
+
+def wait_for_job(job_id, timeout=10):
+    """Poll the job endpoint until the job finishes"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/calculator/bulk/jobs/{job_id}").json()
+        if job["status"] in ("completed", "failed"):
+            return job
+        time.sleep(0.05)
+    raise AssertionError("Job did not finish in time")
+
+def test_bulk_job_completes(runner):
+    test_csv = create_test_csv()
+    expected = client.post("/calculator/bulk", files={"file": ("test.csv", test_csv, "text/csv")}).json()
+
+    response = client.post("/calculator/bulk/jobs", files={"file": ("test.csv", test_csv, "text/csv")})
+
+    assert response.status_code == 202
+    created = response.json()
+    assert created["status"] == "queued"
+    assert created["filename"] == "test.csv"
+    assert created["result"] is None
+
+    job = wait_for_job(created["job_id"])
+    assert job["status"] == "completed"
+    assert job["rows_processed"] == 2
+    assert job["error"] is None
+    assert job["result"] == expected
+
+def test_completed_job_is_encoded_like_response_model(runner):
+    response = client.post("/calculator/bulk/jobs", files={"file": ("test.csv", create_test_csv(), "text/csv")})
+    job_id = wait_for_job(response.json()["job_id"])["job_id"]
+
+    body = client.get(f"/calculator/bulk/jobs/{job_id}").content
+
+    result = json.loads(runner.store.get_result(job_id))
+    assert body == BulkJob(**runner.get(job_id), result=result).model_dump_json().encode("utf-8")
+
+def test_bulk_job_reports_invalid_rows(runner):
+    test_csv = create_test_csv(leaving_dates=('2023-01-01', '2009-01-01'))
+
+    response = client.post("/calculator/bulk/jobs", files={"file": ("test.csv", test_csv, "text/csv")})
+    job = wait_for_job(response.json()["job_id"])
+
+    assert job["status"] == "failed"
+    assert job["result"] is None
+    assert job["error"]["errors"][0]["row"] == 3
+
+def test_bulk_job_not_found(runner):
+    response = client.get("/calculator/bulk/jobs/does-not-exist")
+
+    assert response.status_code == 404
+
+def test_bulk_job_invalid_file_type(runner):
+    response = client.post("/calculator/bulk/jobs", files={"file": ("test.txt", b"text", "text/plain")})
+
+    assert response.status_code == 400
+
+def test_bulk_job_rejected_when_queue_is_full(runner, monkeypatch):
+    monkeypatch.setattr(runner, "max_queued", 1)
+    monkeypatch.setattr(runner, "pending", 1)
+
+    response = client.post("/calculator/bulk/jobs", files={"file": ("test.csv", create_test_csv(), "text/csv")})
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == str(RETRY_AFTER_SECONDS)
+    assert runner.store.list_jobs() == []
+    assert os.listdir(runner.upload_dir) == []
+
+def test_finished_jobs_expire(runner):
+    old = "2024-01-01T00:00:00+00:00"
+    for job_id, status in (("done", "completed"), ("failed", "failed")):
+        runner.store.create({
+            "job_id": job_id, "status": status, "filename": "test.csv", "rows_processed": 2,
+            "created_at": old, "updated_at": old, "error": None
+        })
+    runner.store.set_result("done", "{}")
+
+    assert client.get("/calculator/bulk/jobs/done").status_code == 404
+    assert runner.store.get_result("done") is None
+    assert runner.remove_expired() == 1
+    assert runner.store.list_jobs() == []
+
+def dead_pid():
+    """The pid of a process that has exited"""
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+@pytest.mark.parametrize("kind", ["sqlite", "filesystem"])
+def test_interrupted_jobs_fail_on_startup(tmp_path, kind):
+    store = create_job_store(kind, str(tmp_path))
+    upload_dir = tmp_path / "uploads"
+    dead, live = dead_pid(), os.getppid()
+    for owner in (dead, live):
+        (upload_dir / str(owner)).mkdir(parents=True)
+        (upload_dir / str(owner) / "running.csv").write_bytes(create_test_csv())
+    jobs = (("queued", "queued", dead), ("running", "running", dead), ("done", "completed", dead), ("legacy", "running", None), ("other", "running", live))
+    for job_id, status, owner in jobs:
+        store.create({
+            "job_id": job_id, "status": status, "filename": "test.csv", "rows_processed": 0,
+            "created_at": "2024-01-01T00:00:00+00:00", "updated_at": "2024-01-01T00:00:00+00:00", "error": None,
+            "owner": owner
+        })
+
+    job_runner = JobRunner(store, str(upload_dir), max_workers=1, ttl=0)
+    job_runner.executor.shutdown()
+
+    assert store.get("queued")["status"] == "failed"
+    assert "interrupted" in store.get("running")["error"]
+    assert store.get("legacy")["status"] == "failed"
+    assert store.get("done")["status"] == "completed"
+    # Jobs of another worker process that is still running are left alone
+    assert store.get("other")["status"] == "running"
+    assert sorted(path.name for path in upload_dir.iterdir()) == sorted([str(live), str(os.getpid())])
+    assert os.listdir(upload_dir / str(live)) == ["running.csv"]
+
+def test_missing_upload_still_finishes_job(runner):
+    runner.pending = 1
+    runner.store.create({
+        "job_id": "gone", "status": "queued", "filename": "test.csv", "rows_processed": 0,
+        "created_at": "2024-01-01T00:00:00+00:00", "updated_at": "2024-01-01T00:00:00+00:00", "error": None
+    })
+
+    runner._run("gone", os.path.join(runner.upload_dir, "gone.csv"), "csv")
+
+    assert runner.pending == 0
+    assert runner.store.get("gone")["status"] == "failed"
+
+def test_sqlite_store_adds_owner_column(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE bulk_jobs (job_id TEXT PRIMARY KEY, status TEXT NOT NULL, filename TEXT NOT NULL, "
+        "rows_processed INTEGER NOT NULL DEFAULT 0, created_at TEXT NOT NULL, updated_at TEXT NOT NULL, error TEXT, result TEXT)"
+    )
+    connection.close()
+
+    store = SQLiteJobStore(path)
+    store.create({
+        "job_id": "abc", "status": "queued", "filename": "test.csv", "rows_processed": 0,
+        "created_at": "2024-01-01T00:00:00+00:00", "updated_at": "2024-01-01T00:00:00+00:00", "error": None, "owner": 42
+    })
+
+    assert store.get("abc")["owner"] == 42
+
+def test_sqlite_store_closes_connections(tmp_path, monkeypatch):
+    opened = []
+    connect = sqlite3.connect
+    def tracking_connect(*args, **kwargs):
+        opened.append(connect(*args, **kwargs))
+        return opened[-1]
+    monkeypatch.setattr(sqlite3, "connect", tracking_connect)
+
+    store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+    store.create({
+        "job_id": "abc", "status": "queued", "filename": "test.csv", "rows_processed": 0,
+        "created_at": "2024-01-01T00:00:00+00:00", "updated_at": "2024-01-01T00:00:00+00:00", "error": None
+    })
+    store.update("abc", rows_processed=5)
+    assert store.get("abc")["rows_processed"] == 5
+
+    assert len(opened) == 4
+    for connection in opened:
+        with pytest.raises(sqlite3.ProgrammingError):
+            connection.execute("SELECT 1")
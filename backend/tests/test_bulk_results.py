@@ -0,0 +1,121 @@
+import json
+import pickle
+import tracemalloc
+from datetime import date
+from decimal import Decimal
+
+import pandas as pd
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.schemas.calculator import BulkCalculationResult, GratuityResult, IndividualCalculatorInput
+from app.services.calculator import calculate_bulk_gratuity, calculate_individual_gratuity
+from app.services.ingestion import prepare_employee_frame
+from app.services.results import ResultColumns, concat_results, render_bulk_result_json, render_result_json
+
+from test_columnar_calculator import random_employees
+
+def pydantic_body(result):
+    """Encode a bulk result the way the endpoint did before results were stored in columns"""
+    materialized = {**result, "results": list(result["results"])}
+    return JSONResponse(BulkCalculationResult(**materialized).model_dump(mode="json")).body
+
+def test_scalar_results_read_like_dicts():
+    employees = [IndividualCalculatorInput(**row) for row in random_employees(300, seed=21)]
+
+    result = calculate_bulk_gratuity(employees)
+    expected = [calculate_individual_gratuity(**employee.model_dump()) for employee in employees]
+
+    assert isinstance(result["results"], ResultColumns)
+    assert len(result["results"]) == len(expected)
+    assert list(result["results"]) == expected
+    assert result["results"][-1] == expected[-1]
+    # Values keep their Python types and Decimal exponents
+    for actual, reference in zip(result["results"], expected):
+        assert [type(value) for value in actual.values()] == [type(value) for value in reference.values()]
+        assert str(actual["gratuity_amount"]) == str(reference["gratuity_amount"])
+        assert str(actual["last_drawn_salary"]) == str(reference["last_drawn_salary"])
+    assert result["total_gratuity_amount"] == sum((r["gratuity_amount"] for r in expected), Decimal("0.00"))
+
+def test_direct_json_matches_pydantic_encoding():
+    # Float salaries from the ingestion path, raw Decimal salaries and the scalar path
+    rows = random_employees(2000, seed=22)
+    rows[0]["employee_name"] = 'Zoë "Z" O\'Brien \\ \t '
+    rows[1]["last_drawn_salary"] = 1e16
+    rows[2]["last_drawn_salary"] = 0.00001
+    frame = prepare_employee_frame(pd.DataFrame(rows))
+    decimal_frame = pd.DataFrame(rows).assign(last_drawn_salary=[Decimal(str(r["last_drawn_salary"])) for r in rows])
+    employees = [IndividualCalculatorInput(**row) for row in rows[:300]]
+
+    for result in (calculate_bulk_gratuity(frame), calculate_bulk_gratuity(decimal_frame), calculate_bulk_gratuity(employees)):
+        assert render_bulk_result_json(result) == pydantic_body(result)
+
+def test_row_json_matches_model_dump_json():
+    result = calculate_bulk_gratuity(prepare_employee_frame(pd.DataFrame(random_employees(500, seed=23))))
+
+    for line, row in zip(result["results"].iter_json(), result["results"]):
+        assert line == GratuityResult(**row).model_dump_json()
+
+def test_plain_lists_are_still_validated():
+    result = {
+        "results": [calculate_individual_gratuity("Jane Smith", date(2010, 1, 1), date(2020, 1, 1), Decimal("30000"))],
+        "total_gratuity_amount": Decimal("173076.92"),
+        "eligible_count": 1,
+        "ineligible_count": 0
+    }
+
+    assert render_bulk_result_json(result) == pydantic_body(result)
+    assert json.loads(render_bulk_result_json(result))["results"][0]["gratuity_amount"] == "173076.92"
+
+def test_slices_concatenation_and_pickling_keep_rows():
+    frame = prepare_employee_frame(pd.DataFrame(random_employees(1000, seed=24)))
+    results = calculate_bulk_gratuity(frame)["results"]
+    employees = [IndividualCalculatorInput(**row) for row in random_employees(50, seed=25)]
+    scalar_results = calculate_bulk_gratuity(employees)["results"]
+
+    assert results[100:200] == list(results)[100:200]
+    assert concat_results([results[:400], results[400:]]) == results
+    # Float and Decimal salary columns can be mixed
+    assert concat_results([results[:10], scalar_results]) == list(results)[:10] + list(scalar_results)
+    assert concat_results([]) == []
+    assert pickle.loads(pickle.dumps(results)) == results
+
+def test_columns_use_far_less_memory_than_dicts():
+    frame = prepare_employee_frame(pd.DataFrame(random_employees(20000, seed=26)))
+
+    tracemalloc.start()
+    try:
+        results = calculate_bulk_gratuity(frame)["results"]
+        columns_size = tracemalloc.get_traced_memory()[0]
+        dicts = list(results)
+        dicts_size = tracemalloc.get_traced_memory()[0] - columns_size
+    finally:
+        tracemalloc.stop()
+
+    assert len(dicts) == 20000
+    assert columns_size * 5 < dicts_size
+
+def test_single_result_json_matches_model_dump_json():
+    rows = random_employees(300, seed=27)
+    rows[0]["employee_name"] = 'Zoë "Z" \\ \n'
+
+    for row in rows:
+        result = calculate_individual_gratuity(**IndividualCalculatorInput(**row).model_dump())
+        assert render_result_json(result) == GratuityResult(**result).model_dump_json().encode("utf-8")
+
+def test_individual_endpoint_body_is_unchanged():
+    payload = {
+        "employee_name": "Jane Smith",
+        "joining_date": "2010-06-15",
+        "leaving_date": "2023-01-01",
+        "last_drawn_salary": "35000.50",
+        "employee_type": "unknown"
+    }
+    expected = calculate_individual_gratuity(**IndividualCalculatorInput(**payload).model_dump())
+
+    response = TestClient(app).post("/calculator/individual", json=payload)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.content == JSONResponse(GratuityResult(**expected).model_dump(mode="json")).body
@@ -1,8 +1,11 @@
-from datetime import date
+from datetime import date, timedelta
 from decimal import Decimal
 import pytest
+from dateutil.relativedelta import relativedelta
 from app.services.calculator import (
     calculate_years_of_service, 
+    years_of_service_cache_stats,
+    clear_years_of_service_cache,
     calculate_gratuity_amount,
     calculate_individual_gratuity,
     calculate_bulk_gratuity,
@@ -24,6 +27,33 @@ def test_calculate_years_of_service():
     # 5 years and almost 6 months (rounds up if 5 months and 30 days)
     assert calculate_years_of_service(date(2018, 1, 1), date(2023, 6, 30)) == 6
 
+def relativedelta_years_of_service(joining_date, leaving_date):
+    """Reference implementation of the rounding rule on top of relativedelta"""
+    delta = relativedelta(leaving_date, joining_date)
+    years = delta.years
+    if delta.months >= 6 or (delta.months == 5 and delta.days >= 30):
+        years += 1
+    return years
+
+def test_calculate_years_of_service_matches_relativedelta():
+    # Start dates around month ends and leap days, with every leaving date for 7 years
+    for joining_date in [date(2019, 1, 31), date(2019, 3, 30), date(2020, 2, 29), date(2019, 12, 31), date(2019, 6, 15)]:
+        for offset in range(0, 7 * 366):
+            leaving_date = joining_date + timedelta(days=offset)
+            assert calculate_years_of_service(joining_date, leaving_date) == relativedelta_years_of_service(joining_date, leaving_date)
+
+def test_years_of_service_cache_counters():
+    clear_years_of_service_cache()
+
+    calculate_years_of_service(date(2015, 1, 1), date(2023, 1, 1))
+    calculate_years_of_service(date(2015, 1, 1), date(2023, 1, 1))
+    calculate_years_of_service(date(2016, 1, 1), date(2023, 1, 1))
+
+    stats = years_of_service_cache_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["size"] == 2
+
 def test_is_eligible_for_gratuity():
     # Standard termination reasons
     assert is_eligible_for_gratuity(5, TerminationReason.RESIGNATION) == True
@@ -0,0 +1,37 @@
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_light_endpoints_do_not_import_pandas():
+    # A fresh interpreter is needed, the test session has already imported pandas
+    script = (
+        "import sys\n"
+        "from fastapi.testclient import TestClient\n"
+        "from app.main import app\n"
+        "client = TestClient(app)\n"
+        "assert client.get('/health').status_code == 200\n"
+        "assert client.post('/calculator/individual', json={'employee_name': 'Jane Smith', "
+        "'joining_date': '2018-01-01', 'leaving_date': '2023-01-01', 'last_drawn_salary': 25000}).status_code == 200\n"
+        "print(sorted(name for name in ('pandas', 'numpy', 'openpyxl') if name in sys.modules))\n"
+    )
+    completed = subprocess.run([sys.executable, "-c", script], cwd=BACKEND_DIR, capture_output=True, text=True)
+
+    assert completed.returncode == 0, completed.stderr
+    assert completed.stdout.strip() == "[]"
+
+def test_small_csv_upload_does_not_import_pandas():
+    script = (
+        "import sys\n"
+        "from fastapi.testclient import TestClient\n"
+        "from app.main import app\n"
+        "csv_bytes = b'employee_name,joining_date,leaving_date,last_drawn_salary\\nJane Smith,2018-01-01,2023-01-01,25000\\n'\n"
+        "response = TestClient(app).post('/calculator/bulk', files={'file': ('test.csv', csv_bytes, 'text/csv')})\n"
+        "assert response.status_code == 200, response.text\n"
+        "print(sorted(name for name in ('pandas', 'numpy', 'openpyxl') if name in sys.modules))\n"
+    )
+    completed = subprocess.run([sys.executable, "-c", script], cwd=BACKEND_DIR, capture_output=True, text=True)
+
+    assert completed.returncode == 0, completed.stderr
+    assert completed.stdout.strip() == "[]"
@@ -0,0 +1,156 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.services.calculator import (
+    calculate_years_of_service,
+    calculate_individual_gratuity,
+    calculate_bulk_gratuity,
+    MAX_GRATUITY_LIMIT
+)
+from app.services.columnar import (
+    calculate_bulk_gratuity_columnar,
+    years_of_service_columns,
+    to_decimal
+)
+from app.schemas.calculator import EmployeeType, TerminationReason, IndividualCalculatorInput
+
+def random_employees(count, seed=1972):
+    """Generate a reproducible workforce covering month-end, leap-year and cap edge cases"""
+    rng = random.Random(seed)
+    employee_types = list(EmployeeType)
+    termination_reasons = list(TerminationReason)
+    rows = []
+
+    for i in range(count):
+        joining = date(1975, 1, 1) + timedelta(days=rng.randint(0, 18000))
+        # Bias a share of the rows towards month ends and exact anniversaries
+        if i % 5 == 0:
+            joining = date(joining.year, joining.month, 1) - timedelta(days=1)
+        leaving = joining + timedelta(days=rng.randint(0, 16000))
+        if i % 7 == 0:
+            leaving = date(leaving.year, leaving.month, 1) - timedelta(days=rng.choice([0, 1, 2]))
+            leaving = max(leaving, joining)
+
+        salary = rng.choice([
+            rng.randint(0, 500000),
+            round(rng.uniform(0, 200000), 2),
+            round(rng.uniform(0, 200000), 1),
+            rng.randint(500000, 5000000)
+        ])
+
+        rows.append({
+            "employee_name": f"Employee {i}",
+            "joining_date": joining,
+            "leaving_date": leaving,
+            "last_drawn_salary": salary,
+            "employee_type": rng.choice(employee_types).value,
+            "termination_reason": rng.choice(termination_reasons).value
+        })
+
+    return rows
+
+def scalar_results(rows):
+    """Compute the reference results with the scalar Decimal path"""
+    employees = [IndividualCalculatorInput(**row) for row in rows]
+    return calculate_bulk_gratuity(employees)
+
+def test_years_of_service_parity():
+    joining = []
+    leaving = []
+    # Every combination of month-end style days over a few years exercises day clamping
+    for start in [date(2019, 1, 31), date(2019, 2, 28), date(2020, 2, 29), date(2019, 8, 30), date(2019, 3, 1)]:
+        for offset in range(0, 2300, 3):
+            joining.append(start)
+            leaving.append(start + timedelta(days=offset))
+
+    vectorized = years_of_service_columns(
+        np.array(joining, dtype="datetime64[D]"),
+        np.array(leaving, dtype="datetime64[D]")
+    )
+
+    expected = [calculate_years_of_service(j, l) for j, l in zip(joining, leaving)]
+    assert vectorized.tolist() == expected
+
+def test_years_of_service_rejects_reversed_dates():
+    with pytest.raises(ValueError):
+        years_of_service_columns(
+            np.array(["2023-01-01"], dtype="datetime64[D]"),
+            np.array(["2022-01-01"], dtype="datetime64[D]")
+        )
+
+def test_columnar_parity_with_scalar_path():
+    rows = random_employees(3000)
+
+    expected = scalar_results(rows)
+    result = calculate_bulk_gratuity_columnar(pd.DataFrame(rows))
+
+    assert result["eligible_count"] == expected["eligible_count"]
+    assert result["ineligible_count"] == expected["ineligible_count"]
+    assert result["total_gratuity_amount"] == expected["total_gratuity_amount"]
+    assert str(result["total_gratuity_amount"]) == str(expected["total_gratuity_amount"])
+
+    for actual, reference in zip(result["results"], expected["results"]):
+        assert actual == reference
+        # Same value is not enough, the serialized amount must match to the paisa
+        assert str(actual["gratuity_amount"]) == str(reference["gratuity_amount"])
+
+def test_columnar_rounding_ties_and_cap():
+    # 26 * 0.005 style ties: salary * years * 15 / 26 landing exactly on half a paisa
+    rows = []
+    for salary in [Decimal("0.13"), Decimal("1.3"), Decimal("8.67"), Decimal("1733.33"), Decimal("123456.789")]:
+        for years in range(5, 12):
+            rows.append({
+                "employee_name": "Tie",
+                "joining_date": date(2000, 1, 1),
+                "leaving_date": date(2000 + years, 1, 1),
+                "last_drawn_salary": salary,
+                "employee_type": "standard",
+                "termination_reason": "retirement"
+            })
+
+    # Exactly at and just above the cap
+    cap_salary = MAX_GRATUITY_LIMIT * 26 / 15 / 10
+    rows.append({
+        "employee_name": "At Cap",
+        "joining_date": date(2000, 1, 1),
+        "leaving_date": date(2010, 1, 1),
+        "last_drawn_salary": cap_salary.quantize(Decimal("0.01")),
+        "employee_type": "standard",
+        "termination_reason": "retirement"
+    })
+
+    expected = scalar_results(rows)
+    result = calculate_bulk_gratuity_columnar(pd.DataFrame(rows))
+
+    assert result["results"] == expected["results"]
+    assert result["total_gratuity_amount"] == expected["total_gratuity_amount"]
+
+def test_columnar_defaults_for_missing_optional_columns():
+    frame = pd.DataFrame({
+        "employee_name": ["Jane Smith"],
+        "joining_date": ["2018-01-01"],
+        "leaving_date": ["2023-01-01"],
+        "last_drawn_salary": [25000.0]
+    })
+
+    result = calculate_bulk_gratuity_columnar(frame)
+    expected = calculate_individual_gratuity(
+        employee_name="Jane Smith",
+        joining_date=date(2018, 1, 1),
+        leaving_date=date(2023, 1, 1),
+        last_drawn_salary=to_decimal(25000.0)
+    )
+
+    assert result["results"] == [expected]
+    assert result["results"][0]["gratuity_amount"] == Decimal("72115.38")
+
+def test_bulk_gratuity_dispatches_dataframes():
+    rows = random_employees(50, seed=26)
+    result = calculate_bulk_gratuity(pd.DataFrame(rows))
+
+    assert result == scalar_results(rows)
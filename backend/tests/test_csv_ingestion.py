@@ -0,0 +1,82 @@
+import io
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.calculator import calculate_bulk_gratuity
+from app.services.csv_ingestion import read_csv_employees, UnsupportedCsvError
+from app.services.ingestion import prepare_employee_frame, BulkInputError
+from tests.test_columnar_calculator import random_employees
+
+client = TestClient(app)
+
+def pandas_path(csv_bytes):
+    """Read an upload the way the pandas path does"""
+    return prepare_employee_frame(pd.read_csv(io.StringIO(csv_bytes.decode('utf-8'))))
+
+def test_csv_reader_matches_pandas_path():
+    csv_bytes = pd.DataFrame(random_employees(2000, seed=14)).to_csv(index=False).encode('utf-8')
+
+    employees = read_csv_employees(io.BytesIO(csv_bytes))
+
+    assert calculate_bulk_gratuity(employees) == calculate_bulk_gratuity(pandas_path(csv_bytes))
+
+def test_csv_reader_matches_pandas_defaults_and_quirks():
+    # BOM, quoted names, blank lines, short rows, missing optional columns and NA markers
+    csv_bytes = (
+        "﻿employee_name,joining_date,leaving_date,last_drawn_salary,termination_reason\r\n"
+        '"Doe, John",2015-01-01,2023-01-01,25000,resignation\r\n'
+        "\r\n"
+        "Jane Smith,2010-06-15,2023-01-01,35000.50,NA\r\n"
+        "Sam Brown,2018-03-01,2023-05-15,3e4\r\n"
+    ).encode('utf-8')
+
+    employees = read_csv_employees(io.BytesIO(csv_bytes))
+
+    assert [employee.employee_name for employee in employees] == ['Doe, John', 'Jane Smith', 'Sam Brown']
+    assert calculate_bulk_gratuity(employees) == calculate_bulk_gratuity(pandas_path(csv_bytes))
+
+def test_csv_reader_reports_same_errors_as_pandas_path():
+    csv_bytes = (
+        "employee_name,joining_date,leaving_date,last_drawn_salary,employee_type\n"
+        "John Doe,2015-01-01,2023-01-01,25000,standard\n"
+        ",2023-02-30,2023-01-01,35000,standard\n"
+        "Sam Brown,2018-03-01,2017-05-15,-1,standard\n"
+        "Ana Diaz,2012-01-01,,NULL,contractor\n"
+    ).encode('utf-8')
+
+    with pytest.raises(BulkInputError) as expected:
+        pandas_path(csv_bytes)
+    with pytest.raises(BulkInputError) as actual:
+        read_csv_employees(io.BytesIO(csv_bytes))
+
+    assert actual.value.message == expected.value.message
+    assert actual.value.errors == expected.value.errors
+
+def test_csv_reader_reports_missing_columns():
+    with pytest.raises(BulkInputError) as exc_info:
+        read_csv_employees(io.BytesIO(b"employee_name,joining_date\nJohn Doe,2015-01-01\n"))
+
+    assert exc_info.value.message == "File is missing required columns: leaving_date, last_drawn_salary"
+
+@pytest.mark.parametrize("row", [
+    "John Doe,01/15/2015,2023-01-01,25000",    # non-ISO date
+    "12345,2015-01-01,2023-01-01,25000",       # name pandas may read as a number
+    "John Doe,2015-01-01,2023-01-01,25 000",   # unusual number syntax
+    "John Doe,2015-01-01,2023-01-01,25000,x",  # more fields than the header
+])
+def test_csv_reader_defers_to_pandas(row):
+    csv_bytes = f"employee_name,joining_date,leaving_date,last_drawn_salary\n{row}\n".encode('utf-8')
+
+    with pytest.raises(UnsupportedCsvError):
+        read_csv_employees(io.BytesIO(csv_bytes))
+
+def test_calculate_bulk_api_falls_back_to_pandas():
+    csv_bytes = b"employee_name,joining_date,leaving_date,last_drawn_salary\nJohn Doe,\"June 15, 2010\",2023-01-01,35000\n"
+
+    response = client.post("/calculator/bulk", files={"file": ("test.csv", csv_bytes, "text/csv")})
+
+    assert response.status_code == 200
+    assert response.json()["results"][0]["joining_date"] == "2010-06-15"
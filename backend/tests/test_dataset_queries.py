@@ -0,0 +1,131 @@
+import sqlite3
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.schemas import DatasetResultPage
+from app.services.dataset_store import SORT_COLUMNS, DatasetStore, get_dataset_store
+from app.services.results import render_result_page_json
+
+from helpers import to_csv
+from test_columnar_calculator import random_employees
+
+client = TestClient(app)
+
+ROWS = random_employees(1000, seed=61)
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory):
+    """Dataset store holding ROWS under the id "payroll", installed as the API dependency"""
+    dataset_store = DatasetStore(str(tmp_path_factory.mktemp("datasets") / "datasets.sqlite3"))
+    app.dependency_overrides[get_dataset_store] = lambda: dataset_store
+    response = client.put("/calculator/bulk/datasets/payroll", files={"file": ("payroll.csv", to_csv(ROWS), "text/csv")})
+    assert response.status_code == 200
+    yield dataset_store
+    app.dependency_overrides.clear()
+
+@pytest.fixture(scope="module")
+def expected(store):
+    """The same results from a full /bulk calculation, in file order"""
+    return client.post("/calculator/bulk", files={"file": ("test.csv", to_csv(ROWS), "text/csv")}).json()["results"]
+
+def fetch_all(**params):
+    """Follow next_cursor through every page of a query, returning the first page's count"""
+    results, cursor, total_count = [], None, None
+    while True:
+        query = {**params, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/calculator/bulk/datasets/payroll/results", params=query).json()
+        if cursor is None:
+            total_count = page["total_count"]
+        else:
+            # Later pages are not counted again
+            assert page["total_count"] is None
+        results.extend(page["results"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return total_count, results
+
+def test_pages_cover_all_rows_in_order(expected):
+    total_count, results = fetch_all(limit=77)
+
+    assert total_count == 1000
+    assert results == expected
+
+def test_filters_match_full_results(expected):
+    total_count, results = fetch_all(employee_type="non-covered", is_eligible="true", leaving_date_from="2000-01-01", leaving_date_to="2010-12-31", limit=50)
+
+    matching = [
+        row for row in expected
+        if row["employee_type"] == "non-covered" and row["is_eligible"] and "2000-01-01" <= row["leaving_date"] <= "2010-12-31"
+    ]
+    assert total_count == len(matching) > 0
+    assert results == matching
+
+@pytest.mark.parametrize("sort, key", [
+    ("gratuity_amount", lambda row: float(row["gratuity_amount"])),
+    ("leaving_date", lambda row: row["leaving_date"]),
+    ("employee_name", lambda row: row["employee_name"]),
+])
+@pytest.mark.parametrize("descending", [False, True])
+def test_sorted_pages(expected, sort, key, descending):
+    _, results = fetch_all(sort=sort, descending=str(descending).lower(), termination_reason="resignation", limit=40)
+
+    matching = [row for row in expected if row["termination_reason"] == "resignation"]
+    # Ties keep the order rows were stored in, reversed when descending
+    reference = sorted(matching[::-1] if descending else matching, key=key, reverse=descending)
+    assert results == reference
+
+def test_queries_use_indexes(store):
+    connection = sqlite3.connect(store.path)
+    for column in ("employee_type", "termination_reason", "is_eligible", "leaving_date"):
+        plan = connection.execute(f"EXPLAIN QUERY PLAN SELECT * FROM dataset_rows WHERE dataset_id = ? AND {column} = ?", ("payroll", 1)).fetchall()
+        assert "USING INDEX" in plan[0][-1]
+    connection.close()
+
+@pytest.mark.parametrize("sort", list(SORT_COLUMNS))
+@pytest.mark.parametrize("descending", [False, True])
+def test_sorted_pages_use_indexes(store, monkeypatch, sort, descending):
+    statements = []
+    connect = store._connect
+    def tracing_connect():
+        connection = connect()
+        connection.set_trace_callback(statements.append)
+        return connection
+    monkeypatch.setattr(store, "_connect", tracing_connect)
+
+    _, _, cursor = store.query_rows("payroll", sort=sort, descending=descending, limit=10)
+    store.query_rows("payroll", sort=sort, descending=descending, limit=10, cursor=cursor)
+
+    pages = [statement for statement in statements if statement.startswith("SELECT rowid")]
+    assert len(pages) == 2
+    connection = sqlite3.connect(store.path)
+    for statement in pages:
+        plan = " ".join(row[-1] for row in connection.execute(f"EXPLAIN QUERY PLAN {statement}"))
+        assert "TEMP B-TREE" not in plan
+    connection.close()
+
+def test_invalid_queries(store):
+    page = client.get("/calculator/bulk/datasets/payroll/results", params={"sort": "leaving_date", "limit": 10}).json()
+
+    response = client.get("/calculator/bulk/datasets/payroll/results", params={"sort": "employee_name", "cursor": page["next_cursor"]})
+    assert response.status_code == 400
+    assert client.get("/calculator/bulk/datasets/payroll/results", params={"cursor": "garbage"}).status_code == 400
+    assert client.get("/calculator/bulk/datasets/payroll/results", params={"sort": "salary"}).status_code == 422
+    assert client.get("/calculator/bulk/datasets/payroll/results", params={"limit": 100000}).status_code == 422
+    assert client.get("/calculator/bulk/datasets/missing/results").status_code == 404
+
+def test_list_datasets(store):
+    datasets = client.get("/calculator/bulk/datasets").json()
+
+    assert [dataset["dataset_id"] for dataset in datasets] == ["payroll"]
+    assert datasets[0]["row_count"] == 1000
+
+def test_page_json_matches_model_dump_json(store):
+    total_count, results, next_cursor = store.query_rows("payroll", limit=3)
+
+    # Pages after the first have no count
+    for count in (total_count, None):
+        page = {"dataset_id": "payroll", "total_count": count, "results": results, "next_cursor": next_cursor}
+        expected = DatasetResultPage(**{**page, "results": list(results)}).model_dump_json()
+        assert render_result_page_json(page) == expected.encode("utf-8")
@@ -0,0 +1,68 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.config import RETRY_AFTER_SECONDS
+from app.services.executor import CpuExecutor, ExecutorBusyError
+
+from helpers import to_csv
+
+client = TestClient(app)
+
+def square(value):
+    """Picklable work function for process pool tests"""
+    return value * value
+
+@pytest.mark.parametrize("kind", ["thread", "process", "inline"])
+def test_cpu_executor_runs_work(kind):
+    executor = CpuExecutor(kind=kind, max_workers=1, max_pending=2)
+
+    async def run():
+        return await executor.run(square, 12), await executor.run_local(square, 3)
+
+    try:
+        assert asyncio.run(run()) == (144, 9)
+        assert executor.pending == 0
+    finally:
+        executor.shutdown()
+
+def test_cpu_executor_rejects_when_full():
+    executor = CpuExecutor(kind="thread", max_workers=1, max_pending=1)
+    release = threading.Event()
+
+    async def run():
+        blocked = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(ExecutorBusyError):
+            await executor.run(square, 2)
+        release.set()
+        await blocked
+
+    try:
+        asyncio.run(run())
+        assert executor.pending == 0
+    finally:
+        executor.shutdown()
+
+def test_calculate_bulk_busy_returns_503(monkeypatch):
+    async def busy(*args):
+        raise ExecutorBusyError("Too many requests are being processed. Please retry shortly.")
+
+    monkeypatch.setattr('app.api.calculator.cpu_executor.run', busy)
+    rows = {
+        'employee_name': ['John Doe'],
+        'joining_date': ['2015-01-01'],
+        'leaving_date': ['2023-01-01'],
+        'last_drawn_salary': [25000],
+    }
+
+    response = client.post(
+        "/calculator/bulk",
+        files={"file": ("test.csv", to_csv(rows), "text/csv")}
+    )
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == str(RETRY_AFTER_SECONDS)
@@ -0,0 +1,117 @@
+import random
+from decimal import Decimal, ROUND_HALF_UP
+
+import numpy as np
+import pytest
+
+from app.services.calculator import MAX_GRATUITY_LIMIT, MAX_GRATUITY_PAISE, calculate_gratuity_amount
+from app.services.fixed_point import (
+    MAX_SALARY_DIGITS,
+    MAX_SALARY_DECIMALS,
+    NON_COVERED_DENOMINATOR,
+    STANDARD_DENOMINATOR,
+    gratuity_paise,
+    paise_to_decimal,
+    round_half_up_div,
+    rupees_to_paise
+)
+from app.schemas.calculator import EmployeeType, TerminationReason
+
+def decimal_gratuity(salary, years, denominator):
+    """The Decimal formula the integer engine replaces, as a reference"""
+    gratuity = (salary * Decimal(years) * Decimal('15')) / Decimal(denominator)
+    return min(gratuity, MAX_GRATUITY_LIMIT).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+def random_salary(rng):
+    """A non-negative salary with up to 20 significant digits and up to 15 decimals"""
+    decimals = rng.choice([0, 1, 2, 2, 2, rng.randint(3, MAX_SALARY_DECIMALS)])
+    digits = rng.randint(1, MAX_SALARY_DIGITS)
+    coefficient = rng.randrange(10 ** digits)
+    return Decimal(coefficient).scaleb(-decimals)
+
+def assert_identical(actual, expected):
+    # Bit-for-bit: equal values with the same exponent, so they also print the same
+    assert actual == expected
+    assert actual.as_tuple() == expected.as_tuple()
+    assert str(actual) == str(expected)
+
+def test_round_half_up_div():
+    # Exact halves round up, everything else to the nearest integer
+    assert round_half_up_div(5, 10) == 1
+    assert round_half_up_div(4, 10) == 0
+    assert round_half_up_div(15, 10) == 2
+    assert round_half_up_div(0, 26) == 0
+    # Works element-wise on int64 arrays
+    assert round_half_up_div(np.array([5, 14, 15]), np.array([10, 10, 10])).tolist() == [1, 1, 2]
+
+def test_paise_conversion():
+    assert rupees_to_paise(Decimal('2000000.00')) == 200000000
+    assert rupees_to_paise(Decimal('12.5')) == 1250
+    assert str(paise_to_decimal(1250)) == '12.50'
+    assert str(paise_to_decimal(0)) == '0.00'
+    with pytest.raises(ValueError):
+        rupees_to_paise(Decimal('0.001'))
+
+def test_property_matches_decimal_formula():
+    # Property test over seeded random salaries and service lengths: the integer engine
+    # must agree with the Decimal formula exactly, including the exponent of the result
+    rng = random.Random(2024)
+    for _ in range(50000):
+        salary = random_salary(rng)
+        years = rng.choice([rng.randint(0, 50), rng.randint(0, 9999)])
+        denominator = rng.choice([STANDARD_DENOMINATOR, NON_COVERED_DENOMINATOR])
+
+        paise = gratuity_paise(salary, years, denominator, MAX_GRATUITY_PAISE)
+        assert paise is not None, (salary, years)
+        assert_identical(paise_to_decimal(paise), decimal_gratuity(salary, years, denominator))
+
+def test_property_matches_decimal_formula_with_hypothesis():
+    hypothesis = pytest.importorskip("hypothesis")
+    st = hypothesis.strategies
+
+    salaries = st.builds(
+        lambda coefficient, decimals: Decimal(coefficient).scaleb(-decimals),
+        st.integers(0, 10 ** MAX_SALARY_DIGITS - 1),
+        st.integers(0, MAX_SALARY_DECIMALS)
+    )
+
+    @hypothesis.given(salaries, st.integers(0, 9999), st.sampled_from([STANDARD_DENOMINATOR, NON_COVERED_DENOMINATOR]))
+    @hypothesis.settings(max_examples=2000, deadline=None)
+    def check(salary, years, denominator):
+        paise = gratuity_paise(salary, years, denominator, MAX_GRATUITY_PAISE)
+        assert_identical(paise_to_decimal(paise), decimal_gratuity(salary, years, denominator))
+
+    check()
+
+def test_exact_halves_round_up():
+    # 0.13 × 15 / 26 = 0.075 and 0.01 × 15 / 30 = 0.005 are exact half paise
+    assert gratuity_paise(Decimal('0.13'), 1, STANDARD_DENOMINATOR, MAX_GRATUITY_PAISE) == 8
+    assert gratuity_paise(Decimal('0.01'), 1, NON_COVERED_DENOMINATOR, MAX_GRATUITY_PAISE) == 1
+    # Just below a half rounds down
+    assert gratuity_paise(Decimal('0.0099999999'), 1, NON_COVERED_DENOMINATOR, MAX_GRATUITY_PAISE) == 0
+
+def test_cap_applies():
+    assert gratuity_paise(Decimal('5000000'), 40, STANDARD_DENOMINATOR, MAX_GRATUITY_PAISE) == MAX_GRATUITY_PAISE
+    assert str(paise_to_decimal(MAX_GRATUITY_PAISE)) == '2000000.00'
+
+def test_unsupported_inputs_fall_back():
+    # Inputs the integer engine cannot guarantee to match are left to the Decimal formula
+    assert gratuity_paise(Decimal('-0'), 5, STANDARD_DENOMINATOR, MAX_GRATUITY_PAISE) is None
+    assert gratuity_paise(Decimal('-100'), 5, STANDARD_DENOMINATOR, MAX_GRATUITY_PAISE) is None
+    assert gratuity_paise(Decimal('NaN'), 5, STANDARD_DENOMINATOR, MAX_GRATUITY_PAISE) is None
+    assert gratuity_paise(Decimal('1' * 21), 5, STANDARD_DENOMINATOR, MAX_GRATUITY_PAISE) is None
+    assert gratuity_paise(Decimal('1e-16'), 5, STANDARD_DENOMINATOR, MAX_GRATUITY_PAISE) is None
+    assert gratuity_paise(Decimal('100'), 5.5, STANDARD_DENOMINATOR, MAX_GRATUITY_PAISE) is None
+    assert gratuity_paise(100, 5, STANDARD_DENOMINATOR, MAX_GRATUITY_PAISE) is None
+
+def test_calculate_gratuity_amount_unchanged_for_fallbacks():
+    # Very long salaries still go through Decimal and produce the same result as before
+    salary = Decimal('123456789.123456789123456789')
+    expected = decimal_gratuity(salary, 10, STANDARD_DENOMINATOR)
+    actual = calculate_gratuity_amount(salary, 10, EmployeeType.STANDARD, TerminationReason.RESIGNATION)
+    assert_identical(actual, expected)
+
+def test_calculate_gratuity_amount_uses_integer_engine():
+    salary = Decimal('45678.9')
+    actual = calculate_gratuity_amount(salary, 12, EmployeeType.NON_COVERED, TerminationReason.RETIREMENT)
+    assert_identical(actual, decimal_gratuity(salary, 12, NON_COVERED_DENOMINATOR))
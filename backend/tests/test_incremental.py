@@ -0,0 +1,205 @@
+import json
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.schemas.calculator import DatasetUpdate
+from app.services import incremental
+from app.services.dataset_store import DatasetStore, get_dataset_store
+from app.services.incremental import RowHashMatcher, diff_row_hashes, update_dataset
+from app.services.ingestion import split_frame, prepare_employee_frame
+from app.services.results import render_dataset_update_json
+
+from helpers import to_csv
+from test_columnar_calculator import random_employees
+
+client = TestClient(app)
+
+def full_bulk(rows):
+    """Totals of a full /bulk calculation of the same rows"""
+    result = client.post("/calculator/bulk", files={"file": ("test.csv", to_csv(rows), "text/csv")}).json()
+    return result["total_gratuity_amount"], result["eligible_count"], result["ineligible_count"]
+
+@pytest.fixture
+def store(tmp_path):
+    """Dataset store in a temporary database, installed as the API dependency"""
+    dataset_store = DatasetStore(str(tmp_path / "datasets.sqlite3"))
+    app.dependency_overrides[get_dataset_store] = lambda: dataset_store
+    yield dataset_store
+    app.dependency_overrides.clear()
+
+def upload(dataset_id, rows):
+    return client.put(f"/calculator/bulk/datasets/{dataset_id}", files={"file": ("payroll.csv", to_csv(rows), "text/csv")})
+
+def test_diff_matches_duplicate_rows_as_multisets():
+    previous = np.array([5, 5, 7, 9], dtype=np.int64)
+    current = np.array([5, 8, 5, 5, 9], dtype=np.int64)
+
+    added, removed = diff_row_hashes(previous, current)
+
+    # The first two 5s and the 9 are unchanged; the third 5 and the 8 are new
+    assert added.tolist() == [1, 3]
+    assert removed == {7: 1}
+
+def test_matching_in_chunks_equals_matching_whole_file():
+    rng = np.random.default_rng(37)
+    previous = rng.integers(0, 20, 200).astype(np.int64)
+    current = rng.integers(0, 25, 230).astype(np.int64)
+
+    matcher = RowHashMatcher(previous)
+    added = [start + matcher.match(current[start:start + 16]) for start in range(0, len(current), 16)]
+
+    expected_added, expected_removed = diff_row_hashes(previous, current)
+    assert np.concatenate(added).tolist() == expected_added.tolist()
+    assert matcher.removed() == expected_removed
+
+def test_chunked_update_matches_whole_file_update(store, monkeypatch):
+    rows = random_employees(120, seed=38)
+    changed = [dict(row) for row in rows[3:]] + [dict(rows[0]), dict(rows[0]), {**rows[1], "last_drawn_salary": 99999}]
+
+    upload("whole", rows)
+    whole = upload("whole", changed).json()
+    monkeypatch.setattr('app.api.calculator.BULK_CHUNK_SIZE', 7)
+    upload("chunked", rows)
+    chunked = upload("chunked", changed).json()
+
+    for key in ("row_count", "added_count", "removed_count", "unchanged_count", "total_gratuity_amount", "added", "removed"):
+        assert chunked[key] == whole[key]
+
+def test_first_upload_calculates_every_row(store):
+    rows = random_employees(300, seed=31)
+
+    response = upload("payroll", rows)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["full_recalculation"] is True
+    assert (body["row_count"], body["added_count"], body["removed_count"], body["unchanged_count"]) == (300, 300, 0, 0)
+    assert (body["total_gratuity_amount"], body["eligible_count"], body["ineligible_count"]) == full_bulk(rows)
+
+def test_changed_file_recalculates_only_changed_rows(store):
+    rows = random_employees(300, seed=32)
+    upload("payroll", rows)
+
+    # Next month: one raise, one leaver, one joiner, and an exact duplicate of a row
+    changed = [dict(row) for row in rows]
+    changed[10]["last_drawn_salary"] = 123456
+    removed_row = changed.pop(20)
+    changed.append({**rows[0], "employee_name": "New Joiner"})
+    changed.append(dict(rows[5]))
+
+    response = upload("payroll", changed)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["full_recalculation"] is False
+    assert (body["row_count"], body["added_count"], body["removed_count"], body["unchanged_count"]) == (301, 3, 2, 298)
+    assert sorted(row["employee_name"] for row in body["added"]) == ["Employee 10", "Employee 5", "New Joiner"]
+    assert sorted(row["employee_name"] for row in body["removed"]) == ["Employee 10", removed_row["employee_name"]]
+    # Totals updated by delta equal a full recalculation of the new file
+    assert (body["total_gratuity_amount"], body["eligible_count"], body["ineligible_count"]) == full_bulk(changed)
+
+    summary = client.get("/calculator/bulk/datasets/payroll").json()
+    assert summary["row_count"] == 301
+    assert summary["total_gratuity_amount"] == body["total_gratuity_amount"]
+
+def test_unchanged_file_calculates_nothing(store, monkeypatch):
+    rows = random_employees(100, seed=33)
+    upload("payroll", rows)
+    monkeypatch.setattr(incremental, "calculate_bulk_gratuity", lambda frame: pytest.fail("nothing should be recalculated"))
+
+    body = upload("payroll", rows).json()
+
+    assert (body["added_count"], body["removed_count"], body["unchanged_count"]) == (0, 0, 100)
+
+def test_rule_change_recalculates_everything(store, monkeypatch):
+    rows = random_employees(50, seed=34)
+    upload("payroll", rows)
+    monkeypatch.setattr(incremental, "HASH_RULES", incremental.HASH_RULES + ";changed")
+
+    body = upload("payroll", rows).json()
+
+    assert body["full_recalculation"] is True
+    assert (body["row_count"], body["added_count"], body["removed_count"]) == (50, 50, 0)
+    assert (body["total_gratuity_amount"], body["eligible_count"], body["ineligible_count"]) == full_bulk(rows)
+
+def test_concurrent_update_is_rejected(store, monkeypatch):
+    rows = random_employees(20, seed=35)
+    upload("payroll", rows)
+
+    # Another upload lands between reading the stored hashes and applying the changes
+    read_hashes = store.row_hashes
+    def row_hashes_then_race(dataset_id):
+        state = read_hashes(dataset_id)
+        monkeypatch.undo()
+        update_dataset(store, dataset_id, [prepare_employee_frame(pd.DataFrame(rows[:5]))])
+        return state
+    monkeypatch.setattr(store, "row_hashes", row_hashes_then_race)
+
+    response = upload("payroll", rows[:10])
+
+    assert response.status_code == 409
+    assert store.get("payroll")["row_count"] == 5
+
+def test_invalid_rows_leave_dataset_unchanged(store):
+    rows = random_employees(20, seed=36)
+    upload("payroll", rows)
+    invalid = [dict(row) for row in rows]
+    invalid[3]["leaving_date"] = "not a date"
+
+    response = upload("payroll", invalid)
+
+    assert response.status_code == 400
+    assert store.get("payroll")["version"] == 1
+
+def test_dataset_endpoints(store):
+    assert client.get("/calculator/bulk/datasets/payroll").status_code == 404
+    assert upload("bad id!", random_employees(2)).status_code == 422
+
+    upload("payroll", random_employees(5, seed=37))
+
+    assert client.delete("/calculator/bulk/datasets/payroll").status_code == 204
+    assert client.get("/calculator/bulk/datasets/payroll").status_code == 404
+    assert client.delete("/calculator/bulk/datasets/payroll").status_code == 404
+
+def test_update_json_matches_model_dump_json(store):
+    frame = prepare_employee_frame(pd.DataFrame(random_employees(200, seed=38)))
+    update_dataset(store, "payroll", split_frame(frame, 50))
+    update = update_dataset(store, "payroll", [frame.iloc[20:]])
+
+    materialized = {**update, "added": list(update["added"]), "removed": list(update["removed"])}
+    assert render_dataset_update_json(update) == DatasetUpdate(**materialized).model_dump_json().encode("utf-8")
+    assert json.loads(render_dataset_update_json(update))["removed_count"] == 20
+
+def test_stored_rows_read_back_unchanged(store):
+    frame = prepare_employee_frame(pd.DataFrame(random_employees(100, seed=39)))
+    first = update_dataset(store, "payroll", [frame])
+
+    # Removing every row returns the stored results exactly as they were calculated
+    emptied = update_dataset(store, "payroll", [frame.iloc[:0]])
+
+    assert sorted(emptied["removed"], key=lambda r: r["employee_name"]) == sorted(first["added"], key=lambda r: r["employee_name"])
+    assert (emptied["row_count"], emptied["total_gratuity_amount"], emptied["eligible_count"]) == (0, 0, 0)
+
+def test_store_closes_connections(store, monkeypatch):
+    opened = []
+    connect = store._connect
+    def tracking_connect():
+        opened.append(connect())
+        return opened[-1]
+    monkeypatch.setattr(store, "_connect", tracking_connect)
+
+    update_dataset(store, "payroll", [prepare_employee_frame(pd.DataFrame(random_employees(5, seed=39)))])
+    store.get("payroll")
+    store.summaries()
+    store.query_rows("payroll", limit=10)
+    store.delete("payroll")
+
+    assert len(opened) == 6
+    for connection in opened:
+        with pytest.raises(sqlite3.ProgrammingError):
+            connection.execute("SELECT 1")
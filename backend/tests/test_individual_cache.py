@@ -0,0 +1,105 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.schemas.calculator import EmployeeType, TerminationReason
+from app.services.cache import TTLCache
+from app.services.calculator import (
+    calculate_individual_gratuity,
+    calculate_individual_gratuity_cached,
+    individual_result_cache
+)
+
+client = TestClient(app)
+
+PAYLOAD = {
+    "employee_name": "Jane Smith",
+    "joining_date": "2018-01-01",
+    "leaving_date": "2023-01-01",
+    "last_drawn_salary": 25000
+}
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    """Start every test with an empty result cache"""
+    individual_result_cache.clear()
+    yield
+    individual_result_cache.clear()
+
+def test_ttl_cache_expiry_and_eviction():
+    now = [0.0]
+    cache = TTLCache(maxsize=2, ttl=10, clock=lambda: now[0])
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+
+    # "b" is now least recently used and is evicted first
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+    now[0] = 11
+    assert cache.get("a") is None
+    assert cache.stats() == {"hits": 2, "misses": 2, "size": 1, "maxsize": 2}
+
+def test_cached_calculation_shares_normalized_entries():
+    arguments = dict(
+        joining_date=date(2018, 1, 1),
+        leaving_date=date(2023, 1, 1),
+        last_drawn_salary=Decimal("25000")
+    )
+
+    first = calculate_individual_gratuity_cached("Jane Smith", **arguments)
+    # Unknown values are calculated with the standard rules and reuse the same entry
+    unknown = calculate_individual_gratuity_cached(
+        "Sam Brown",
+        employee_type=EmployeeType.UNKNOWN,
+        termination_reason=TerminationReason.UNKNOWN,
+        **arguments
+    )
+
+    assert individual_result_cache.stats()["hits"] == 1
+    assert first == calculate_individual_gratuity("Jane Smith", **arguments)
+    assert unknown == calculate_individual_gratuity(
+        "Sam Brown",
+        employee_type=EmployeeType.UNKNOWN,
+        termination_reason=TerminationReason.UNKNOWN,
+        **arguments
+    )
+
+def test_individual_etag_round_trip():
+    response = client.post("/calculator/individual", json=PAYLOAD)
+
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+
+    repeated = client.post("/calculator/individual", json=PAYLOAD, headers={"If-None-Match": etag})
+    assert repeated.status_code == 304
+    assert repeated.headers["etag"] == etag
+    assert repeated.content == b""
+
+    changed = client.post(
+        "/calculator/individual",
+        json={**PAYLOAD, "last_drawn_salary": 26000},
+        headers={"If-None-Match": etag}
+    )
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+def test_individual_etag_differs_by_name():
+    first = client.post("/calculator/individual", json=PAYLOAD)
+    second = client.post("/calculator/individual", json={**PAYLOAD, "employee_name": "John Doe"})
+
+    assert first.headers["etag"] != second.headers["etag"]
+    assert second.json()["employee_name"] == "John Doe"
+    assert second.json()["gratuity_amount"] == first.json()["gratuity_amount"]
+
+def test_individual_wildcard_if_none_match_is_not_a_match():
+    response = client.post("/calculator/individual", json=PAYLOAD, headers={"If-None-Match": "*"})
+
+    assert response.status_code == 200
+    assert response.json()["employee_name"] == PAYLOAD["employee_name"]
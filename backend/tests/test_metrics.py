@@ -0,0 +1,88 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import metrics
+from app.services.metrics import Counter, Histogram, MetricsRegistry, stage, stage_duration
+
+from helpers import to_csv
+
+client = TestClient(app)
+
+def upload_csv():
+    return to_csv({
+        'employee_name': ['John Doe', 'Jane Smith'],
+        'joining_date': ['2015-01-01', '2010-06-15'],
+        'leaving_date': ['2023-01-01', '2023-01-01'],
+        'last_drawn_salary': [25000, 35000],
+    })
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry(enabled=True)
+    counter = registry.register(Counter("rows_total", "Rows.", ["outcome"]))
+    histogram = registry.register(Histogram("duration_seconds", "Duration.", ["stage"], buckets=(0.1, 1.0)))
+
+    counter.inc(3, "calculated")
+    histogram.observe(0.05, "parse")
+    histogram.observe(0.1, "parse")
+    histogram.observe(5.0, "parse")
+
+    assert registry.render().splitlines() == [
+        '# HELP rows_total Rows.',
+        '# TYPE rows_total counter',
+        'rows_total{outcome="calculated"} 3.0',
+        '# HELP duration_seconds Duration.',
+        '# TYPE duration_seconds histogram',
+        # Bucket bounds are inclusive and counts cumulative
+        'duration_seconds_bucket{stage="parse",le="0.1"} 2',
+        'duration_seconds_bucket{stage="parse",le="1.0"} 2',
+        'duration_seconds_bucket{stage="parse",le="+Inf"} 3',
+        'duration_seconds_sum{stage="parse"} 5.15',
+        'duration_seconds_count{stage="parse"} 3',
+    ]
+
+def test_bulk_upload_records_stages_and_rows():
+    # The pandas-free CSV reader normalizes and validates rows while parsing them
+    stages = ["upload_read", "parse", "calculation", "serialization"]
+    before = {name: stage_duration.count(name) for name in stages}
+    rows_before = metrics.rows_total.value("calculated")
+
+    response = client.post("/calculator/bulk", files={"file": ("test.csv", upload_csv(), "text/csv")})
+    assert response.status_code == 200
+
+    # Every stage of the whole-file path was timed exactly once
+    assert {name: stage_duration.count(name) - count for name, count in before.items()} == dict.fromkeys(stages, 1)
+    assert metrics.rows_total.value("calculated") - rows_before == 2
+
+    body = client.get("/metrics").text
+    assert 'gratify_http_requests_total{method="POST",route="/calculator/bulk",status="200"}' in body
+    assert 'gratify_stage_duration_seconds_count{stage="calculation"}' in body
+    assert 'gratify_cache_hits_total{cache="years_of_service"}' in body
+    assert 'gratify_cpu_executor_pending 0.0' in body
+
+def test_chunked_upload_is_observed_once(monkeypatch):
+    monkeypatch.setattr('app.api.calculator.BULK_CHUNK_SIZE', 1)
+    uploads_before = metrics.upload_rows.count()
+    total_before = metrics.upload_rows.total()
+
+    for accept in ("application/json", "application/x-ndjson"):
+        response = client.post(
+            "/calculator/bulk?chunked=true",
+            files={"file": ("test.csv", upload_csv(), "text/csv")},
+            headers={"Accept": accept}
+        )
+        assert response.status_code == 200
+
+    assert metrics.upload_rows.count() - uploads_before == 2
+    assert metrics.upload_rows.total() - total_before == 4
+
+def test_disabled_metrics_are_no_ops(monkeypatch):
+    monkeypatch.setattr(metrics.registry, "enabled", False)
+    before = stage_duration.count("parse")
+
+    # A shared no-op context manager, nothing is recorded
+    assert stage("parse") is stage("calculation")
+    with stage("parse"):
+        pass
+
+    assert stage_duration.count("parse") == before
+    assert client.get("/metrics").status_code == 404
@@ -0,0 +1,46 @@
+import pandas as pd
+import pytest
+
+from app.schemas.calculator import IndividualCalculatorInput
+from app.services.calculator import calculate_bulk_gratuity
+from app.services.parallel import calculate_bulk_gratuity_parallel, split_shards, shutdown_process_pools
+
+from test_columnar_calculator import random_employees
+
+@pytest.fixture(scope="module", autouse=True)
+def process_pools():
+    """Shut down the shared process pools once the module's tests are done"""
+    yield
+    shutdown_process_pools()
+
+def test_split_shards_keeps_order():
+    frame = pd.DataFrame({"value": range(10)})
+
+    shards = split_shards(frame, 4)
+
+    assert [len(shard) for shard in shards] == [4, 4, 2]
+    assert pd.concat(shards)["value"].tolist() == list(range(10))
+    assert split_shards(list(range(5)), 2) == [[0, 1], [2, 3], [4]]
+
+def test_parallel_dataframe_matches_sequential():
+    frame = pd.DataFrame(random_employees(1000, seed=8))
+
+    sequential = calculate_bulk_gratuity(frame)
+    parallel = calculate_bulk_gratuity(frame, workers=2, shard_size=150)
+
+    assert parallel == sequential
+    assert str(parallel["total_gratuity_amount"]) == str(sequential["total_gratuity_amount"])
+
+def test_parallel_list_matches_sequential():
+    employees = [IndividualCalculatorInput(**row) for row in random_employees(200, seed=9)]
+
+    assert calculate_bulk_gratuity_parallel(employees, workers=2, shard_size=30) == calculate_bulk_gratuity(employees)
+
+def test_small_workforce_stays_sequential(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("parallel path should not be used")
+
+    monkeypatch.setattr("app.services.parallel.calculate_bulk_gratuity_parallel", fail)
+    frame = pd.DataFrame(random_employees(10, seed=10))
+
+    assert calculate_bulk_gratuity(frame, workers=4, shard_size=100) == calculate_bulk_gratuity(frame)
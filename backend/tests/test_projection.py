@@ -0,0 +1,140 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.schemas.calculator import EmployeeType, LiabilityProjection, TerminationReason
+from app.services.calculator import calculate_individual_gratuity
+from app.services.columnar import to_decimal, years_of_service_columns
+from app.services.ingestion import prepare_employee_frame, split_frame
+from app.services import projection
+from app.services.projection import month_end_grid, project_liability, render_projection_json, years_of_service_grid
+
+from helpers import to_csv
+from test_columnar_calculator import random_employees
+
+client = TestClient(app)
+
+def test_month_end_grid():
+    assert month_end_grid(date(2024, 1, 15), 3) == [date(2024, 1, 31), date(2024, 2, 29), date(2024, 3, 31)]
+    assert month_end_grid(date(2024, 12, 31), 2) == [date(2024, 12, 31), date(2025, 1, 31)]
+
+def test_years_grid_matches_per_date_calculation():
+    joining = pd.to_datetime([row["joining_date"] for row in random_employees(2000, seed=41)]).to_numpy().astype("datetime64[D]")
+    grids = [
+        np.array(month_end_grid(date(1975, 1, 1), 720), dtype="datetime64[D]"),
+        # Every day, so each step date is hit exactly
+        np.arange(np.datetime64("1990-01-01"), np.datetime64("1993-01-01")),
+        # Steps of several years at a time
+        np.array(["1970-01-01", "1988-02-29", "2030-08-31", "2075-01-01"], dtype="datetime64[D]"),
+    ]
+
+    for grid in grids:
+        years = years_of_service_grid(joining, grid)
+        for column, day in enumerate(grid):
+            assert (years[:, column] == years_of_service_columns(joining, np.maximum(joining, day))).all()
+
+def test_liabilities_match_individual_calculation():
+    rows = random_employees(150, seed=42)
+    # Salaries that are not whole paise take the Decimal path
+    rows[0]["last_drawn_salary"] = 12345.678
+    rows[1]["last_drawn_salary"] = 1e13
+    frame = prepare_employee_frame(pd.DataFrame(rows))
+    dates = month_end_grid(date(1995, 1, 1), 36) + [date(2030, 6, 30)]
+
+    projection = project_liability(split_frame(frame, 40), dates)
+
+    employees = list(projection["employees"])
+    assert [employee["employee_name"] for employee in employees] == frame["employee_name"].tolist()
+    totals = [0] * len(dates)
+    for row, employee in zip(frame.itertuples(), employees):
+        joining, leaving = row.joining_date.date(), row.leaving_date.date()
+        for column, day in enumerate(dates):
+            if not joining <= day <= leaving:
+                assert employee["liabilities"][column] == 0
+                continue
+            expected = calculate_individual_gratuity(
+                row.employee_name, joining, day, to_decimal(row.last_drawn_salary),
+                EmployeeType(row.employee_type), TerminationReason(row.termination_reason)
+            )
+            assert employee["liabilities"][column] == expected["gratuity_amount"]
+            totals[column] += expected["gratuity_amount"]
+    assert projection["total_liability"] == totals
+
+def test_projection_json_matches_model_dump_json():
+    rows = random_employees(100, seed=43)
+    rows[0]["employee_name"] = 'Zoë "Z" \\'
+    frame = prepare_employee_frame(pd.DataFrame(rows))
+    dates = month_end_grid(date(2000, 1, 1), 24)
+
+    for include_employees in (True, False):
+        projection = project_liability([frame], dates, include_employees)
+        employees = projection["employees"]
+        materialized = {**projection, "employees": None if employees is None else list(employees)}
+        assert render_projection_json(projection) == LiabilityProjection(**materialized).model_dump_json().encode("utf-8")
+
+def test_projection_endpoint():
+    rows = random_employees(50, seed=44)
+
+    response = client.post(
+        "/calculator/bulk/projection?start=2001-03-10&periods=12",
+        files={"file": ("test.csv", to_csv(rows), "text/csv")}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["dates"][0] == "2001-03-31" and len(body["dates"]) == 12
+    assert len(body["employees"]) == 50
+    assert all(len(employee["liabilities"]) == 12 for employee in body["employees"])
+
+    # Explicit dates are sorted and deduplicated; summary_only drops per-employee rows
+    response = client.post(
+        "/calculator/bulk/projection?dates=2010-01-01&dates=2005-01-01&dates=2010-01-01&summary_only=true",
+        files={"file": ("test.csv", to_csv(rows), "text/csv")}
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["dates"] == ["2005-01-01", "2010-01-01"]
+    assert body["employees"] is None
+    assert len(body["total_liability"]) == len(body["employee_count"]) == len(body["eligible_count"]) == 2
+
+def test_projection_endpoint_rejects_invalid_input():
+    rows = random_employees(5, seed=45)
+    rows[2]["leaving_date"] = rows[2]["joining_date"] - timedelta(days=1)
+
+    response = client.post("/calculator/bulk/projection", files={"file": ("test.csv", to_csv(rows), "text/csv")})
+    assert response.status_code == 400
+    assert response.json()["detail"]["errors"][0]["row"] == 4
+
+    response = client.post("/calculator/bulk/projection?periods=100000", files={"file": ("test.csv", to_csv(rows), "text/csv")})
+    assert response.status_code == 400
+
+def test_projection_in_small_blocks_matches_single_block(monkeypatch):
+    frame = prepare_employee_frame(pd.DataFrame(random_employees(60, seed=46)))
+    dates = month_end_grid(date(2000, 1, 1), 24)
+    expected = project_liability([frame], dates)
+
+    monkeypatch.setattr(projection, "BLOCK_CELLS", 7 * 24)
+    blocked = project_liability(split_frame(frame, 25), dates)
+
+    assert len(blocked["employees"].blocks) == 10
+    assert blocked["total_liability"] == expected["total_liability"]
+    assert list(blocked["employees"]) == list(expected["employees"])
+    assert blocked["employees"][-1] == expected["employees"][59]
+    assert blocked["employees"][20:30] == list(expected["employees"])[20:30]
+    assert render_projection_json(blocked) == render_projection_json(expected)
+
+def test_projection_endpoint_limits_employee_cells(monkeypatch):
+    monkeypatch.setattr('app.api.calculator.PROJECTION_MAX_CELLS', 50 * 12 - 1)
+    upload = {"file": ("test.csv", to_csv(random_employees(50, seed=47)), "text/csv")}
+
+    response = client.post("/calculator/bulk/projection?start=2001-03-10&periods=12", files=upload)
+    assert response.status_code == 400
+    assert "summary_only" in response.json()["detail"]
+
+    response = client.post("/calculator/bulk/projection?start=2001-03-10&periods=12&summary_only=true", files=upload)
+    assert response.status_code == 200
+    assert response.json()["employee_count"][0] > 0
@@ -0,0 +1,115 @@
+import json
+from decimal import ROUND_HALF_UP, Decimal
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services import scenarios as scenario_service
+from app.services.calculator import MAX_GRATUITY_LIMIT, calculate_bulk_gratuity, calculate_years_of_service, is_eligible_for_gratuity
+from app.services.columnar import to_decimal
+from app.services.ingestion import prepare_employee_frame
+from app.services.scenarios import analyze_scenarios, evaluate_scenarios, prepare_workforce, prepared_workforce_cache
+from app.schemas.calculator import EmployeeType, TerminationReason
+
+from helpers import to_csv
+from test_columnar_calculator import random_employees
+
+client = TestClient(app)
+
+SCENARIOS = [
+    {"name": "higher cap", "max_gratuity": Decimal("2500000.00")},
+    {"name": "raise", "salary_increase_percent": Decimal("7.25")},
+    {"name": "pay cut, low cap", "salary_increase_percent": Decimal("-12.5"), "max_gratuity": Decimal("100000")},
+    {"name": "denominators", "standard_denominator": 30, "non_covered_denominator": 26},
+]
+
+def reference_amounts(frame, scenario):
+    """Eligible gratuity amounts under a scenario, one employee at a time in Decimal"""
+    cap = scenario.get("max_gratuity", MAX_GRATUITY_LIMIT)
+    factor = 1 + scenario.get("salary_increase_percent", Decimal(0)) / 100
+    amounts = []
+    for row in frame.itertuples():
+        years = calculate_years_of_service(row.joining_date.date(), row.leaving_date.date())
+        reason = TerminationReason(row.termination_reason)
+        if not is_eligible_for_gratuity(years, TerminationReason.RESIGNATION if reason == TerminationReason.UNKNOWN else reason):
+            continue
+        non_covered = row.employee_type == EmployeeType.NON_COVERED.value
+        denominator = scenario.get("non_covered_denominator", 30) if non_covered else scenario.get("standard_denominator", 26)
+        gratuity = to_decimal(row.last_drawn_salary) * factor * years * 15 / Decimal(denominator)
+        amounts.append(min(gratuity, cap).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
+    return amounts
+
+@pytest.fixture
+def frame():
+    rows = random_employees(400, seed=51)
+    # Salaries that are not whole paise, or too large for int64, take the Decimal path
+    rows[0]["last_drawn_salary"] = 12345.678
+    rows[1]["last_drawn_salary"] = 1e13
+    return prepare_employee_frame(pd.DataFrame(rows))
+
+def test_baseline_matches_bulk_calculation(frame):
+    workforce = prepare_workforce([frame.iloc[:150], frame.iloc[150:]])
+    bulk = calculate_bulk_gratuity(frame)
+
+    analysis = analyze_scenarios("id", workforce, [])
+
+    assert analysis["baseline"]["total_gratuity_amount"] == bulk["total_gratuity_amount"]
+    assert (analysis["eligible_count"], analysis["ineligible_count"]) == (bulk["eligible_count"], bulk["ineligible_count"])
+    assert analysis["scenarios"] == []
+
+def test_scenarios_match_per_employee_calculation(frame, monkeypatch):
+    # Evaluate one scenario per block to cover blocking as well
+    for block_cells in (1 << 22, 1):
+        monkeypatch.setattr(scenario_service, "BLOCK_CELLS", block_cells)
+        results = evaluate_scenarios(prepare_workforce([frame]), SCENARIOS)
+
+        for scenario, result in zip(SCENARIOS, results):
+            amounts = sorted(reference_amounts(frame, scenario))
+            cap = scenario.get("max_gratuity", MAX_GRATUITY_LIMIT)
+            assert result["name"] == scenario["name"]
+            assert result["total_gratuity_amount"] == sum(amounts)
+            assert result["eligible_count"] == len(amounts)
+            assert result["capped_count"] == sum(amount >= cap for amount in amounts)
+            assert result["max_gratuity_amount"] == amounts[-1]
+            assert result["percentiles"]["p50"] == amounts[(len(amounts) + 1) // 2 - 1]
+            assert result["percentiles"]["p99"] == amounts[-(-99 * len(amounts) // 100) - 1]
+
+def test_empty_workforce():
+    result = evaluate_scenarios(prepare_workforce([]), SCENARIOS[:1])[0]
+
+    assert (result["total_gratuity_amount"], result["eligible_count"], result["percentiles"]["p90"]) == (0, 0, 0)
+
+def test_scenario_endpoints_reuse_prepared_workforce(monkeypatch):
+    prepared_workforce_cache.clear()
+    upload = to_csv(random_employees(100, seed=52))
+    scenarios = json.dumps([{"name": "raise", "salary_increase_percent": "5"}])
+
+    response = client.post("/calculator/bulk/scenarios", files={"file": ("test.csv", upload, "text/csv")}, data={"scenarios": scenarios})
+
+    assert response.status_code == 200
+    first = response.json()
+    assert [result["name"] for result in first["scenarios"]] == ["raise"]
+    assert Decimal(first["scenarios"][0]["total_gratuity_amount"]) > Decimal(first["baseline"]["total_gratuity_amount"])
+
+    # The same file and the cached id are evaluated without preparing the workforce again
+    monkeypatch.setattr(scenario_service, "prepare_workforce", lambda chunks: pytest.fail("workforce prepared twice"))
+    again = client.post("/calculator/bulk/scenarios", files={"file": ("other.csv", upload, "text/csv")}, data={"scenarios": scenarios})
+    cached = client.post(f"/calculator/bulk/scenarios/{first['workforce_id']}", json={"scenarios": json.loads(scenarios)})
+
+    assert again.json() == first
+    assert cached.json() == first
+
+def test_scenario_endpoints_reject_invalid_requests():
+    upload = to_csv(random_employees(5, seed=53))
+
+    invalid = json.dumps([{"name": "typo", "salary_increase_percent": "5.125"}])
+    response = client.post("/calculator/bulk/scenarios", files={"file": ("test.csv", upload, "text/csv")}, data={"scenarios": invalid})
+    assert response.status_code == 422
+
+    response = client.post("/calculator/bulk/scenarios", files={"file": ("test.csv", upload, "text/csv")}, data={"scenarios": "not json"})
+    assert response.status_code == 422
+
+    response = client.post("/calculator/bulk/scenarios/unknown", json={"scenarios": []})
+    assert response.status_code == 404
@@ -0,0 +1,141 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.formparsers import MultiPartParser
+
+from app.main import app
+from app.config import RETRY_AFTER_SECONDS, UPLOAD_SPOOL_MAX_BYTES
+from app.services.limits import BulkLimiter, BulkLimitMiddleware, bulk_limiter, configure_upload_spooling
+
+from helpers import to_csv
+
+client = TestClient(app)
+
+def csv_upload(rows=1):
+    """A valid workforce CSV with the given number of rows"""
+    return {"file": ("test.csv", to_csv({
+        'employee_name': [f'Employee {i}' for i in range(rows)],
+        'joining_date': ['2015-01-01'] * rows,
+        'leaving_date': ['2023-01-01'] * rows,
+        'last_drawn_salary': [25000] * rows,
+    }), "text/csv")}
+
+@pytest.fixture
+def limits(monkeypatch):
+    """Small limits on the shared bulk limiter"""
+    monkeypatch.setattr(bulk_limiter, "max_upload_bytes", 2000)
+    monkeypatch.setattr(bulk_limiter, "max_concurrent", 2)
+    return bulk_limiter
+
+def call_middleware(middleware, method, path, headers, body_chunks):
+    """Run an ASGI request through middleware, returning the response status and what the app received"""
+    messages = [{"type": "http.request", "body": chunk, "more_body": i < len(body_chunks) - 1} for i, chunk in enumerate(body_chunks)]
+    sent = []
+    scope = {"type": "http", "method": method, "path": path, "headers": headers}
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(middleware(scope, receive, send))
+    return sent[0]["status"] if sent else None
+
+def test_content_length_over_limit_is_rejected_before_reading_body():
+    async def downstream(scope, receive, send):
+        pytest.fail("the request should not reach the app")
+
+    middleware = BulkLimitMiddleware(downstream, BulkLimiter(max_upload_bytes=100, max_concurrent=1))
+
+    status = call_middleware(middleware, "POST", "/calculator/bulk", [(b"content-length", b"101")], [b""])
+
+    assert status == 413
+
+def test_limits_only_apply_to_bulk_uploads():
+    seen = []
+    async def downstream(scope, receive, send):
+        seen.append((await receive())["body"])
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    middleware = BulkLimitMiddleware(downstream, BulkLimiter(max_upload_bytes=10, max_concurrent=1))
+
+    assert call_middleware(middleware, "GET", "/calculator/bulk/jobs/abc", [], [b""]) == 200
+    assert call_middleware(middleware, "POST", "/calculator/individual", [(b"content-length", b"50")], [b"x" * 50]) == 200
+    assert call_middleware(middleware, "POST", "/calculator/bulk", [], [b"x" * 10]) == 200
+    assert seen == [b"", b"x" * 50, b"x" * 10]
+    assert middleware.limiter.active == 0
+
+def test_upload_over_limit_returns_413(limits):
+    response = client.post("/calculator/bulk", files=csv_upload(100))
+
+    assert response.status_code == 413
+    assert "2000 bytes" in response.json()["detail"]
+
+def test_streamed_upload_over_limit_returns_413(limits):
+    boundary = "limit-test"
+    body = (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="test.csv"\r\n'
+        f'Content-Type: text/csv\r\n\r\n'
+    ).encode() + csv_upload(100)["file"][1] + f"\r\n--{boundary}--\r\n".encode()
+
+    # A generator body is sent with chunked transfer encoding, without Content-Length
+    def chunks():
+        for start in range(0, len(body), 500):
+            yield body[start:start + 500]
+
+    response = client.post(
+        "/calculator/bulk",
+        content=chunks(),
+        headers={"Content-Type": f"multipart/form-data; boundary={boundary}"}
+    )
+
+    assert response.status_code == 413
+
+def test_upload_within_limit_is_processed(limits):
+    response = client.post("/calculator/bulk", files=csv_upload(5))
+
+    assert response.status_code == 200
+    assert response.json()["eligible_count"] == 5
+    assert limits.active == 0
+
+def test_bulk_requests_beyond_limit_return_503(limits, monkeypatch):
+    monkeypatch.setattr(limits, "active", 2)
+
+    response = client.post("/calculator/bulk", files=csv_upload())
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == str(RETRY_AFTER_SECONDS)
+
+    # Other endpoints keep working while bulk uploads are at capacity
+    response = client.post("/calculator/individual", json={
+        "employee_name": "John Doe",
+        "joining_date": "2015-01-01",
+        "leaving_date": "2023-01-01",
+        "last_drawn_salary": 25000
+    })
+    assert response.status_code == 200
+
+def test_request_counts_as_active_while_processed(limits, monkeypatch):
+    from app.api import calculator
+
+    observed = []
+    run = calculator.cpu_executor.run
+    async def observe(*args):
+        observed.append(limits.active)
+        return await run(*args)
+    monkeypatch.setattr(calculator.cpu_executor, "run", observe)
+
+    assert client.post("/calculator/bulk", files=csv_upload()).status_code == 200
+    assert observed == [1]
+    assert limits.active == 0
+
+def test_upload_spooling_is_configured():
+    assert MultiPartParser.spool_max_size == UPLOAD_SPOOL_MAX_BYTES
+
+def test_upload_spooling_fails_without_parser_setting(monkeypatch):
+    monkeypatch.delattr(MultiPartParser, "spool_max_size")
+
+    with pytest.raises(RuntimeError, match="spool_max_size"):
+        configure_upload_spooling()